@@ -1,13 +1,90 @@
 import random
+import math
+import time
 from game_rule import *
 from abc import ABC, abstractmethod
 from player import *
+from gomoku_pattern import *
+from gomoku_threat import *
+from search_control import *
+from board_array import np, stack_boards, gomoku_level2_scores, gomoku_evaluate_batch, othello_evaluate_batch
 
 class GameAI(ABC, Player):
     def __init__(self, name: str, color: str):
         super().__init__(False, True, name, color)
         self.color = color
         self.rule: GameRule = None
+        self.opening_book = None  # 开局库（OpeningBook 对象），由 AI 工厂设置
+        self.search_control: SearchControl = None  # 搜索控制（时间、节点上限与取消），由 AI 工厂设置
+        self.search_stats: SearchStats = SearchStats()  # 最近一次搜索的统计信息
+
+    def set_opening_book(self, opening_book):
+        """
+        设置开局库。
+        :param opening_book: OpeningBook 对象，为 None 时不使用开局库
+        """
+        self.opening_book = opening_book
+
+    def query_opening_book(self, chessboard: Chessboard) -> tuple[int, int]:
+        """
+        在开局库中查询当前局面的落子。
+        :param chessboard: 当前棋盘对象
+        :return: 开局库中的合法落子位置 (row, col)，没有命中时返回 None
+        """
+        if self.opening_book is None:
+            return None
+        entry = self.opening_book.lookup(chessboard, self.color)
+        if entry is None:
+            return None
+        row, col, _ = entry
+        if not self.rule.is_valid_move(row, col, chessboard, self.color, False)[0]:
+            return None
+        return row, col
+
+    def set_search_control(self, search_control: SearchControl):
+        """
+        设置搜索控制。
+        :param search_control: SearchControl 对象，为 None 时搜索不受限制
+        """
+        self.search_control = search_control
+
+    def begin_search(self) -> SearchStats:
+        """
+        开始一次搜索：重置统计信息并启动搜索控制的计时。
+        :return: 本次搜索的统计对象
+        """
+        self.search_stats = SearchStats()
+        if self.search_control is not None:
+            self.search_control.start()
+        return self.search_stats
+
+    def visit_node(self) -> bool:
+        """
+        记录访问一个节点，并检查是否应当停止搜索。
+        :return: 是否应当停止（已取消、超出节点数上限或到达截止时刻）
+        """
+        self.search_stats.nodes += 1
+        if self.search_control is not None and self.search_control.should_stop(self.search_stats.nodes):
+            self.search_stats.stopped = True
+            return True
+        return False
+
+    def finish_search(self, move: tuple[int, int], score: float=None) -> tuple[int, int]:
+        """
+        结束一次搜索并记录结果。
+        :param move: 选出的落子位置
+        :param score: 落子评分
+        :return: move
+        """
+        stats = self.search_stats
+        stats.end_time = time.perf_counter()
+        if self.search_control is not None:
+            self.search_control.finish()
+        if score is not None:
+            stats.score = score
+        if not stats.pv and move is not None:
+            stats.pv = [move]
+        return move
         
     @ abstractmethod
     def calculate_move(self, chessboard: Chessboard) -> tuple[int, int]:
@@ -28,6 +105,16 @@ class GomokuAI(GameAI):
     def calculate_move(self, chessboard):
         pass
 
+    def evaluate_batch(self, boards, color: str):
+        """
+        批量评估五子棋局面（需要 numpy）：双方连续棋子段按连五、活四、冲四、活三等棋型计分，返回己方总分减对方总分。
+        单个局面的结果与 PatternEvaluator.evaluate 相同。
+        :param boards: Chessboard 对象或 Chessboard.board 格式的二维列表组成的序列，或形状为 (N, size, size) 的数组
+        :param color: 评估视角的颜色（"BLACK" 或 "WHITE"）
+        :return: 形状为 (N,) 的评分数组，分数越高对 color 越有利
+        """
+        return gomoku_evaluate_batch(stack_boards(boards), color)
+
 class GomokuAILevel1(GomokuAI):
     def __init__(self, name, color):
         super().__init__(name, color)
@@ -38,20 +125,26 @@ class GomokuAILevel1(GomokuAI):
         :param chessboard: 当前棋盘对象（Chessboard 类实例）
         :return: 随机合法落子的位置 (row, col)
         """
+        self.begin_search()
         size = chessboard.get_size()
         valid_moves = []
 
-        # 遍历棋盘，找到所有合法位置
+        # 遍历棋盘，找到所有合法位置（受限时在已找到的合法位置中选择）
         for row in range(size):
             for col in range(size):
+                if valid_moves and self.visit_node():
+                    break
                 if self.rule.is_valid_move(row, col, chessboard, self.color, False)[0]:
                     valid_moves.append((row, col))
+            else:
+                continue
+            break
 
         # 从合法位置中随机选择一个
         if valid_moves:
-            return random.choice(valid_moves)
+            return self.finish_search(random.choice(valid_moves))
         else:
-            return None  # 无合法位置
+            return self.finish_search(None)  # 无合法位置
 
 class GomokuAILevel2(GomokuAI):
     def __init__(self, name, color):
@@ -69,6 +162,14 @@ class GomokuAILevel2(GomokuAI):
             - 己方的连续棋子：1 连=10 分，2 连=50 分，3 连=200 分，4 连=1000 分。
             - 对手的连续棋子：1 连=15 分，2 连=70 分，3 连=300 分，4 连=1500 分（防守权重更高）。
         """
+        stats = self.begin_search()
+        book_move = self.query_opening_book(chessboard)  # 开局库命中时直接落子
+        if book_move is not None:
+            return self.finish_search(book_move)
+        stats.depth = 1
+        if np is not None:
+            return self.calculate_move_vectorized(chessboard)
+
         size = chessboard.get_size()
         opponent_color = "BLACK" if self.color == "WHITE" else "WHITE"
         directions = [(0, 1), (1, 0), (1, 1), (1, -1)]  # 横、竖、正斜、反斜方向
@@ -115,25 +216,245 @@ class GomokuAILevel2(GomokuAI):
 
             return score
 
-        # 遍历棋盘计算每个合法位置的评分
+        # 遍历棋盘计算每个合法位置的评分（受限时返回目前评分最高的位置）
         for row in range(size):
             for col in range(size):
+                if best_move is not None and self.visit_node():
+                    return self.finish_search(best_move, max_score)
                 current_score = score_position(row, col)
                 if current_score > max_score:
                     max_score = current_score
                     best_move = (row, col)
 
-        return best_move
+        return self.finish_search(best_move, max_score)
+
+    def calculate_move_vectorized(self, chessboard: Chessboard):
+        """
+        calculate_move 的 numpy 实现：一次性计算所有空位四个方向上的己方与对手连子数，评分规则与逐格计算完全相同。
+        np.argmax 按行优先返回第一个最大值，与逐格遍历时只在严格更大时更新的选择结果一致。
+        :param chessboard: 当前棋盘对象（Chessboard 类实例）
+        :return: 最优落子的位置 (row, col)
+        """
+        scores = gomoku_level2_scores(stack_boards([chessboard]), self.color)[0]
+        self.search_stats.nodes += scores.size
+        index = int(np.argmax(scores))
+        if scores.flat[index] < 0:  # 无合法位置
+            return self.finish_search(None)
+        return self.finish_search(divmod(index, chessboard.get_size()), int(scores.flat[index]))
+
+# 搜索被时间、节点上限或取消打断
+class SearchInterrupted(Exception):
+    pass
+
+# 置换表条目类型
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+
+class GomokuAILevel3(GomokuAI):
+    def __init__(self, name, color, depth: int=3, width: int=10):
+        """
+        :param depth: 最大搜索深度（层数）
+        :param width: 每层最多展开的候选落子数
+        """
+        super().__init__(name, color)
+        self.depth = depth
+        self.width = width
+        self.transposition_table: dict[tuple[int, str], tuple[int, float, int, tuple[int, int]]] = {}
+        self.partial_best: tuple[tuple[int, int], float] = None  # 当前一轮根节点搜索中目前的最佳落子及评分
+        self.threat_solver = ThreatSolver()  # 在主搜索之前寻找 VCF/VCT 必胜序列
+
+    def calculate_move(self, chessboard: Chessboard):
+        """
+        执行五子棋三级 AI：先用威胁空间搜索（VCF/VCT）寻找必胜序列，找不到时进行基于棋型评估的迭代加深 Alpha-Beta 搜索。
+        评估器（PatternEvaluator）按连五、活四、冲四、活三等棋型打分，并在搜索中随落子/提子增量更新。
+        受时间、节点上限或取消限制时，返回目前找到的最佳落子。
+        :param chessboard: 当前棋盘对象（Chessboard 类实例）
+        :return: 最优落子的位置 (row, col)
+        """
+        stats = self.begin_search()
+        book_move = self.query_opening_book(chessboard)  # 开局库命中时直接落子
+        if book_move is not None:
+            return self.finish_search(book_move)
+
+        evaluator = PatternEvaluator(chessboard)
+        root_moves = evaluator.candidate_moves(self.color, self.width)
+        if not root_moves:
+            return self.finish_search(None)
+        for row, col in root_moves:
+            if evaluator.get_pattern(row, col, self.color) == FIVE:  # 直接取胜
+                return self.finish_search((row, col), PATTERN_SCORES[FIVE])
+
+        threat_line = self.threat_solver.solve_evaluator(evaluator, self.color, visit=self.visit_node)
+        if threat_line is not None:
+            stats.pv = threat_line
+            return self.finish_search(threat_line[0], PATTERN_SCORES[FIVE])
+
+        self.transposition_table = {}
+        best_move, best_score = root_moves[0], None
+        for depth in range(1, self.depth + 1):
+            # 上一轮的最佳落子优先搜索，因此被打断时本轮已搜索部分的最佳落子不会比上一轮差
+            root_moves.remove(best_move)
+            root_moves.insert(0, best_move)
+            try:
+                self.search_root(evaluator, depth, root_moves)
+            except SearchInterrupted:
+                if self.partial_best is not None:
+                    best_move, best_score = self.partial_best
+                    if not stats.pv or stats.pv[0] != best_move:
+                        stats.pv = [best_move]
+                break
+            best_move, best_score = self.partial_best
+            stats.depth = depth
+            stats.pv = self.principal_variation(evaluator, best_move, depth)
+            if abs(best_score) >= PATTERN_SCORES[FIVE]:  # 已找到必胜或必败
+                break
+        return self.finish_search(best_move, best_score)
+
+    def search_root(self, evaluator: PatternEvaluator, depth: int, root_moves: list[tuple[int, int]]):
+        """
+        搜索根节点的所有候选落子，结果记录在 self.partial_best 中（被打断时为已搜索部分的最佳结果）。
+        """
+        opponent_color = "BLACK" if self.color == "WHITE" else "WHITE"
+        alpha = -math.inf
+        self.partial_best = None
+        for row, col in root_moves:
+            evaluator.place(row, col, self.color)
+            try:
+                score = -self.negamax(evaluator, depth - 1, -math.inf, -alpha, opponent_color)
+            finally:
+                evaluator.remove(row, col)
+            if score > alpha or self.partial_best is None:
+                alpha = score
+                self.partial_best = ((row, col), score)
+
+    def negamax(self, evaluator: PatternEvaluator, depth: int, alpha: float, beta: float, color: str) -> float:
+        """
+        带置换表的 Alpha-Beta 剪枝负极大值搜索。
+        :param evaluator: 棋型评估器（搜索过程中原地落子/提子）
+        :param depth: 剩余深度
+        :param alpha: 下界
+        :param beta: 上界
+        :param color: 当前行棋方颜色
+        :return: 对当前行棋方而言的局面评分
+        """
+        if self.visit_node():
+            raise SearchInterrupted()
+        if depth == 0:
+            return evaluator.evaluate(color)
+
+        # 查询置换表
+        key = (evaluator.hash, color)
+        stats = self.search_stats
+        stats.tt_probes += 1
+        entry = self.transposition_table.get(key)
+        tt_move = None
+        if entry is not None:
+            stats.tt_hits += 1
+            entry_depth, entry_score, entry_flag, tt_move = entry
+            if entry_depth >= depth:
+                if entry_flag == TT_EXACT:
+                    return entry_score
+                if entry_flag == TT_LOWER and entry_score >= beta:
+                    return entry_score
+                if entry_flag == TT_UPPER and entry_score <= alpha:
+                    return entry_score
+
+        moves = evaluator.candidate_moves(color, self.width)
+        if not moves:  # 棋盘已满
+            return 0
+        for row, col in moves:
+            if evaluator.get_pattern(row, col, color) == FIVE:
+                return PATTERN_SCORES[FIVE] * (depth + 1)  # 越早取胜评分越高
+        if tt_move in moves:  # 置换表中的最佳落子优先搜索
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+
+        opponent_color = "BLACK" if color == "WHITE" else "WHITE"
+        original_alpha = alpha
+        best_move = None
+        for row, col in moves:
+            evaluator.place(row, col, color)
+            try:
+                score = -self.negamax(evaluator, depth - 1, -beta, -alpha, opponent_color)
+            finally:
+                evaluator.remove(row, col)
+            if score > alpha or best_move is None:
+                best_move = (row, col)
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if alpha <= original_alpha:
+            flag = TT_UPPER
+        elif alpha >= beta:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        self.transposition_table[key] = (depth, alpha, flag, best_move)
+        return alpha
+
+    def principal_variation(self, evaluator: PatternEvaluator, first_move: tuple[int, int], depth: int) -> list[tuple[int, int]]:
+        """
+        从置换表中提取主要变例。
+        :param first_move: 根节点的最佳落子
+        :param depth: 最长提取的步数
+        :return: 落子序列
+        """
+        pv = [first_move]
+        color = self.color
+        evaluator.place(first_move[0], first_move[1], color)
+        while len(pv) < depth:
+            color = "BLACK" if color == "WHITE" else "WHITE"
+            entry = self.transposition_table.get((evaluator.hash, color))
+            if entry is None or entry[3] is None or evaluator.board[entry[3][0]][entry[3][1]] is not None:
+                break
+            pv.append(entry[3])
+            evaluator.place(entry[3][0], entry[3][1], color)
+        for row, col in reversed(pv):
+            evaluator.remove(row, col)
+        return pv
 
 # 黑白棋
 class OthelloAI(GameAI):
     def __init__(self, name, color):
         super().__init__(name, color)
         self.rule: OthelloRule = OthelloRule()
+        self.tablebases = None  # 残局库（OthelloTablebases 对象），由 AI 工厂设置
     
     @ abstractmethod
     def calculate_move(self, chessboard):
         pass
+
+    def evaluate_batch(self, boards, color: str):
+        """
+        批量评估黑白棋局面（需要 numpy）：位置权重（角、边、角旁危险区域）之差加双方合法棋步数之差。
+        参数与返回值同 GomokuAI.evaluate_batch。
+        """
+        return othello_evaluate_batch(stack_boards(boards), color)
+
+    def set_tablebases(self, tablebases):
+        """
+        设置残局库。
+        :param tablebases: OthelloTablebases 对象，为 None 时不使用残局库
+        """
+        self.tablebases = tablebases
+
+    def query_tablebase(self, chessboard: Chessboard) -> tuple[int, int]:
+        """
+        在残局库中查询当前局面的完美应对。
+        :param chessboard: 当前棋盘对象
+        :return: 合法落子位置 (row, col)，没有命中时返回 None
+        """
+        if self.tablebases is None:
+            return None
+        entry = self.tablebases.lookup(chessboard, self.color)
+        if entry is None:
+            return None
+        row, col, value = entry
+        if not self.rule.is_valid_move(row, col, chessboard, self.color, False)[0]:
+            return None
+        self.search_stats.score = value
+        return row, col
     
 class OthelloAILevel1(OthelloAI):
     def __init__(self, name, color):
@@ -145,20 +466,26 @@ class OthelloAILevel1(OthelloAI):
         :param chessboard: 当前棋盘对象（Chessboard 类实例）
         :return: 随机合法落子的位置 (row, col)
         """
+        self.begin_search()
         size = chessboard.get_size()
         valid_moves = []
 
-        # 遍历棋盘，找到所有合法位置
+        # 遍历棋盘，找到所有合法位置（受限时在已找到的合法位置中选择）
         for row in range(size):
             for col in range(size):
+                if valid_moves and self.visit_node():
+                    break
                 if self.rule.is_valid_move(row, col, chessboard, self.color, False)[0]:
                     valid_moves.append((row, col))
+            else:
+                continue
+            break
 
         # 从合法位置中随机选择一个
         if valid_moves:
-            return random.choice(valid_moves)
+            return self.finish_search(random.choice(valid_moves))
         else:
-            return None  # 无合法位置
+            return self.finish_search(None)  # 无合法位置
 
 class OthelloAILevel2(OthelloAI):
     def __init__(self, name, color):
@@ -175,8 +502,17 @@ class OthelloAILevel2(OthelloAI):
         :param chessboard: 当前棋盘对象（Chessboard 类实例）
         :return: 最优落子的位置 (row, col)
         """
+        stats = self.begin_search()
+        tablebase_move = self.query_tablebase(chessboard)  # 残局库命中时直接完美应对
+        if tablebase_move is not None:
+            return self.finish_search(tablebase_move)
+        book_move = self.query_opening_book(chessboard)  # 开局库命中时直接落子
+        if book_move is not None:
+            return self.finish_search(book_move)
+        stats.depth = 1
+
         size = chessboard.get_size()
-        max_score = -1
+        max_score = -100  # 合法位置的评分可能为负（危险区域），只有非法位置的评分为 -100
         best_move = None
 
         # 评分函数的参数
@@ -221,12 +557,103 @@ class OthelloAILevel2(OthelloAI):
 
             return score
 
-        # 遍历棋盘，计算每个合法位置的评分
+        # 遍历棋盘，计算每个合法位置的评分（受限时返回目前评分最高的位置）
         for row in range(size):
             for col in range(size):
+                if best_move is not None and self.visit_node():
+                    return self.finish_search(best_move, max_score)
                 current_score = score_position(row, col)
                 if current_score > max_score:
                     max_score = current_score
                     best_move = (row, col)
 
-        return best_move
+        return self.finish_search(best_move, max_score)
+
+# 围棋
+class GoAI(GameAI):
+    def __init__(self, name, color):
+        super().__init__(name, color)
+        self.rule: GoRule = GoRule()
+
+    @ abstractmethod
+    def calculate_move(self, chessboard):
+        pass
+
+    def is_own_eye(self, row: int, col: int, chessboard: Chessboard) -> bool:
+        """
+        判断空位是否为己方的眼（上下左右都是己方棋子或棋盘边界），AI 不填自己的眼。
+        """
+        size = chessboard.get_size()
+        for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if 0 <= r < size and 0 <= c < size and chessboard.get_chess(r, c) != self.color:
+                return False
+        return True
+
+    def count_liberties(self, territory: list[tuple[int, int]], chessboard: Chessboard) -> int:
+        """
+        计算连通区域的气数。
+        """
+        size = chessboard.get_size()
+        liberties = set()
+        for row, col in territory:
+            for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                if 0 <= r < size and 0 <= c < size and chessboard.get_chess(r, c) is None:
+                    liberties.add((r, c))
+        return len(liberties)
+
+    def candidate_moves(self, chessboard: Chessboard) -> list[tuple[int, int]]:
+        """
+        列出所有合法且不填己方眼的落子（受限时返回已找到的部分）。
+        """
+        size = chessboard.get_size()
+        moves = []
+        for row in range(size):
+            for col in range(size):
+                if moves and self.visit_node():
+                    return moves
+                if not self.is_own_eye(row, col, chessboard) and self.rule.is_valid_move(row, col, chessboard, self.color, False)[0]:
+                    moves.append((row, col))
+        return moves
+
+class GoAILevel1(GoAI):
+    def __init__(self, name, color):
+        super().__init__(name, color)
+
+    def calculate_move(self, chessboard: Chessboard):
+        """
+        执行围棋一级 AI：在合法且不填己方眼的位置随机落子。
+        :param chessboard: 当前棋盘对象（Chessboard 类实例）
+        :return: 落子位置 (row, col)，没有可下的位置时返回 None（虚着）
+        """
+        self.begin_search()
+        moves = self.candidate_moves(chessboard)
+        return self.finish_search(random.choice(moves) if moves else None)
+
+class GoAILevel2(GoAI):
+    def __init__(self, name, color):
+        super().__init__(name, color)
+
+    def calculate_move(self, chessboard: Chessboard):
+        """
+        执行围棋二级 AI：贪心选择落子。
+        评分：提子数 * 10 + 落子后己方棋块的气数，只剩一气（自紧气）的落子扣分。
+        :param chessboard: 当前棋盘对象（Chessboard 类实例）
+        :return: 落子位置 (row, col)，没有可下的位置时返回 None（虚着）
+        """
+        self.begin_search()
+        best_moves, max_score = [], -math.inf
+        for row, col in self.candidate_moves(chessboard):
+            if best_moves and self.visit_node():  # 受限时至少评估一个候选，返回当前最好的落子
+                break
+            chessboard.set_chess(row, col, self.color)  # 暂时落子
+            captured = self.rule.get_curr_capture(row, col, chessboard)
+            liberties = self.count_liberties(self.rule.get_territory(row, col, chessboard), chessboard)
+            chessboard.set_chess(row, col, None)
+            score = len(captured) * 10 + liberties - (20 if liberties <= 1 and not captured else 0)
+            if score > max_score:
+                best_moves, max_score = [(row, col)], score
+            elif score == max_score:
+                best_moves.append((row, col))
+        if not best_moves:
+            return self.finish_search(None)
+        return self.finish_search(random.choice(best_moves), max_score)
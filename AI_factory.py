@@ -1,5 +1,9 @@
 from abc import ABC, abstractmethod
 from AI import *
+from commons import *
+from opening_book import OpeningBook
+from othello_solver import OthelloTablebases
+import os
 
 # 抽象工厂
 class AIFactory(ABC):
@@ -7,6 +11,26 @@ class AIFactory(ABC):
     抽象工厂类，定义创建 AI 的接口。
     不同的具体工厂将根据游戏类型（如五子棋、黑白棋）创建对应的 AI。
     """
+    def __init__(self, book_path: str=None, time_limit: float=AI_TIME_LIMIT, node_limit: int=None):
+        """
+        :param book_path: 开局库文件路径，为 None 或文件不存在时不使用开局库
+        :param time_limit: 每步搜索的时间上限（秒），为 None 时不限
+        :param node_limit: 每步搜索的节点数上限，为 None 时不限
+        """
+        self.book_path = book_path
+        self.opening_book: OpeningBook = None  # 首次使用时打开，由本工厂创建的所有 AI 共享
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+
+    def get_opening_book(self) -> OpeningBook:
+        """
+        获取开局库（延迟打开）。
+        :return: OpeningBook 对象，不可用时返回 None
+        """
+        if self.opening_book is None and self.book_path is not None and os.path.exists(self.book_path):
+            self.opening_book = OpeningBook(self.book_path)
+        return self.opening_book
+
     @abstractmethod
     def createAI(self, level, color):
         """
@@ -22,6 +46,9 @@ class GomokuAIFactory(AIFactory):
     """
     五子棋 AI 工厂，负责创建五子棋的 AI。
     """
+    def __init__(self, book_path: str=GOMOKU_BOOK_PATH, time_limit: float=AI_TIME_LIMIT, node_limit: int=None):
+        super().__init__(book_path, time_limit, node_limit)
+
     def createAI(self, level, color):
         """
         创建五子棋的具体 AI 对象。
@@ -31,17 +58,30 @@ class GomokuAIFactory(AIFactory):
         """
         name = f"GomokuAI-L{level}"
         if level == 1:
-            return GomokuAILevel1(name, color)
+            AI = GomokuAILevel1(name, color)
         elif level == 2:
-            return GomokuAILevel2(name, color)
+            AI = GomokuAILevel2(name, color)
+        elif level == 3:
+            AI = GomokuAILevel3(name, color)
         else:
             raise ValueError("Unsupported AI level for Gomoku.")
+        AI.set_opening_book(self.get_opening_book())  # 搜索前先查询开局库
+        AI.set_search_control(SearchControl(self.time_limit, self.node_limit))  # 每个 AI 独立的时间、节点上限与取消标记
+        return AI
 
 # 具体工厂（黑白棋 AI）
 class OthelloAIFactory(AIFactory):
     """
     黑白棋 AI 工厂，负责创建黑白棋的 AI。
     """
+    def __init__(self, book_path: str=OTHELLO_BOOK_PATH, time_limit: float=AI_TIME_LIMIT, node_limit: int=None,
+                 tablebase_path: str=OTHELLO_TABLEBASE_PATH):
+        """
+        :param tablebase_path: 残局库路径模板（按棋盘大小延迟打开），为 None 时不使用残局库
+        """
+        super().__init__(book_path, time_limit, node_limit)
+        self.tablebases = OthelloTablebases(tablebase_path) if tablebase_path is not None else None
+
     def createAI(self, level, color):
         """
         创建黑白棋的具体 AI 对象。
@@ -51,8 +91,37 @@ class OthelloAIFactory(AIFactory):
         """
         name = f"OthelloAI-L{level}"
         if level == 1:
-            return OthelloAILevel1(name, color)
+            AI = OthelloAILevel1(name, color)
         elif level == 2:
-            return OthelloAILevel2(name, color)
+            AI = OthelloAILevel2(name, color)
         else:
             raise ValueError("Unsupported AI level for Othello.")
+        AI.set_opening_book(self.get_opening_book())  # 搜索前先查询开局库
+        AI.set_search_control(SearchControl(self.time_limit, self.node_limit))  # 每个 AI 独立的时间、节点上限与取消标记
+        AI.set_tablebases(self.tablebases)  # 小棋盘上优先使用残局库完美应对
+        return AI
+
+# 具体工厂（围棋 AI）
+class GoAIFactory(AIFactory):
+    """
+    围棋 AI 工厂，负责创建围棋的 AI（围棋没有开局库）。
+    """
+    def __init__(self, time_limit: float=AI_TIME_LIMIT, node_limit: int=None):
+        super().__init__(None, time_limit, node_limit)
+
+    def createAI(self, level, color):
+        """
+        创建围棋的具体 AI 对象。
+        :param level: AI 等级
+        :param color: AI 的颜色（"BLACK" 或 "WHITE"）
+        :return: 围棋 AI 对象
+        """
+        name = f"GoAI-L{level}"
+        if level == 1:
+            AI = GoAILevel1(name, color)
+        elif level == 2:
+            AI = GoAILevel2(name, color)
+        else:
+            raise ValueError("Unsupported AI level for Go.")
+        AI.set_search_control(SearchControl(self.time_limit, self.node_limit))  # 每个 AI 独立的时间、节点上限与取消标记
+        return AI
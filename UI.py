@@ -4,7 +4,492 @@ from commons import *
 from chessboard import *
 import os
 import string
+import time
 from abc import abstractmethod
+from asset_cache import *
+
+def wrap_text(text: str, width: int, size: int=FONT_SIZE) -> list[str]:
+    """
+    按宽度将文字自动换行（用 font.size 测量宽度，不需要渲染）。
+    :param text: 文字内容
+    :param width: 每行的最大宽度（像素）
+    :param size: 字号
+    :return: 各行文字
+    """
+    font = get_font(size)
+    lines = []
+    current_line = ""
+    for word in text.split(' '):
+        test_line = f"{current_line} {word}" if current_line else word
+        if current_line and font.size(test_line)[0] > width:
+            lines.append(current_line.strip())
+            current_line = word
+        else:
+            current_line = test_line
+    if current_line:
+        lines.append(current_line.strip())
+    return lines
+
+# 目录内容缓存
+class DirectoryListing():
+    """
+    用 os.scandir 一次取得目录中各项的名称与类型，只在目录的修改时间变化时重新读取。
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime: int = None  # 上次读取时目录的修改时间（纳秒）
+        self.entries: list[tuple[str, bool]] = []  # (名称, 是否为目录)，目录在前，按名称排序
+
+    def refresh(self) -> list[tuple[str, bool]]:
+        """
+        目录发生变化（或尚未读取）时重新读取。
+        :return: 目录内容，路径不是目录时为空
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is None or not os.path.isdir(self.path):
+            self.mtime, self.entries = None, []
+        elif mtime != self.mtime:
+            entries = []
+            with os.scandir(self.path) as iterator:
+                for entry in iterator:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    entries.append((entry.name, is_dir))
+            entries.sort(key=lambda item: (not item[1], item[0]))
+            self.mtime, self.entries = mtime, entries
+        return self.entries
+
+_listings: dict[str, DirectoryListing] = {}  # 按路径缓存的目录内容（进程内共享）
+
+def get_listing(path: str) -> DirectoryListing:
+    """
+    获取指定目录的内容缓存。
+    """
+    path = os.path.normpath(path)
+    if path not in _listings:
+        _listings[path] = DirectoryListing(path)
+    return _listings[path]
+
+def draw_button_on(surface: pygame.Surface, text: str, rect: pygame.Rect, bg_color=WHITE, text_color=BLACK, size: int=FONT_SIZE):
+    """
+    在指定 Surface 上绘制按钮（背景矩形与居中的文字）。
+    """
+    pygame.draw.rect(surface, bg_color, rect)
+    text_rendered = render_text(text, text_color, size)
+    surface.blit(text_rendered, (rect.x + (rect.width - text_rendered.get_width()) // 2, rect.y + (rect.height - text_rendered.get_height()) // 2))
+
+# 模态对话框（保留模式）
+class Dialog():
+    """
+    对话框只在打开时和处理输入之后重绘，空闲时阻塞在 pygame.event.wait 上，不占用 CPU。
+    子类实现 render 绘制对话框内容，在 on_click / on_key 中处理输入，并调用 close 给出结果。
+    """
+    def __init__(self, screen: pygame.Surface, rect: pygame.Rect=None, restore: bool=False):
+        """
+        :param screen: 屏幕 Surface
+        :param rect: 对话框在屏幕上的区域，为 None 时占满屏幕
+        :param restore: 关闭时是否恢复对话框下方原来的画面（浮窗使用，关闭后不需要重绘棋盘）
+        """
+        self.screen = screen
+        self.rect = rect if rect is not None else screen.get_rect()
+        self.surface = pygame.Surface(self.rect.size)
+        self.restore = restore
+        self.running = True
+        self.result = None
+
+    def close(self, result=None):
+        """
+        关闭对话框。
+        :param result: run 的返回值
+        """
+        self.result = result
+        self.running = False
+
+    def run(self):
+        """
+        显示对话框并处理输入，直到对话框关闭。
+        :return: 对话框的结果
+        """
+        saved = self.screen.subsurface(self.rect).copy() if self.restore else None
+        dirty = True  # 是否需要重绘
+        while self.running:
+            if dirty:
+                dirty = False
+                self.render(self.surface)
+                self.screen.blit(self.surface, self.rect)
+                pygame.display.update(self.rect)
+            event = pygame.event.wait()
+            if event.type == pygame.QUIT or event.type == pygame.WINDOWCLOSE:
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 2, 3):  # 4、5 为滚轮产生的按键事件
+                self.on_click((event.pos[0] - self.rect.x, event.pos[1] - self.rect.y))
+                dirty = True
+            elif event.type == pygame.MOUSEWHEEL:
+                self.on_wheel(event.y)
+                dirty = True
+            elif event.type == pygame.KEYDOWN:
+                self.on_key(event)
+                dirty = True
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                dirty = True
+        if saved is not None:
+            self.screen.blit(saved, self.rect)
+            pygame.display.update(self.rect)
+        return self.result
+
+    @ abstractmethod
+    def render(self, surface: pygame.Surface):
+        """
+        绘制对话框内容。
+        :param surface: 对话框 Surface（坐标相对于对话框左上角）
+        """
+        pass
+
+    def on_click(self, pos: tuple[int, int]):
+        """
+        处理鼠标点击。
+        :param pos: 相对于对话框左上角的点击位置
+        """
+        pass
+
+    def on_key(self, event: pygame.event.Event):
+        """
+        处理按键。
+        """
+        pass
+
+    def on_wheel(self, steps: int):
+        """
+        处理鼠标滚轮。
+        :param steps: 向上滚动的格数（向下为负）
+        """
+        pass
+
+# 消息浮窗
+class MessageDialog(Dialog):
+    def __init__(self, screen: pygame.Surface, rect: pygame.Rect, message: str, text_color=RED):
+        super().__init__(screen, rect, restore=True)
+        self.message = message
+        self.text_color = text_color
+        self.text_margin = 20
+        self.line_height = 20  # 每行文本的高度
+        self.y_offset = 50  # 文本从顶部偏移的初始位置
+        self.lines = wrap_text(message, self.rect.width - 2 * self.text_margin, SMALL_FONT_SIZE)  # 自动换行
+        self.button_rect = pygame.Rect(250, 350, 100, 40)
+
+    def render(self, surface):
+        surface.fill(WHITE)
+        pygame.draw.rect(surface, BLACK, surface.get_rect(), 2)
+        if len(self.lines) == 1:
+            # 居中绘制
+            message_text = render_text(self.message, self.text_color, SMALL_FONT_SIZE)
+            surface.blit(message_text, ((surface.get_width() - message_text.get_width()) // 2, (surface.get_height() - message_text.get_height()) // 2))
+        else:
+            current_y = self.y_offset
+            for line in self.lines:
+                surface.blit(render_text(line, self.text_color, SMALL_FONT_SIZE), (self.text_margin, current_y))
+                current_y += self.line_height
+        draw_button_on(surface, "Got it", self.button_rect, BLUE, WHITE, SMALL_FONT_SIZE)
+
+    def on_click(self, pos):
+        if self.button_rect.collidepoint(pos):
+            self.close()
+
+# 全屏选项菜单（如选择游戏）
+class MenuDialog(Dialog):
+    def __init__(self, screen: pygame.Surface, title: str, options: list[str]):
+        super().__init__(screen)
+        self.title = title
+        self.buttons = [(option, pygame.Rect(SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, BUTTON_TOP + index * BUTTON_INTERVAL, BUTTON_WIDTH, BUTTON_HEIGHT))
+                        for index, option in enumerate(options)]
+
+    def render(self, surface):
+        surface.fill(BLACK)
+        title = render_text(self.title, RED)
+        surface.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, SCREEN_HEIGHT // 3))
+        for option, rect in self.buttons:
+            draw_button_on(surface, option, rect)
+
+    def on_click(self, pos):
+        for option, rect in self.buttons:
+            if rect.collidepoint(pos):
+                self.close(option)
+
+# 棋盘大小选择界面
+class BoardSizeDialog(Dialog):
+    def __init__(self, screen: pygame.Surface, sizes: list[str]):
+        super().__init__(screen)
+        self.display_options = False  # 是否显示选项
+        self.button_choose_size = pygame.Rect(SCREEN_WIDTH // 2 - 1.5 * BUTTON_WIDTH // 2, 150, 1.5 * BUTTON_WIDTH, BUTTON_HEIGHT)
+        self.options = [(option, pygame.Rect(SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, 220 + index * (OPTION_HEIGHT + 5), BUTTON_WIDTH, OPTION_HEIGHT))
+                        for index, option in enumerate(sizes)]
+
+    def render(self, surface):
+        surface.fill(BLACK)
+        draw_button_on(surface, "Choose board size", self.button_choose_size)
+        if self.display_options:
+            for option, rect in self.options:
+                draw_button_on(surface, option, rect)
+
+    def on_click(self, pos):
+        if self.button_choose_size.collidepoint(pos):
+            self.display_options = not self.display_options  # 切换选项显示状态
+        elif self.display_options:
+            for option, rect in self.options:
+                if rect.collidepoint(pos):
+                    self.close(int(option))
+
+# 胜者界面
+class WinnerDialog(Dialog):
+    def __init__(self, screen: pygame.Surface, winner: str):
+        super().__init__(screen)
+        self.message = f"{winner} win! Press ENTER to continue." if winner else "Draw!"
+        self.show_buttons = False  # 按下 ENTER 后显示按钮
+        self.button_new_game = pygame.Rect(SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, BUTTON_TOP, BUTTON_WIDTH, BUTTON_HEIGHT)
+        self.button_end_game = pygame.Rect(SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, BUTTON_TOP + BUTTON_INTERVAL, BUTTON_WIDTH, BUTTON_HEIGHT)
+
+    def render(self, surface):
+        surface.fill(BLACK)
+        message = render_text(self.message, RED)
+        surface.blit(message, (SCREEN_WIDTH // 2 - message.get_width() // 2, SCREEN_HEIGHT // 3))
+        if self.show_buttons:
+            draw_button_on(surface, "New Game", self.button_new_game)
+            draw_button_on(surface, "Exit", self.button_end_game)
+
+    def on_key(self, event):
+        if event.key == pygame.K_RETURN:
+            self.show_buttons = True
+
+    def on_click(self, pos):
+        if not self.show_buttons:
+            return
+        if self.button_new_game.collidepoint(pos):
+            self.close(True)
+        elif self.button_end_game.collidepoint(pos):
+            self.close(False)
+
+# 玩家选择浮窗
+class PlayerDialog(Dialog):
+    """
+    第一步选择玩家类型（已注册用户，未注册用户，游客，AI）；
+    第二步输入账号、密码，或选择 AI 等级。
+    """
+    def __init__(self, screen: pygame.Surface, rect: pygame.Rect, AI_available: bool, AI_levels: list[str]):
+        super().__init__(screen, rect, restore=True)
+        self.AI_available = AI_available
+        self.AI_levels = AI_levels
+        self.player_type = None  # 玩家类型
+        self.input_active = {"username": False, "password": False}
+        self.input_texts = {"username": "", "password": ""}
+
+        # 按钮定义
+        self.button_registered = pygame.Rect(50, 50, 300, 40)
+        self.button_unregistered = pygame.Rect(50, 100, 300, 40)
+        self.button_guest = pygame.Rect(50, 150, 300, 40)
+        self.button_AI = pygame.Rect(50, 200, 300, 40)
+        self.button_confirm = pygame.Rect(250, 350, 100, 40)
+
+        # 输入框定义
+        self.input_username = pygame.Rect(50, 50, 300, 40)
+        self.input_password = pygame.Rect(50, 130, 300, 40)
+
+        # AI等级选项
+        self.ai_buttons = [pygame.Rect(50, 50 + 50 * i, 200, 40) for i in range(len(AI_levels))]
+
+    def render(self, surface):
+        surface.fill(WHITE)
+        pygame.draw.rect(surface, BLACK, surface.get_rect(), 2)
+
+        # 第一弹窗：选择玩家类型
+        if self.player_type is None:
+            pygame.draw.rect(surface, GRAY, self.button_registered)
+            pygame.draw.rect(surface, GRAY, self.button_unregistered)
+            pygame.draw.rect(surface, GRAY, self.button_guest)
+            surface.blit(render_text("Registered User", BLACK), (60, 55))
+            surface.blit(render_text("Unregistered User", BLACK), (60, 105))
+            surface.blit(render_text("Guest", BLACK), (60, 155))
+            if self.AI_available:
+                pygame.draw.rect(surface, GRAY, self.button_AI)
+                surface.blit(render_text("AI", BLACK), (60, 205))
+
+        # 第二弹窗：已注册或未注册用户
+        elif self.player_type in ["registered", "unregistered"]:
+            username_color = WHITE if self.input_active["username"] else BLACK
+            password_color = WHITE if self.input_active["password"] else BLACK
+            pygame.draw.rect(surface, BLUE if self.input_active["username"] else GRAY, self.input_username)
+            pygame.draw.rect(surface, BLUE if self.input_active["password"] else GRAY, self.input_password)
+            draw_button_on(surface, "Confirm", self.button_confirm, BLUE, WHITE, SMALL_FONT_SIZE)
+            surface.blit(render_text("Username:", BLACK), (50, 20))
+            surface.blit(render_text(self.input_texts["username"], username_color), (55, 55))
+            surface.blit(render_text("Password:", BLACK), (50, 100))
+            surface.blit(render_text(self.input_texts["password"], password_color), (55, 135))
+
+        # 第二弹窗：AI选择等级
+        elif self.player_type == "AI":
+            for i, button in enumerate(self.ai_buttons):
+                pygame.draw.rect(surface, GRAY, button)
+                surface.blit(render_text(self.AI_levels[i], BLACK), (button.x + 10, button.y + 5))
+
+    def on_click(self, pos):
+        # 第一弹窗选择玩家类型
+        if self.player_type is None:
+            if self.button_registered.collidepoint(pos):
+                self.player_type = "registered"
+            elif self.button_unregistered.collidepoint(pos):
+                self.player_type = "unregistered"
+            elif self.button_guest.collidepoint(pos):
+                self.close((True, False, False, "", "", None))
+            elif self.AI_available and self.button_AI.collidepoint(pos):
+                self.player_type = "AI"
+
+        # 第二弹窗输入信息
+        elif self.player_type in ["registered", "unregistered"]:
+            self.input_active["username"] = self.input_username.collidepoint(pos)
+            self.input_active["password"] = self.input_password.collidepoint(pos)
+            # 点击确认键退出
+            if self.button_confirm.collidepoint(pos):
+                self.close((False, False, self.player_type == "registered", self.input_texts["username"], self.input_texts["password"], None))
+
+        elif self.player_type == "AI":
+            for i, button in enumerate(self.ai_buttons):
+                if button.collidepoint(pos):
+                    self.close((False, True, False, "", "", i + 1))
+
+    def on_key(self, event):
+        if self.player_type not in ["registered", "unregistered"]:
+            return
+        for field in ("username", "password"):
+            if self.input_active[field]:
+                if event.key == pygame.K_BACKSPACE:
+                    self.input_texts[field] = self.input_texts[field][:-1]
+                else:
+                    self.input_texts[field] += event.unicode
+
+# 文件选择浮窗
+class FileDialog(Dialog):
+    """
+    浏览目录并输入文件名。目录内容来自 DirectoryListing 缓存，只绘制可见的几行，可以用滚轮、方向键或滚动条滚动。
+    """
+    def __init__(self, screen: pygame.Surface, rect: pygame.Rect, current_dir: str, is_store: bool):
+        super().__init__(screen, rect)
+        self.current_dir = current_dir
+        self.is_store = is_store
+        self.scroll = 0  # 第一个可见项的序号
+        self.input_text = ""
+        self.active = False  # 输入框是否激活
+        self.error: str = None  # 提示信息
+
+        # 输入框与按钮
+        self.input_box = pygame.Rect(50, 300, 500, 40)
+        self.button_rect = pygame.Rect(250, 350, 100, 40)
+        self.cancel_button_rect = pygame.Rect(360, 350, 100, 40)
+
+        # 目录内容区域
+        self.list_top = 50
+        self.visible_items = min(VISIBLE_ITEMS, (self.input_box.y - self.list_top) // ITEM_HEIGHT)
+        self.list_rect = pygame.Rect(50, self.list_top, 500, self.visible_items * ITEM_HEIGHT)
+        self.scrollbar_rect = pygame.Rect(555, self.list_top, 10, self.visible_items * ITEM_HEIGHT)
+
+    def entries(self) -> list[tuple[str, bool]]:
+        return get_listing(self.current_dir).refresh()
+
+    def scroll_to(self, scroll: int):
+        """
+        滚动到指定位置（限制在有效范围内）。
+        """
+        self.scroll = max(0, min(scroll, len(self.entries()) - self.visible_items))
+
+    def render(self, surface):
+        surface.fill(WHITE)
+        pygame.draw.rect(surface, BLACK, surface.get_rect(), 2)
+
+        # 标题
+        surface.blit(render_text(f"Current Directory: {self.current_dir}", BLACK, SMALL_FONT_SIZE), (50, 20))
+
+        # 只绘制可见的目录项
+        entries = self.entries()
+        self.scroll_to(self.scroll)
+        for i, (name, is_dir) in enumerate(entries[self.scroll:self.scroll + self.visible_items]):
+            entry_rect = pygame.Rect(self.list_rect.x, self.list_top + i * ITEM_HEIGHT, self.list_rect.width, ITEM_HEIGHT)
+            pygame.draw.rect(surface, GRAY if is_dir else LIGHT_GRAY, entry_rect)
+            surface.blit(render_text(name, BLACK, SMALL_FONT_SIZE), (entry_rect.x + 5, entry_rect.y + 5))
+
+        # 滚动条
+        if len(entries) > self.visible_items:
+            pygame.draw.rect(surface, LIGHT_GRAY, self.scrollbar_rect)
+            thumb_height = max(self.scrollbar_rect.height * self.visible_items // len(entries), 10)
+            thumb_top = self.scrollbar_rect.y + (self.scrollbar_rect.height - thumb_height) * self.scroll // (len(entries) - self.visible_items)
+            pygame.draw.rect(surface, GRAY, (self.scrollbar_rect.x, thumb_top, self.scrollbar_rect.width, thumb_height))
+
+        # 输入框
+        pygame.draw.rect(surface, WHITE, self.input_box)
+        pygame.draw.rect(surface, BLUE if self.active else BLACK, self.input_box, 2)
+        surface.blit(render_text(self.input_text, BLACK, SMALL_FONT_SIZE), (self.input_box.x + 5, self.input_box.y + 5))
+
+        if self.error is not None:
+            surface.blit(render_text(self.error, RED, SMALL_FONT_SIZE), (40, 360))
+
+        # 确认与取消按钮
+        draw_button_on(surface, "Confirm", self.button_rect, BLUE, WHITE, SMALL_FONT_SIZE)
+        draw_button_on(surface, "Cancel", self.cancel_button_rect, GRAY, BLACK, SMALL_FONT_SIZE)
+
+    def on_click(self, pos):
+        self.error = None
+        self.active = self.input_box.collidepoint(pos)  # 点击输入框
+
+        # 点击确认按钮
+        if self.button_rect.collidepoint(pos):
+            input_text = self.input_text.strip()
+            if not input_text and self.is_store:
+                self.error = "Enter a file name!"
+            else:
+                self.close(os.path.join(self.current_dir, input_text) if input_text else self.current_dir)
+
+        # 点击取消按钮
+        elif self.cancel_button_rect.collidepoint(pos):
+            self.close()
+
+        # 点击滚动条：按点击位置跳转
+        elif self.scrollbar_rect.collidepoint(pos):
+            ratio = (pos[1] - self.scrollbar_rect.y) / self.scrollbar_rect.height
+            self.scroll_to(int(ratio * len(self.entries())) - self.visible_items // 2)
+
+        # 点击目录项
+        elif self.list_rect.collidepoint(pos):
+            index = self.scroll + (pos[1] - self.list_top) // ITEM_HEIGHT
+            entries = self.entries()
+            if index < len(entries):
+                name, is_dir = entries[index]
+                if is_dir or not self.is_store:
+                    self.current_dir = os.path.join(self.current_dir, name)
+                    self.scroll = 0
+
+    def on_wheel(self, steps: int):
+        self.scroll_to(self.scroll - steps * 3)
+
+    def on_key(self, event):
+        if self.active:
+            if event.key == pygame.K_BACKSPACE:
+                self.input_text = self.input_text[:-1]
+            elif event.key == pygame.K_RETURN:
+                self.active = False
+            elif event.unicode and event.unicode in string.printable:
+                self.input_text += event.unicode
+            return
+        # 输入框未激活时用按键滚动
+        steps = {pygame.K_UP: -1, pygame.K_DOWN: 1, pygame.K_PAGEUP: -self.visible_items, pygame.K_PAGEDOWN: self.visible_items}
+        if event.key in steps:
+            self.scroll_to(self.scroll + steps[event.key])
+        elif event.key == pygame.K_HOME:
+            self.scroll_to(0)
+        elif event.key == pygame.K_END:
+            self.scroll_to(len(self.entries()))
 
 # UI模板
 class UITemplate():
@@ -14,18 +499,20 @@ class UITemplate():
 
     def __init__(self):
         """
-        初始化 UI 模板，包括窗口设置、字体加载和背景图片加载。
+        初始化 UI 模板：只初始化显示模块并复用已创建的窗口，字体与背景图片在首次使用时加载。
         """
-        pygame.init()
-        pygame.font.init()
-        
-        self.FONT = pygame.font.SysFont(None, 40)  # 设置字体大小
-        self.SMALLFONT = pygame.font.SysFont(None, 30)  # 设置字体大小
-        
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))  # 创建窗口
-        pygame.display.set_caption("Chess Game Platform")  # 设置窗口标题
-        self.background_image = pygame.transform.scale(pygame.image.load("pics/backgroud.jpeg"), (SCREEN_WIDTH, SCREEN_HEIGHT))
+        if not pygame.display.get_init():
+            pygame.display.init()
+        self.screen = pygame.display.get_surface()
+        if self.screen is None:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))  # 创建窗口
+            pygame.display.set_caption("Chess Game Platform")  # 设置窗口标题
         
+        self.clock = pygame.time.Clock()  # 限制重绘帧率
+        self.drawn_board: list[list[str]] = None  # 屏幕上当前显示的棋子，为 None 时下次完整重绘
+        self.drawn_sidebar: tuple = None  # 屏幕上当前显示的右侧面板内容
+        self.sidebar_rect = pygame.Rect(COMMON_BUTTON_LEFT, 0, SCREEN_WIDTH - COMMON_BUTTON_LEFT, SCREEN_HEIGHT)  # 右侧面板区域
+
         self.popup_width, self.popup_height = 600, 400
         self.popup_surface = pygame.Surface((self.popup_width, self.popup_height))
         self.popup_rect = self.popup_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
@@ -42,23 +529,54 @@ class UITemplate():
         self.button_playback = None  # "回放" 按钮
         
         self.AI_available = False  # 是否提供 AI 玩家
+        self.AI_levels: list[str] = ["Level 1", "Level 2"]  # 可选的 AI 等级
         self.valid_chessboard_size: list[str] = None  # 可选的棋盘大小
         
-    def detect_event(self):
+    @property
+    def FONT(self) -> pygame.font.Font:
+        return get_font(FONT_SIZE)
+
+    @property
+    def SMALLFONT(self) -> pygame.font.Font:
+        return get_font(SMALL_FONT_SIZE)
+
+    @property
+    def background_image(self) -> pygame.Surface:
+        return get_background()
+
+    def detect_event(self, timeout: int=None):
         """
-        检测鼠标或键盘事件。
-        :return: 返回事件类型及相关数据，如果是退出事件则退出程序。
+        等待下一个鼠标点击或键盘事件。没有事件时阻塞等待而不是反复轮询；
+        每次只取出一个事件，队列中其余的事件留给之后的调用处理，不会被丢弃。
+        :param timeout: 最长等待时间（毫秒，从调用时算起，期间被忽略的事件如鼠标移动不会重新计时），为 None 时一直等待
+        :return: 返回事件类型及相关数据；窗口需要重绘或等待超时时返回 None；如果是退出事件则退出程序。
         """
-        event = pygame.event.get()
-        if len(event) > 0:
-            event = event[0]
+        deadline = None if timeout is None else time.monotonic() + timeout / 1000
+        while True:
+            if deadline is None:
+                event = pygame.event.wait()
+            else:
+                remaining = int((deadline - time.monotonic()) * 1000)
+                if remaining <= 0:
+                    return None
+                event = pygame.event.wait(remaining)
+            if event.type == pygame.NOEVENT:
+                return None
             if event.type == pygame.QUIT or event.type == pygame.WINDOWCLOSE:
                 pygame.quit()
                 sys.exit()
             elif event.type == pygame.KEYDOWN:
                 return pygame.KEYDOWN, event.key
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                return pygame.MOUSEBUTTONDOWN, pygame.mouse.get_pos()
+                return pygame.MOUSEBUTTONDOWN, event.pos
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                return None
+
+    def limit_frame_rate(self):
+        """
+        重绘前调用：距上次重绘不足一帧时等待，使每秒重绘次数不超过 FRAME_RATE。
+        """
+        self.clock.tick(FRAME_RATE)
              
     def draw_button(self, text, left, top, width=BUTTON_WIDTH, height=BUTTON_HEIGHT, bg_color=WHITE, text_color=BLACK, update=True) -> pygame.Rect:
         """
@@ -75,7 +593,7 @@ class UITemplate():
         """
         button = pygame.Rect(left, top, width, height)  # 创建按钮矩形
         pygame.draw.rect(self.screen, bg_color, button)  # 绘制按钮背景
-        text_rendered = self.FONT.render(text, True, text_color)  # 渲染按钮文字
+        text_rendered = render_text(text, text_color)  # 渲染按钮文字
         # 将文字居中显示在按钮上
         self.screen.blit(text_rendered, (left + (width - text_rendered.get_width()) // 2, top + (height - text_rendered.get_height()) // 2))
         
@@ -92,7 +610,7 @@ class UITemplate():
         :param left: 消息左边位置（默认居中）
         :param top: 消息顶部位置（默认在屏幕顶部1/3处）
         """
-        message = self.FONT.render(text, True, color)  # 渲染消息文字
+        message = render_text(text, color)  # 渲染消息文字
         if left is None:
             left = SCREEN_WIDTH // 2 - message.get_width() // 2
         if top is None:
@@ -101,122 +619,116 @@ class UITemplate():
 
     def choose_game(self):
         """
-        显示游戏选择界面，允许用户选择五子棋或围棋。
-        :return: 用户选择的游戏名称 ("Gomoku" 或 "Go")
+        显示游戏选择界面，允许用户选择五子棋、围棋或黑白棋。
+        :return: 用户选择的游戏名称 ("Gomoku"、"Go" 或 "Othello")
         """
-        self.screen.fill(BLACK)
-        self.display_message("Choose a Game")
-        
-        while True:
-            button_gomoku = self.draw_button("Gomoku", SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, BUTTON_TOP, BUTTON_WIDTH, BUTTON_HEIGHT)
-            button_go = self.draw_button("Go", SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, BUTTON_TOP + BUTTON_INTERVAL, BUTTON_WIDTH, BUTTON_HEIGHT)
-            button_othello = self.draw_button("Othello", SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, BUTTON_TOP + 2 * BUTTON_INTERVAL, BUTTON_WIDTH, BUTTON_HEIGHT)
-            pygame.display.flip()
-            
-            event = self.detect_event()
-            if event is not None:
-                event_type, event_val = event
-                if event_type == pygame.MOUSEBUTTONDOWN:
-                    mouse_pos = event_val
-                    if button_gomoku.collidepoint(mouse_pos):
-                        return "Gomoku"
-                    elif button_go.collidepoint(mouse_pos):
-                        return "Go"
-                    elif button_othello.collidepoint(mouse_pos):
-                        return "Othello"
-                    
+        self.invalidate_board()  # 覆盖棋盘画面
+        return MenuDialog(self.screen, "Choose a Game", ["Gomoku", "Go", "Othello"]).run()
+
     def choose_board_size(self):
         """
         显示棋盘大小选择界面。
         :return: 用户选择的棋盘大小
         """
-        button_choose_size = self.draw_button("Choose board size", SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, 150, bg_color=BLACK, text_color=WHITE)
-        display_options = False  # 是否显示选项
-        
-        while True:
-            self.screen.fill(BLACK)
-  
-            button_choose_size = self.draw_button("Choose board size", SCREEN_WIDTH // 2 - 1.5 * BUTTON_WIDTH // 2, 150, width=1.5 * BUTTON_WIDTH, update=False)
-            
-            if display_options:
-                # 绘制大小选项按钮
-                for index, option in enumerate(self.valid_chessboard_size):
-                    self.draw_button(option, SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, 220 + (index * (OPTION_HEIGHT + 5)), height=OPTION_HEIGHT, update=False)
-            
-            pygame.display.flip()
-            
-            event = self.detect_event()
-            if event is not None:
-                event_type, event_val = event
-                if event_type == pygame.MOUSEBUTTONDOWN:
-                    mouse_pos = event_val
-                    
-                    if button_choose_size.collidepoint(mouse_pos):
-                        display_options = not display_options  # 切换选项显示状态
-                        
-                    if display_options:
-                        for index, option in enumerate(self.valid_chessboard_size):
-                            button_option = self.draw_button(option, SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, 220 + (index * (OPTION_HEIGHT + 5)), update=False)
-                            if button_option.collidepoint(mouse_pos):
-                                return int(option)
+        self.invalidate_board()  # 覆盖棋盘画面
+        return BoardSizeDialog(self.screen, self.valid_chessboard_size).run()
+
+    def choose_resume(self) -> bool:
+        """
+        发现自动保存的未完成对局时，询问是否继续该对局。
+        :return: True 表示继续，False 表示开始新的对局
+        """
+        self.invalidate_board()  # 覆盖棋盘画面
+        return MenuDialog(self.screen, "Resume the unfinished game?", ["Resume", "New Game"]).run() == "Resume"
 
     def show_winner(self, winner: str):
         """
         显示获胜者信息，并提供重新开始和退出选项。
         :param winner: 获胜方的名称 ("BLACK" 或 "WHITE")，平局时为 None
+        :return: True 表示开始新游戏，False 表示退出
         """
-        self.screen.fill(BLACK)
-        self.display_message(f"{winner} win! Press ENTER to continue." if winner else "Draw!")  # 显示获胜信息
+        self.invalidate_board()  # 覆盖棋盘画面
+        return WinnerDialog(self.screen, winner).run()
 
-        button_new_game = button_end_game = None  # 按钮初始化
-        
-        while True:
-            event = self.detect_event()
-            if event is not None:
-                event_type, event_val = event
-                if event_type == pygame.KEYDOWN:
-                    key = event_val
-                    if key == pygame.K_RETURN:
-                        button_new_game = self.draw_button("New Game", SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, BUTTON_TOP)
-                        button_end_game = self.draw_button("Exit", SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, BUTTON_TOP + BUTTON_INTERVAL)
-                
-                if button_new_game is not None and button_end_game is not None:
-                    if event_type == pygame.MOUSEBUTTONDOWN:
-                        mouse_pos = event_val
-                        if button_new_game.collidepoint(mouse_pos):
-                            button_new_game_disabled = self.draw_button("", SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, BUTTON_TOP, bg_color=BLACK)
-                            button_end_game_disabled = self.draw_button("", SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, BUTTON_TOP + BUTTON_INTERVAL, bg_color=BLACK)
-                            return 
-                        elif button_end_game.collidepoint(mouse_pos):
-                            pygame.quit()
-                            exit()
-            pygame.display.flip()
+    def get_board_surface(self, size: int) -> pygame.Surface:
+        """
+        获取指定大小的棋盘底图（背景图片与网格），所有 UI 共用同一份缓存。
+        :param size: 棋盘大小
+        :return: 全屏大小的棋盘底图
+        """
+        return get_board_surface(size)
+
+    def invalidate_board(self):
+        """
+        屏幕被其它界面（弹窗、选择界面等）覆盖后调用，下次显示棋盘时完整重绘。
+        """
+        self.drawn_board = None
+        self.drawn_sidebar = None
+
+    def draw_chess(self, board_surface: pygame.Surface, row: int, col: int, chess: str) -> pygame.Rect:
+        """
+        用底图恢复一个交叉点所在的区域，再画上棋子。
+        :param chess: 棋子颜色 ("BLACK" 或 "WHITE")，为 None 时只恢复底图
+        :return: 被重绘的矩形区域
+        """
+        center = (GRID_SIZE * (col + 1), GRID_SIZE * (row + 1))
+        rect = pygame.Rect(center[0] - CHESS_RADIUS - 1, center[1] - CHESS_RADIUS - 1, 2 * CHESS_RADIUS + 2, 2 * CHESS_RADIUS + 2)
+        self.screen.blit(board_surface, rect, rect)
+        if chess == "BLACK":
+            pygame.draw.circle(self.screen, BLACK, center, CHESS_RADIUS)
+        elif chess == "WHITE":
+            pygame.draw.circle(self.screen, WHITE, center, CHESS_RADIUS)
+        return rect
 
     def display_chessboard(self, chessboard: Chessboard, turn: str, player_name: str, games: int=None, wins: int=None):
         """
         绘制棋盘和当前状态。
+        屏幕上已经是同样大小的棋盘时，只重绘与上次相比发生变化的交叉点和右侧面板，并只更新这些区域。
         :param chessboard: 当前的棋盘对象
         :param turn: 当前玩家的颜色 ("BLACK" 或 "WHITE")
         """
-        self.screen.blit(self.background_image, (0, 0))
-
-        # 绘制棋盘网格
-        for row in range(1, chessboard.get_size() + 1):
-            pygame.draw.line(self.screen, BLACK, (GRID_SIZE, GRID_SIZE * row),
-                             (GRID_SIZE * chessboard.get_size(), GRID_SIZE * row), LINE_WIDTH)
-            pygame.draw.line(self.screen, BLACK, (GRID_SIZE * row, GRID_SIZE),
-                             (GRID_SIZE * row, GRID_SIZE * chessboard.get_size()), LINE_WIDTH)
-
-        # 绘制棋子
-        for row in range(chessboard.get_size()):
-            for col in range(chessboard.get_size()):
-                curr_chess = chessboard.get_chess(row=row, col=col)
-                if curr_chess == "BLACK":
-                    pygame.draw.circle(self.screen, BLACK, (GRID_SIZE * (col + 1), GRID_SIZE * (row + 1)), CHESS_RADIUS)
-                elif curr_chess == "WHITE":
-                    pygame.draw.circle(self.screen, WHITE, (GRID_SIZE * (col + 1), GRID_SIZE * (row + 1)), CHESS_RADIUS)
-                    
-        self.display_right_sidebar(turn, player_name, games, wins)
+        size = chessboard.get_size()
+        board_surface = self.get_board_surface(size)
+        sidebar = (turn, player_name, games, wins)
+        if self.drawn_board is None or len(self.drawn_board) != size:
+            # 完整重绘
+            self.screen.blit(board_surface, (0, 0))
+            for row in range(size):
+                for col in range(size):
+                    if chessboard.get_chess(row=row, col=col) is not None:
+                        self.draw_chess(board_surface, row, col, chessboard.get_chess(row=row, col=col))
+            self.display_right_sidebar(turn, player_name, games, wins)
+            pygame.display.flip()
+        else:
+            dirty_rects = []
+            for row in range(size):
+                for col in range(size):
+                    curr_chess = chessboard.get_chess(row=row, col=col)
+                    if curr_chess != self.drawn_board[row][col]:
+                        dirty_rects.append(self.draw_chess(board_surface, row, col, curr_chess))
+            if sidebar != self.drawn_sidebar:
+                self.screen.blit(board_surface, self.sidebar_rect, self.sidebar_rect)
+                self.display_right_sidebar(turn, player_name, games, wins)
+                dirty_rects.append(self.sidebar_rect)
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
+        self.drawn_board = [row[:] for row in chessboard.board]
+        self.drawn_sidebar = sidebar
+
+    def display_status(self, lines: list[str]):
+        """
+        在右侧面板底部显示状态信息（如回放进度），只更新该区域。
+        需要在 display_chessboard 之后调用。
+        :param lines: 各行文字
+        """
+        if self.drawn_board is None:
+            return
+        rect = pygame.Rect(COMMON_BUTTON_LEFT, SCREEN_HEIGHT - 30 * len(lines) - 10, SCREEN_WIDTH - COMMON_BUTTON_LEFT, 30 * len(lines) + 10)
+        self.screen.blit(self.get_board_surface(len(self.drawn_board)), rect, rect)
+        for index, line in enumerate(lines):
+            self.screen.blit(render_text(line, BLACK, SMALL_FONT_SIZE), (rect.x, rect.y + 30 * index))
+        self.drawn_sidebar = None  # 状态信息位于右侧面板区域内，面板下次需要完整重绘
+        pygame.display.update(rect)
 
     @ abstractmethod
     def display_right_sidebar(self):
@@ -236,149 +748,7 @@ class UITemplate():
             确认键：关闭两个弹窗。
         :return: is_guest, is_AI, is_registered_user, username, password, ai_level
         """
-        pygame.draw.rect(self.popup_surface, BLACK, self.popup_surface.get_rect(), 2)
-
-        # 初始化选项
-        player_type = None  # 玩家类型
-        username, password, ai_level = "", "", None
-        is_guest, is_AI, is_registered_user = False, False, False
-        input_active = {"username": False, "password": False}
-
-        # 按钮定义
-        button_registered = pygame.Rect(50, 50, 300, 40)
-        button_unregistered = pygame.Rect(50, 100, 300, 40)
-        button_guest = pygame.Rect(50, 150, 300, 40)
-        button_AI = pygame.Rect(50, 200, 300, 40)
-        button_confirm = pygame.Rect(250, 350, 100, 40)
-        confirm_text = self.SMALLFONT.render("Confirm", True, WHITE)
-
-        # 输入框定义
-        input_username = pygame.Rect(50, 50, 300, 40)
-        input_password = pygame.Rect(50, 130, 300, 40)
-        input_texts = {"username": "", "password": ""}
-
-        # AI等级选项
-        ai_buttons = [
-            pygame.Rect(50, 50, 200, 40),
-            pygame.Rect(50, 100, 200, 40),
-        ]
-        ai_texts = ["Level 1", "Level 2"]
-
-        running = True
-        while running:
-            self.popup_surface.fill(WHITE)
-            pygame.draw.rect(self.popup_surface, BLACK, self.popup_surface.get_rect(), 2)
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-                # 鼠标点击事件
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_pos = event.pos
-                    mouse_x, mouse_y = event.pos
-                    mouse_pos = (mouse_x - self.popup_rect.x, mouse_y - self.popup_rect.y)
-
-                    # 第一弹窗选择玩家类型
-                    if player_type is None:
-                        if button_registered.collidepoint(mouse_pos):
-                            player_type = "registered"
-                            is_registered_user = True
-                        elif button_unregistered.collidepoint(mouse_pos):
-                            player_type = "unregistered"
-                        elif button_guest.collidepoint(mouse_pos):
-                            player_type = "guest"
-                            is_guest = True
-                            running = False
-                        elif self.AI_available and button_AI.collidepoint(mouse_pos):
-                            player_type = "AI"
-
-                    # 第二弹窗输入信息
-                    elif player_type in ["registered", "unregistered"]:
-                        if input_username.collidepoint(mouse_pos):
-                            input_active["username"] = True
-                            input_active["password"] = False
-                        elif input_password.collidepoint(mouse_pos):
-                            input_active["username"] = False
-                            input_active["password"] = True
-                        else:
-                            input_active = {"username": False, "password": False}
-                        # 点击确认键退出
-                        if button_confirm.collidepoint(mouse_pos):
-                            username = input_texts["username"]
-                            password = input_texts["password"]
-                            running = False
-
-                    elif player_type == "AI":
-                        for i, button in enumerate(ai_buttons):
-                            if button.collidepoint(mouse_pos):
-                                ai_level = i + 1
-                                is_AI = True
-                                running = False
-
-                # 键盘输入事件
-                if event.type == pygame.KEYDOWN and player_type in ["registered", "unregistered"]:
-                    if input_active["username"]:
-                        if event.key == pygame.K_BACKSPACE:
-                            input_texts["username"] = input_texts["username"][:-1]
-                        else:
-                            input_texts["username"] += event.unicode
-                    elif input_active["password"]:
-                        if event.key == pygame.K_BACKSPACE:
-                            input_texts["password"] = input_texts["password"][:-1]
-                        else:
-                            input_texts["password"] += event.unicode
-
-            # 第一弹窗：选择玩家类型
-            if player_type is None:
-                pygame.draw.rect(self.popup_surface, GRAY, button_registered)
-                pygame.draw.rect(self.popup_surface, GRAY, button_unregistered)
-                pygame.draw.rect(self.popup_surface, GRAY, button_guest)
-                if self.AI_available:
-                    pygame.draw.rect(self.popup_surface, GRAY, button_AI)
-
-                self.popup_surface.blit(self.FONT.render("Registered User", True, BLACK), (60, 55))
-                self.popup_surface.blit(self.FONT.render("Unregistered User", True, BLACK), (60, 105))
-                self.popup_surface.blit(self.FONT.render("Guest", True, BLACK), (60, 155))
-                if self.AI_available:
-                    self.popup_surface.blit(self.FONT.render("AI", True, BLACK), (60, 205))
-
-            # 第二弹窗：已注册或未注册用户
-            elif player_type in ["registered", "unregistered"]:
-                if input_active["username"]:
-                    pygame.draw.rect(self.popup_surface, BLUE, input_username)
-                    username_color = WHITE
-                else:
-                    pygame.draw.rect(self.popup_surface, GRAY, input_username)
-                    username_color = BLACK
-                if input_active["password"]:
-                    pygame.draw.rect(self.popup_surface, BLUE, input_password)
-                    password_color = WHITE
-                else:
-                    pygame.draw.rect(self.popup_surface, GRAY, input_password)
-                    password_color = BLACK
-
-                pygame.draw.rect(self.popup_surface, BLUE, button_confirm)
-                self.popup_surface.blit(confirm_text, (button_confirm.x + (button_confirm.width - confirm_text.get_width()) // 2,
-                                            button_confirm.y + (button_confirm.height - confirm_text.get_height()) // 2))
-
-
-                self.popup_surface.blit(self.FONT.render("Username:", True, BLACK), (50, 20))
-                self.popup_surface.blit(self.FONT.render(input_texts["username"], True, username_color), (55, 55))
-                self.popup_surface.blit(self.FONT.render("Password:", True, BLACK), (50, 100))
-                self.popup_surface.blit(self.FONT.render(input_texts["password"], True, password_color), (55, 135))
-
-            # 第二弹窗：AI选择等级
-            elif player_type == "AI":
-                for i, button in enumerate(ai_buttons):
-                    pygame.draw.rect(self.popup_surface, GRAY, button)
-                    self.popup_surface.blit(self.FONT.render(ai_texts[i], True, BLACK), (button.x + 10, button.y + 5))
-
-            self.screen.blit(self.popup_surface, self.popup_rect.topleft)
-            pygame.display.flip()
-
-        return is_guest, is_AI, is_registered_user, username, password, ai_level
+        return PlayerDialog(self.screen, self.popup_rect, self.AI_available, self.AI_levels).run()
         
     def admit_defeat(self, mouse_pos: tuple[int, int]):
         """
@@ -457,217 +827,27 @@ class UITemplate():
         return self.button_playback.collidepoint(mouse_pos)
     
     def pop_message(self, message: str, text_color=RED):
+        """
+        弹出消息浮窗，点击 "Got it" 后关闭，并恢复浮窗下方原来的画面。
+        :param message: 消息内容，为 None 时不弹出
+        :param text_color: 文字颜色
+        """
         if message is None:
             return
-        # 界面参数
-        self.popup_surface.fill(WHITE)
-        pygame.draw.rect(self.popup_surface, BLACK, self.popup_surface.get_rect(), 2)
-        
-        # 按钮
-        button_rect = pygame.Rect(250, 350, 100, 40)
-        button_color = BLUE
-        button_text = self.SMALLFONT.render("Got it", True, WHITE)
-        
-        # 文本显示相关
-        text_margin = 20
-        text_width = self.popup_width - 2 * text_margin  # 文本区域的最大宽度
-        line_height = 20  # 每行文本的高度
-        y_offset = 50  # 文本从顶部偏移的初始位置
-
-        # 将信息按行分割（自动换行）
-        words = message.split(' ')
-        lines = []
-        current_line = ""
-
-        for word in words:
-            test_line = current_line + word + " "
-            test_surface = self.SMALLFONT.render(test_line, True, text_color)
-            if test_surface.get_width() > text_width:
-                lines.append(current_line.strip())
-                current_line = word + " "
-            else:
-                current_line = test_line
-
-        # 添加最后一行
-        if current_line:
-            lines.append(current_line.strip())
-
-        running = True
-
-        while running:
-            # 处理事件
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_x, mouse_y = event.pos
-                    if self.popup_rect.collidepoint(event.pos):
-                        rel_x, rel_y = mouse_x - self.popup_rect.x, mouse_y - self.popup_rect.y
-                        
-                        # 点击确认按钮
-                        if button_rect.collidepoint(rel_x, rel_y):
-                            running = False
-
-            # # 绘制背景覆盖主界面
-            # overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            # overlay.fill((0, 0, 0, 180))  # 半透明黑色
-            # self.screen.blit(overlay, (0, 0))
-
-            # 绘制浮窗
-            self.popup_surface.fill(WHITE)
-            pygame.draw.rect(self.popup_surface, BLACK, self.popup_surface.get_rect(), 2)
-
-            # 绘制信息
-            if len(lines) == 1:
-                # 居中绘制
-                message_text = self.SMALLFONT.render(message, True, text_color)
-                self.popup_surface.blit(message_text, ((self.popup_surface.get_width() - message_text.get_width()) // 2, (self.popup_surface.get_height() - message_text.get_height()) // 2))
-            else:
-                current_y = y_offset
-                for line in lines:
-                    line_surface = self.SMALLFONT.render(line, True, text_color)
-                    self.popup_surface.blit(line_surface, (text_margin, current_y))
-                    current_y += line_height
-
-            
-            # 绘制确认按钮
-            pygame.draw.rect(self.popup_surface, button_color, button_rect)
-            self.popup_surface.blit(button_text, (button_rect.x + (button_rect.width - button_text.get_width()) // 2,
-                                            button_rect.y + (button_rect.height - button_text.get_height()) // 2))
-
-            # 将浮窗绘制到主屏幕
-            self.screen.blit(self.popup_surface, self.popup_rect.topleft)
-
-            pygame.display.flip()
+        MessageDialog(self.screen, self.popup_rect, message, text_color).run()
     
     def select_file(self, is_store: bool):
         """
-        弹出新窗口，用户选择目录，并输入文件名以存储当前局面。
-        :return: 用户选择的文件完整路径字符串，如果用户取消则返回空字符串。
+        弹出新窗口，用户选择目录，并输入文件名以存储当前局面（或选择要加载的文件）。
+        :return: 用户选择的文件完整路径字符串，如果用户取消则返回 None。
         """
-        current_dir = ('./states')
-
-        # 界面参数
-        self.popup_surface.fill(WHITE)
-        pygame.draw.rect(self.popup_surface, BLACK, self.popup_surface.get_rect(), 2)
-
-        # 输入框
-        input_box_color = BLACK
-        input_box = pygame.Rect(50, 300, 500, 40)
-        input_text = ''
-        active = False
-
-        # 按钮
-        button_rect = pygame.Rect(250, 350, 100, 40)
-        button_color = BLUE
-        button_text = self.SMALLFONT.render("Confirm", True, WHITE)
-        cancel_button_rect = pygame.Rect(360, 350, 100, 40)
-        cancel_button_color = GRAY
-        cancel_button_text = self.SMALLFONT.render("Cancel", True, BLACK)
-
-        running = True
-        result_path = ''
-
-        while running:
-            # 处理事件
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_x, mouse_y = event.pos
-                    if self.popup_rect.collidepoint(event.pos):
-                        rel_x, rel_y = mouse_x - self.popup_rect.x, mouse_y - self.popup_rect.y
-
-                        # 点击输入框
-                        if input_box.collidepoint(rel_x, rel_y):
-                            input_box_color = BLUE
-                            active = True
-                        else:
-                            input_box_color = BLACK
-                            active = False
-
-                        # 点击确认按钮
-                        if button_rect.collidepoint(rel_x, rel_y):
-                            input_text = input_text.strip()
-                            if not input_text and is_store:
-                                self.display_message("Please enter a valid file name!", color=(255, 0, 0),
-                                                    left=self.popup_rect.x + 50, top=self.popup_rect.y + 250)
-                            else:
-                                result_path = os.path.join(current_dir, input_text) if input_text else current_dir
-                                running = False
-
-                        # 点击取消按钮
-                        if cancel_button_rect.collidepoint(rel_x, rel_y):
-                            return
-
-                        # 点击目录项
-                        entry_items = os.listdir(current_dir) if os.path.isdir(current_dir) else []
-                        for i, entry in enumerate(entry_items):
-                            entry_rect = pygame.Rect(50, 50 + i * 30, 500, 30)
-                            if entry_rect.collidepoint(rel_x, rel_y):
-                                selected_path = os.path.join(current_dir, entry)
-                                if (os.path.isdir(selected_path) and is_store) or not is_store:
-                                    current_dir = selected_path
-                                break
-
-                elif event.type == pygame.KEYDOWN:
-                    if active:
-                        if event.key == pygame.K_BACKSPACE:
-                            input_text = input_text[:-1]
-                        elif event.key == pygame.K_RETURN:
-                            active = False
-                        else:
-                            if event.unicode in string.printable:
-                                input_text += event.unicode
-
-            # 绘制背景覆盖主界面
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 180))  # 半透明黑色
-            self.screen.blit(overlay, (0, 0))
-
-            # 绘制浮窗
-            self.popup_surface.fill(WHITE)
-            pygame.draw.rect(self.popup_surface, BLACK, self.popup_surface.get_rect(), 2)
-
-            # 标题
-            title_text = self.SMALLFONT.render(f"Current Directory: {current_dir}", True, BLACK)
-            self.popup_surface.blit(title_text, (50, 20))
-
-            # 绘制目录内容
-            entries = os.listdir(current_dir) if os.path.isdir(current_dir) else []
-            for i, entry in enumerate(entries[:10]):  # 仅显示前10项，防止溢出
-                entry_color = GRAY if os.path.isdir(os.path.join(current_dir, entry)) else LIGHT_GRAY
-                entry_rect = pygame.Rect(50, 50 + i * 30, 500, 30)
-                pygame.draw.rect(self.popup_surface, entry_color, entry_rect)
-                entry_text = self.SMALLFONT.render(entry, True, BLACK)
-                self.popup_surface.blit(entry_text, (entry_rect.x + 5, entry_rect.y + 5))
-
-            # 绘制输入框
-            pygame.draw.rect(self.popup_surface, WHITE, input_box)
-            pygame.draw.rect(self.popup_surface, input_box_color, input_box, 2)
-            input_surf = self.SMALLFONT.render(input_text, True, BLACK)
-            self.popup_surface.blit(input_surf, (input_box.x + 5, input_box.y + 5))
-
-            # 绘制确认按钮
-            pygame.draw.rect(self.popup_surface, button_color, button_rect)
-            self.popup_surface.blit(button_text, (button_rect.x + (button_rect.width - button_text.get_width()) // 2,
-                                            button_rect.y + (button_rect.height - button_text.get_height()) // 2))
-
-            # 绘制取消按钮
-            pygame.draw.rect(self.popup_surface, cancel_button_color, cancel_button_rect)
-            self.popup_surface.blit(cancel_button_text, (cancel_button_rect.x + (cancel_button_rect.width - cancel_button_text.get_width()) // 2,
-                                                    cancel_button_rect.y + (cancel_button_rect.height - cancel_button_text.get_height()) // 2))
-
-            # 将浮窗绘制到主屏幕
-            self.screen.blit(self.popup_surface, self.popup_rect.topleft)
-
-            pygame.display.flip()
-
-        return result_path
+        self.invalidate_board()  # 覆盖棋盘画面
+        # 绘制背景覆盖主界面
+        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 180))  # 半透明黑色
+        self.screen.blit(overlay, (0, 0))
+        pygame.display.flip()
+        return FileDialog(self.screen, self.popup_rect, './states', is_store).run()
                     
 # 具体产品（五子棋UI）
 class GomokuUI(UITemplate):
@@ -678,6 +858,7 @@ class GomokuUI(UITemplate):
     def __init__(self) -> None:
         super().__init__()
         self.AI_available = True
+        self.AI_levels = ["Level 1", "Level 2", "Level 3"]
         self.valid_chessboard_size = [str(i) for i in range(8, 20)]
         
     def display_right_sidebar(self, turn, player_name, games: int=None, wins: int=None):
@@ -758,10 +939,6 @@ class GomokuUI(UITemplate):
             GRID_SIZE + 7 * BUTTON_INTERVAL, 
             update=False
         )
-                
-        # 更新屏幕显示
-        pygame.display.flip()
-
           
 # 具体产品（围棋UI）
 class GoUI(UITemplate):
@@ -774,6 +951,7 @@ class GoUI(UITemplate):
         初始化围棋 UI 类，调用父类的初始化方法。
         """
         super().__init__()
+        self.AI_available = True
         self.valid_chessboard_size = [str(i) for i in range(8, 20)]
         
     def display_right_sidebar(self, turn, player_name, games: int=None, wins: int=None):
@@ -870,9 +1048,6 @@ class GoUI(UITemplate):
             GRID_SIZE + 9 * BUTTON_INTERVAL, 
             update=False
         )
-                
-        # 更新屏幕显示
-        pygame.display.flip()
 
 # 具体产品（黑白棋UI）
 class OthelloUI(UITemplate):
@@ -883,7 +1058,7 @@ class OthelloUI(UITemplate):
     def __init__(self) -> None:
         super().__init__()
         self.AI_available = True
-        self.valid_chessboard_size = ['8']
+        self.valid_chessboard_size = ['4', '6', '8']
         
     def display_right_sidebar(self, turn, player_name, games: int=None, wins: int=None):
         """
@@ -963,7 +1138,4 @@ class OthelloUI(UITemplate):
             GRID_SIZE + 7 * BUTTON_INTERVAL, 
             update=False
         )
-                
-        # 更新屏幕显示
-        pygame.display.flip()
         
\ No newline at end of file
@@ -0,0 +1,100 @@
+import pygame
+from collections import OrderedDict
+from commons import *
+
+# 进程内共享的资源缓存：字体、缩放后的图片、已渲染的文字与各尺寸的棋盘底图。
+# 所有资源在首次使用时加载，所有 UI 实例共用，切换游戏时不需要重新解码或绘制；也可以调用 warm_assets 提前加载。
+
+_fonts: dict[int, pygame.font.Font] = {}  # 按字号缓存的字体
+_images: dict[tuple[str, tuple[int, int]], pygame.Surface] = {}  # 按路径与尺寸缓存的图片
+_texts: OrderedDict[tuple, pygame.Surface] = OrderedDict()  # 最近使用的已渲染文字（LRU，最多 TEXT_CACHE_SIZE 个）
+_board_surfaces: dict[int, pygame.Surface] = {}  # 按棋盘大小缓存的棋盘底图（背景与网格）
+
+def get_font(size: int) -> pygame.font.Font:
+    """
+    获取指定字号的默认字体（首次使用时加载）。
+    直接加载 pygame 自带的默认字体，与 SysFont(None, size) 效果相同，但不需要扫描系统字体。
+    :param size: 字号
+    :return: 字体对象
+    """
+    if size not in _fonts:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        _fonts[size] = pygame.font.Font(None, size)
+    return _fonts[size]
+
+def get_image(path: str, size: tuple[int, int]) -> pygame.Surface:
+    """
+    获取缩放到指定尺寸的图片（首次使用时加载，窗口已创建时转换为屏幕像素格式以加快绘制）。
+    :param path: 图片路径
+    :param size: (宽, 高)
+    :return: 图片 Surface
+    """
+    key = (path, size)
+    if key not in _images:
+        image = pygame.transform.scale(pygame.image.load(path), size)
+        _images[key] = image.convert() if pygame.display.get_surface() is not None else image
+    return _images[key]
+
+def get_background() -> pygame.Surface:
+    """
+    :return: 缩放到窗口大小的背景图片
+    """
+    return get_image(BACKGROUND_IMAGE_PATH, (SCREEN_WIDTH, SCREEN_HEIGHT))
+
+def get_board_surface(size: int) -> pygame.Surface:
+    """
+    获取指定大小的棋盘底图（背景图片与网格），首次使用时绘制。
+    :param size: 棋盘大小
+    :return: 全屏大小的棋盘底图（不要在返回的 Surface 上绘制）
+    """
+    if size not in _board_surfaces:
+        surface = get_background().copy()
+        for row in range(1, size + 1):
+            pygame.draw.line(surface, BLACK, (GRID_SIZE, GRID_SIZE * row), (GRID_SIZE * size, GRID_SIZE * row), LINE_WIDTH)
+            pygame.draw.line(surface, BLACK, (GRID_SIZE * row, GRID_SIZE), (GRID_SIZE * row, GRID_SIZE * size), LINE_WIDTH)
+        _board_surfaces[size] = surface
+    return _board_surfaces[size]
+
+def render_text(text: str, color, size: int=FONT_SIZE, antialias: bool=True) -> pygame.Surface:
+    """
+    渲染文字。相同的文字、字号、颜色与抗锯齿设置只渲染一次，之后直接返回缓存的 Surface。
+    :param text: 文字内容
+    :param color: 文字颜色
+    :param size: 字号
+    :param antialias: 是否抗锯齿
+    :return: 文字 Surface（不要在返回的 Surface 上绘制）
+    """
+    key = (text, size, tuple(color), antialias)
+    surface = _texts.get(key)
+    if surface is not None:
+        _texts.move_to_end(key)
+        return surface
+    surface = get_font(size).render(text, antialias, color)
+    _texts[key] = surface
+    if len(_texts) > TEXT_CACHE_SIZE:
+        _texts.popitem(last=False)  # 淘汰最久未使用的文字
+    return surface
+
+def warm_assets(board_sizes: list[int]=(), labels: list[str]=()):
+    """
+    提前加载资源（可选），使之后首次显示时不需要等待加载。需要在窗口创建之后调用。
+    :param board_sizes: 需要预先绘制底图的棋盘大小
+    :param labels: 需要预先渲染的按钮文字（黑色、默认字号）
+    """
+    get_font(FONT_SIZE)
+    get_font(SMALL_FONT_SIZE)
+    get_background()
+    for size in board_sizes:
+        get_board_surface(size)
+    for label in labels:
+        render_text(label, BLACK)
+
+def clear_assets():
+    """
+    清空所有缓存（例如窗口重新创建、像素格式改变之后）。
+    """
+    _fonts.clear()
+    _images.clear()
+    _texts.clear()
+    _board_surfaces.clear()
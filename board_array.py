@@ -0,0 +1,219 @@
+from chessboard import Chessboard
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，不可用时各 AI 退回逐格计算
+    np = None
+
+# 数组棋盘编码
+EMPTY = 0
+BLACK_CHESS = 1
+WHITE_CHESS = 2
+CHESS_CODES = {None: EMPTY, "BLACK": BLACK_CHESS, "WHITE": WHITE_CHESS}
+
+# 五子棋二级 AI 的连子权重（与 GomokuAILevel2 一致）
+GOMOKU_ATTACK_WEIGHTS = [0, 10, 50, 200, 1000]
+GOMOKU_DEFENCE_WEIGHTS = [0, 15, 70, 300, 1500]
+GOMOKU_DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]  # 横、竖、正斜、反斜方向
+
+def color_code(color: str) -> int:
+    """
+    获取颜色对应的数组编码。
+    :param color: "BLACK" 或 "WHITE"
+    :return: 编码
+    """
+    return CHESS_CODES[color]
+
+def opponent_code(code: int) -> int:
+    """
+    获取对手颜色的数组编码。
+    """
+    return WHITE_CHESS if code == BLACK_CHESS else BLACK_CHESS
+
+def to_array(chessboard: Chessboard):
+    """
+    将棋盘转换为 int8 数组。
+    :param chessboard: 棋盘对象
+    :return: 形状为 (size, size) 的数组
+    """
+    return np.array([[CHESS_CODES[chess] for chess in row] for row in chessboard.board], dtype=np.int8)
+
+def stack_boards(boards):
+    """
+    将多个棋盘堆叠为一个数组。
+    :param boards: Chessboard 对象、Chessboard.board 格式的二维列表或数组组成的序列，也可以直接是 (N, size, size) 数组
+    :return: 形状为 (N, size, size) 的 int8 数组
+    """
+    if np is None:
+        raise ImportError("evaluate_batch requires numpy.")
+    if isinstance(boards, np.ndarray):
+        return boards.astype(np.int8, copy=False)
+    arrays = []
+    for board in boards:
+        if isinstance(board, Chessboard):
+            arrays.append(to_array(board))
+        elif isinstance(board, np.ndarray):
+            arrays.append(board.astype(np.int8, copy=False))
+        else:
+            arrays.append(np.array([[CHESS_CODES[chess] for chess in row] for row in board], dtype=np.int8))
+    return np.stack(arrays)
+
+def shift(mask, d_row: int, d_col: int, distance: int):
+    """
+    沿方向平移掩码：结果在 (r, c) 处的值为原掩码在 (r + distance * d_row, c + distance * d_col) 处的值，越界为 False。
+    :param mask: 形状为 (N, size, size) 的布尔数组
+    :return: 平移后的布尔数组
+    """
+    size = mask.shape[-1]
+    result = np.zeros_like(mask)
+    row_shift, col_shift = distance * d_row, distance * d_col
+    if abs(row_shift) >= size or abs(col_shift) >= size:
+        return result
+    src_rows = slice(max(row_shift, 0), size + min(row_shift, 0))
+    dst_rows = slice(max(-row_shift, 0), size + min(-row_shift, 0))
+    src_cols = slice(max(col_shift, 0), size + min(col_shift, 0))
+    dst_cols = slice(max(-col_shift, 0), size + min(-col_shift, 0))
+    result[..., dst_rows, dst_cols] = mask[..., src_rows, src_cols]
+    return result
+
+def run_lengths(mask, d_row: int, d_col: int, max_length: int):
+    """
+    计算每个位置沿方向（不含自身）连续为 True 的格数，最多统计 max_length 格。
+    :param mask: 形状为 (N, size, size) 的布尔数组
+    :return: 形状相同的整数数组
+    """
+    runs = np.zeros(mask.shape, dtype=np.int8)
+    still_running = np.ones(mask.shape, dtype=bool)
+    for distance in range(1, max_length + 1):
+        still_running &= shift(mask, d_row, d_col, distance)
+        if not still_running.any():
+            break
+        runs += still_running
+    return runs
+
+def gomoku_level2_scores(boards, color: str):
+    """
+    五子棋二级 AI 评分的向量化实现：一次计算所有棋盘所有空位的进攻与防守得分。
+    :param boards: 形状为 (N, size, size) 的数组
+    :param color: 落子方颜色
+    :return: 形状为 (N, size, size) 的评分数组，已有棋子的位置为 -100
+    """
+    own = color_code(color)
+    own_mask = boards == own
+    opponent_mask = boards == opponent_code(own)
+    attack_weights = np.array(GOMOKU_ATTACK_WEIGHTS, dtype=np.int64)
+    defence_weights = np.array(GOMOKU_DEFENCE_WEIGHTS, dtype=np.int64)
+    max_length = len(GOMOKU_ATTACK_WEIGHTS) - 1
+
+    scores = np.zeros(boards.shape, dtype=np.int64)
+    for d_row, d_col in GOMOKU_DIRECTIONS:
+        scores += attack_weights[run_lengths(own_mask, d_row, d_col, max_length)]
+        scores += defence_weights[run_lengths(opponent_mask, d_row, d_col, max_length)]
+    scores[boards != EMPTY] = -100  # 非法位置
+    return scores
+
+def gomoku_line_scores(boards, color: str):
+    """
+    按连续棋子段计算每个棋盘上某方的棋型总分，分类规则与 gomoku_pattern.score_line 相同
+    （即与 PatternEvaluator 的全局得分一致）。
+    :param boards: 形状为 (N, size, size) 的数组
+    :param color: 计分方颜色
+    :return: 形状为 (N,) 的得分数组
+    """
+    from gomoku_pattern import PATTERN_SCORES, FIVE, OPEN_FOUR, FOUR, OPEN_THREE, THREE, OPEN_TWO, TWO
+    # RUN_SCORES[连子数][两端空位数]
+    run_scores = np.array([
+        [0, 0, 0],
+        [0, 0, 0],
+        [0, PATTERN_SCORES[TWO], PATTERN_SCORES[OPEN_TWO]],
+        [0, PATTERN_SCORES[THREE], PATTERN_SCORES[OPEN_THREE]],
+        [0, PATTERN_SCORES[FOUR], PATTERN_SCORES[OPEN_FOUR]],
+        [PATTERN_SCORES[FIVE]] * 3,
+    ], dtype=np.int64)
+    mask = boards == color_code(color)
+    empty = boards == EMPTY
+    size = boards.shape[-1]
+
+    scores = np.zeros(boards.shape[0], dtype=np.int64)
+    for d_row, d_col in GOMOKU_DIRECTIONS:
+        starts = mask & ~shift(mask, -d_row, -d_col, 1)  # 连续段的起点
+        lengths = 1 + run_lengths(mask, d_row, d_col, size)
+        open_before = shift(empty, -d_row, -d_col, 1)
+        for length in range(1, size + 1):
+            at_length = starts & (lengths == length)
+            if not at_length.any():
+                continue
+            open_ends = open_before.astype(np.int64) + shift(empty, d_row, d_col, length)
+            score_table = run_scores[min(length, 5)]
+            scores += (score_table[open_ends] * at_length).sum(axis=(-2, -1))
+    return scores
+
+def gomoku_evaluate_batch(boards, color: str):
+    """
+    批量评估五子棋局面。
+    :param boards: 形状为 (N, size, size) 的数组
+    :param color: 评估视角的颜色
+    :return: 形状为 (N,) 的数组，己方棋型总分减去对方棋型总分
+    """
+    opponent_color = "BLACK" if color == "WHITE" else "WHITE"
+    return gomoku_line_scores(boards, color) - gomoku_line_scores(boards, opponent_color)
+
+OTHELLO_DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+def othello_flip_lengths(boards, code: int):
+    """
+    计算每个位置落子后在八个方向上各能翻转的棋子数（与 OthelloRule.get_flippable_chess 语义相同）。
+    :param boards: 形状为 (N, size, size) 的数组
+    :param code: 落子方编码
+    :return: 形状为 (8, N, size, size) 的数组，已有棋子的位置为 0
+    """
+    own_mask = boards == code
+    opponent_mask = boards == opponent_code(code)
+    empty = boards == EMPTY
+    size = boards.shape[-1]
+
+    lengths = np.zeros((len(OTHELLO_DIRECTIONS),) + boards.shape, dtype=np.int8)
+    for d, (d_row, d_col) in enumerate(OTHELLO_DIRECTIONS):
+        runs = run_lengths(opponent_mask, d_row, d_col, size)
+        for length in range(1, size - 1):
+            closed = empty & (runs == length) & shift(own_mask, d_row, d_col, length + 1)
+            lengths[d][closed] = length
+    return lengths
+
+def othello_legal_moves(boards, code: int):
+    """
+    计算每个棋盘上落子方的所有合法位置。
+    :param boards: 形状为 (N, size, size) 的数组
+    :param code: 落子方编码
+    :return: 形状为 (N, size, size) 的布尔数组
+    """
+    return (othello_flip_lengths(boards, code) > 0).any(axis=0)
+
+def othello_square_weights(size: int):
+    """
+    黑白棋位置权重（与 OthelloAILevel2 的参数一致）：角 10，边 3，角旁危险区域 -5，其余 1。
+    :param size: 棋盘大小
+    :return: 形状为 (size, size) 的数组
+    """
+    weights = np.ones((size, size), dtype=np.int64)
+    weights[0, :] = weights[-1, :] = weights[:, 0] = weights[:, -1] = 3
+    for row, col in [(0, 1), (1, 0), (1, 1), (0, size - 2), (1, size - 2), (1, size - 1),
+                     (size - 2, 0), (size - 2, 1), (size - 1, 1),
+                     (size - 2, size - 2), (size - 1, size - 2), (size - 2, size - 1)]:
+        weights[row, col] = -5
+    for row, col in [(0, 0), (0, size - 1), (size - 1, 0), (size - 1, size - 1)]:
+        weights[row, col] = 10
+    return weights
+
+def othello_evaluate_batch(boards, color: str):
+    """
+    批量评估黑白棋局面：位置权重之差加行动力（合法棋步数）之差。
+    :param boards: 形状为 (N, size, size) 的数组
+    :param color: 评估视角的颜色
+    :return: 形状为 (N,) 的数组
+    """
+    own = color_code(color)
+    opponent = opponent_code(own)
+    weights = othello_square_weights(boards.shape[-1])
+    positional = ((boards == own) * weights).sum(axis=(-2, -1)) - ((boards == opponent) * weights).sum(axis=(-2, -1))
+    mobility = othello_legal_moves(boards, own).sum(axis=(-2, -1)) - othello_legal_moves(boards, opponent).sum(axis=(-2, -1))
+    return positional + mobility
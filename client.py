@@ -1,31 +1,64 @@
 from game_factory import *
 from game import *
+from engine import *
 import pygame
 from commons import *
 from UI_factory import *
 from UI import *
 from account_manager import *
-from AI_factory import *
 from player import *
+from playback import Playback
+from game_journal import GameJournal
+import os
 import time
 
+AI_FACTORY_NAMES = {"Gomoku": "GomokuAIFactory", "Go": "GoAIFactory", "Othello": "OthelloAIFactory"}  # 各游戏的 AI 工厂类名
+
+# 会话状态
+SESSION_CHOOSE_GAME = "choose_game"  # 选择游戏
+SESSION_LOGIN = "login"  # 玩家登录并选择棋盘大小
+SESSION_PLAYING = "playing"  # 对局中
+SESSION_GAME_OVER = "game_over"  # 对局结束，显示胜者
+SESSION_EXIT = "exit"  # 退出程序
+
+PRELOAD_LABELS = ["Gomoku", "Go", "Othello", "Admit Defeat", "Restart", "Undo", "Store State", "Load State",
+                  "Capture", "End Turn", "View Hints", "Playback"]  # 预加载时预先渲染的按钮文字
+
 class Client():
-    def __init__(self):
+    def __init__(self, preload: bool=False, autosave: bool=True):
+        """
+        :param preload: 是否在启动时预加载字体、背景图片与按钮文字（默认在首次使用时加载）
+        :param autosave: 是否把每一步写入对局日志，使意外退出后可以继续对局
+        """
         # 游戏初始化参数
         self.game_name: str = None  # 当前选择的游戏名称（如 Gomoku 或 Go）
-        self.game_over: bool = True  # 游戏是否结束的标志
-        self.turn: int = 0  # 当前轮到的玩家，初始为0
         self.chess_color: list[str, str] = ["BLACK", "WHITE"]
         self.game_factory: GameFactory = None  # 游戏工厂，用于创建具体的游戏对象
-        self.game: Game = None  # 当前的游戏对象
-        self.caretaker: Caretaker = None  # 负责管理悔棋历史的对象
+        self.engine: Engine = None  # 对局引擎，负责游戏状态、悔棋历史与回合逻辑
         self.UI_factory: UIFactory = None  # UI 工厂，用于创建具体游戏的 UI
         self.UI_platform: UITemplate = UITemplate()  # 当前的 UI 模板
+        self.UIs: dict[str, UITemplate] = {}  # 各游戏的 UI，整个会话中复用（字体、图片等资源由 asset_cache 在进程内共享）
         self.winner: str = None  # 游戏的获胜者
-        self.allow_undo: bool = True  # 是否允许当前玩家悔棋
         self.players: tuple[Player, Player] = [None, None]
         self.account_manager = ProxyAccountManager(RealAccountManager())
-        self.AI_factory: AIFactory = None  # AI 工厂
+        self.AI_factories: dict[str, AIFactory] = {}  # 各游戏的 AI 工厂（共享开局库等资源），整个会话中复用
+        self.state: str = SESSION_CHOOSE_GAME  # 当前会话状态
+        self.redraw_needed: bool = True  # 棋盘画面是否需要重绘
+        self.turn_checked: bool = False  # 当前回合开始时的处理（合法棋步检查）是否已完成
+        self.playback: Playback = None  # 正在进行的回放，为 None 时不在回放
+        self.playback_chessboard: Chessboard = None  # 显示回放用的棋盘（与回放共享棋盘数据）
+        self.autosave = autosave
+        self.journal: GameJournal = None  # 当前游戏的对局日志（自动保存）
+        if preload:
+            warm_assets(labels=PRELOAD_LABELS)
+
+    @property
+    def game(self) -> Game:
+        return self.engine.game
+
+    @property
+    def turn(self) -> int:
+        return self.engine.turn
 
     def choose_game(self, game_name: str=None):
         """
@@ -38,98 +71,117 @@ class Client():
 
     def init_board(self, board_size: int=None):
         """
-        初始化棋盘大小。
+        初始化棋盘大小并开始对局。
         :param board_size: 指定的棋盘大小（如果为 None，则通过 UI 选择）
         """
         if board_size is None:
             board_size = self.UI_platform.choose_board_size()
-        self.game.set_chessboard(board_size)  # 设置棋盘为指定大小
-        self.caretaker.save_memento(self.game.create_memento())  # 存储初始棋盘
+        self.engine.start(board_size)
     
     def set_game(self):
         """
-        根据游戏名称创建对应的游戏对象和 UI，并初始化工厂和 Caretaker。
+        根据游戏名称创建对应的对局引擎和 UI，并初始化工厂。
         """
         if self.game_name == "Gomoku":
             self.game_factory = GomokuFactory()
             self.UI_factory = GomokuUIFactory()
-            self.AI_factory = GomokuAIFactory()
         elif self.game_name == "Go":
             self.game_factory = GoFactory()
             self.UI_factory = GoUIFactory()
         elif self.game_name == "Othello":
             self.game_factory = OthelloFactory()
             self.UI_factory = OthelloUIFactory()
-            self.AI_factory = OthelloAIFactory()
-        self.game = self.game_factory.createGame()  # 创建具体游戏对象
-        self.caretaker = Caretaker()  # 初始化负责人对象
-        self.UI_platform = self.UI_factory.createUI()  # 创建对应的 UI 平台
-    
-    def make_move(self, row: int, col: int):
+        self.engine = Engine(self.game_factory)  # 创建对局引擎
+        self.engine.add_listener(self.on_event)
+        if self.game_name not in self.UIs:
+            self.UIs[self.game_name] = self.UI_factory.createUI()  # 首次选择该游戏时创建对应的 UI 平台
+        self.UI_platform = self.UIs[self.game_name]
+        if self.autosave:
+            self.journal = GameJournal(os.path.join(AUTOSAVE_DIR, f"{self.game_name}.journal"))
+
+    def reset_game(self):
         """
-        执行行棋操作。
-        :param row: 落子的行坐标
-        :param col: 落子的列坐标
+        清除上一局的对局引擎、玩家与结果（窗口、UI 与账户管理保留），使旧的棋盘与悔棋历史可以被回收。
         """
-        self.game.make_move(row=row, col=col, curr_turn=self.chess_color[self.turn])  # 在棋盘上落子
-        self.caretaker.save_memento(self.game.create_memento())  # 保存当前状态
+        if self.journal is not None:
+            self.journal.detach()
+            self.journal = None
+        self.engine = None
+        self.game_factory = None
+        if self.playback is not None:
+            self.playback.close()
+        self.playback = None
+        self.playback_chessboard = None
+        self.winner = None
+        self.players = [None, None]
 
-    def undo_move(self) -> str:
+    def get_AI_factory(self) -> "AIFactory":
         """
-        执行悔棋操作，回到上一个状态。
+        获取当前游戏的 AI 工厂。AI 模块（及其依赖的搜索、开局库等模块）在首次选择 AI 玩家时才导入。
+        :return: AI 工厂
         """
-        if not self.allow_undo:
-            return "Undo not allowed."
-        memento = self.caretaker.undo()  # 获取上一个状态
-        if memento is None:
-            return "Undo not allowed."
-        else:
-            self.game.restore_memento(memento)  # 恢复到上一个状态
-        self.allow_undo = False  # 每轮仅允许悔棋一次
-        return "Undo successfully."
+        if self.game_name not in self.AI_factories:
+            import AI_factory
+            self.AI_factories[self.game_name] = getattr(AI_factory, AI_FACTORY_NAMES[self.game_name])()
+        return self.AI_factories[self.game_name]
 
-    def new_turn(self):
+    def resume_game(self) -> bool:
         """
-        切换到下一轮玩家。
+        当前游戏有自动保存的未完成对局时，询问玩家并从对局日志恢复。
+        :return: 是否已恢复对局
         """
-        self.allow_undo = True  # 允许悔棋
-        self.turn = 1 - self.turn  # 切换玩家
-        self.game.set_turn_taken(False)  # 新回合的玩家还没有落子
-        self.game.reset_curr_move()  # 清除 move
-        
-    def check_finish(self):
-        """
-        检查游戏是否结束（一方胜利或者平局）。
-        """
-        if self.game.allow_winner_check(self.chess_color[self.turn]):
-            winner_color = self.game.rule.check_win(self.game.get_chessboard())
-            if winner_color:
-                if self.players[0].color == winner_color:
-                    self.winner = self.players[0].name
-                else:
-                    self.winner = self.players[1].name
-                self.update_account_info()
-                self.UI_platform.display_chessboard(self.game.get_chessboard(), self.chess_color[self.turn], self.players[self.turn].name, self.players[self.turn].games, self.players[self.turn].wins)
-                time.sleep(1)
-                self.UI_platform.show_winner(self.winner)
-                self.play_game()
-            elif self.game.rule.check_draw(self.game.get_chessboard()):  # 平局情况
-                self.update_account_info()
-                self.UI_platform.display_chessboard(self.game.get_chessboard(), self.chess_color[self.turn], self.players[self.turn].name, self.players[self.turn].games, self.players[self.turn].wins)
-                time.sleep(1)
-                self.UI_platform.show_winner(None)
-                self.play_game()
-                
+        if self.journal is None or not self.journal.exists() or not self.UI_platform.choose_resume():
+            return False
+        is_valid, message = self.journal.recover(self.engine)
+        self.UI_platform.pop_message(message)
+        return is_valid
+
+    def on_event(self, event: GameEvent):
+        """
+        处理对局引擎发出的事件：对局状态发生变化，需要重绘并重新进行回合开始时的检查。
+        :param event: 对局事件
+        """
+        self.state_changed()
+        if event.type == EVENT_NO_VALID_MOVES:
+            self.display_chessboard()
+            self.UI_platform.pop_message("No valid moves.")
+
+    def state_changed(self):
+        """
+        标记对局状态已变化（落子、悔棋、加载局面等）。
+        """
+        self.redraw_needed = True
+        self.turn_checked = False
+
+    def display_chessboard(self):
+        """
+        显示当前棋盘与当前行棋方信息。
+        """
+        player = self.players[self.turn]
+        self.UI_platform.display_chessboard(self.game.get_chessboard(), self.chess_color[self.turn], player.name, player.games, player.wins)
+
+    def finish_game(self, pause: bool=True):
+        """
+        对局结束：更新战绩，并进入显示胜者的状态。
+        :param pause: 是否先显示终局棋盘并停留片刻
+        """
+        winner_color = self.engine.winner
+        self.winner = None if winner_color is None else self.players[self.chess_color.index(winner_color)].name
+        self.update_account_info()
+        if self.journal is not None:
+            self.journal.discard()  # 已经结束的对局不需要恢复
+        if pause:
+            self.display_chessboard()
+            time.sleep(1)
+        self.state = SESSION_GAME_OVER
+
     def next_turn(self, end_turn: bool=False):
         """
         玩家请求结束当前回合
         :param end_turn: 是否是玩家主动结束回合
         """
-        next_turn_allowed, message = self.game.next_turn_allowed(end_turn)
-        if next_turn_allowed:  # 当前玩家已经落子（或围棋玩家选择 skip）
-            self.check_finish()  # 检查是否终局
-            self.new_turn()  # 切换到下一轮
-        else:
+        next_turn_allowed, message = self.engine.end_turn() if end_turn else self.engine.next_turn()
+        if not next_turn_allowed:
             self.UI_platform.pop_message(message)
             
     def init_player(self, is_first_hand: bool) -> tuple[bool, bool, str]:
@@ -149,7 +201,7 @@ class Client():
         if is_guest:
             return Player(is_guest=True, is_AI=False, name="GUEST", color=color)
         if is_AI:
-            return self.AI_factory.createAI(ai_level, color)
+            return self.get_AI_factory().createAI(ai_level, color)
         # 用户输入 username 和 password
         if is_registered_user:
             # 已注册用户登陆
@@ -181,124 +233,210 @@ class Client():
                 player.wins += 1
             self.account_manager.update_account_info(player=player)
             
-    def play_game(self, game_name: str=None, board_size: int=None):  # TODO: 考虑作为模板方法
+    def login_players(self):
         """
-        开始游戏主循环。
-        :param game_name: 游戏名称（可选）
-        :param board_size: 棋盘大小（可选）
+        先手与后手玩家依次登录或注册（包括游客玩家或 AI 玩家），并加入对局引擎。
         """
-        # 初始化游戏状态
-        self.__init__()
-        self.choose_game(game_name)  # 选择游戏
-        self.set_game()  # 创建游戏和 UI
-        
-        # 玩家登录或注册，包括游客玩家或AI玩家
         while self.players[0] is None:
             self.players[0] = self.init_player(is_first_hand=True)
-        # self.players[0].show_info()
         while self.players[1] is None:
             self.players[1] = self.init_player(is_first_hand=False)
-        # self.players[1].show_info()
+        self.engine.set_player(0, self.players[0])
+        self.engine.set_player(1, self.players[1])
 
-        self.game.set_turn_taken(False)  # 新游戏的玩家还没有落子
-        self.init_board(board_size)  # 初始化棋盘
-        
-        while True:
-            # 每轮更新 UI 显示棋盘状态
-            self.UI_platform.display_chessboard(self.game.get_chessboard(), self.chess_color[self.turn], self.players[self.turn].name, self.players[self.turn].games, self.players[self.turn].wins)
-            
-            # 没有合法步可以走
-            if not self.game.rule.has_valid_moves(self.game.chessboard, self.chess_color[self.turn]):
-                self.UI_platform.pop_message("No valid moves.")
-                self.game.set_skip_last_turn(self.chess_color[self.turn], True)
-                self.check_finish()
-                self.game.set_turn_taken(True)
-                self.next_turn()
-                
-            if self.players[self.turn].is_AI:
-                time.sleep(1)
-                row, col = self.players[self.turn].calculate_move(self.game.chessboard)
-                x = (col + 1) * GRID_SIZE
-                y = (row + 1) * GRID_SIZE
-                event = (pygame.MOUSEBUTTONDOWN, (x, y))
-            else:
-                event = self.UI_platform.detect_event()  # 检测 UI 操作事件
-            if event is not None:
-                event_type, event_val = event
-                if event_type == pygame.MOUSEBUTTONDOWN:
-                    # 计算点击位置对应的棋盘坐标
-                    x, y = event_val
-                    col = round((x - GRID_SIZE) / GRID_SIZE)
-                    row = round((y - GRID_SIZE) / GRID_SIZE)
-                    # print(f"turn: {self.turn}, row: {row}, col: {col}")
-                    is_valid_move, message = self.game.rule.is_valid_move(row, col, self.game.get_chessboard(), self.chess_color[self.turn], self.game.get_turn_taken())
-                    if is_valid_move:
-                        # 如果是合法落子，保存状态并更新棋盘
-                        self.make_move(row, col)
-                        self.game.set_skip_last_turn(self.chess_color[self.turn], False)  # 围棋中取消跳过落子标记
-                        self.next_turn()
-                    elif self.UI_platform.admit_defeat(mouse_pos=event_val):
-                        # 玩家认输
-                        self.winner = self.players[1 - self.turn].name
-                        self.UI_platform.show_winner(self.winner)
-                        self.update_account_info()
-                        self.play_game()
-                    elif self.UI_platform.restart(mouse_pos=event_val):
-                        # 重新开始游戏
-                        self.play_game()
-                    elif self.UI_platform.undo(mouse_pos=event_val):
-                        # 玩家请求悔棋
-                        message = self.undo_move()
-                        self.UI_platform.pop_message(message)
-                    elif self.UI_platform.store_state(mouse_pos=event_val):
-                        # 玩家请求存储当前局面
-                        if self.game.get_turn_taken():  # 玩家只能在自己行棋之前存储局面
-                            self.UI_platform.pop_message("You can only Store State before taking move.")
-                            continue
-                        file_path = self.UI_platform.select_file(is_store=True)
-                        message = self.game.store_state(file_path, self.turn, self.caretaker.memento_list)
-                        self.UI_platform.pop_message(message)
-                    elif self.UI_platform.load_state(mouse_pos=event_val):
-                        # 玩家请求加载历史局面
-                        if self.game.get_turn_taken():  # 玩家只能在自己行棋之前加载历史局面
-                            self.UI_platform.pop_message("You can only Load State before taking move.")
-                            continue
-                        file_path = self.UI_platform.select_file(is_store=False)
-                        is_valid, message = self.game.load_state(file_path, self.turn, playback=False)
-                        self.UI_platform.pop_message(message)
-                    elif self.UI_platform.playback(mouse_pos=event_val):
-                        # 玩家请求回放历史局面
-                        file_path = self.UI_platform.select_file(is_store=False)
-                        is_valid, _ = self.game.load_state(file_path, self.turn, playback=True)
-                        if not is_valid:
-                            message = _
-                            self.UI_platform.pop_message(message)
-                        else:
-                            chessboards = _
-                            temp_chessboard = Chessboard(self.game.chessboard.get_size())
-                            turn = 0
-                            for chessboard in chessboards:
-                                temp_chessboard.set_board(chessboard)
-                                self.UI_platform.display_chessboard(chessboard=temp_chessboard, turn=self.chess_color[turn], player_name=self.players[turn].name, games=self.players[turn].games, wins=self.players[turn].wins)
-                                turn = 1 - turn
-                                time.sleep(1)
-                            self.UI_platform.pop_message("Playback finished.")
-                                
-                    elif self.UI_platform.capture(mouse_pos=event_val):
-                        # 围棋玩家请求提子
-                        message = self.game.capture()
-                        self.UI_platform.pop_message(message)
-                    elif self.UI_platform.end_turn(mouse_pos=event_val):
-                        # 只有围棋玩家有该按键
-                        if self.game.get_turn_taken() == False:  # 玩家执行虚着
-                            self.game.set_skip_last_turn(self.chess_color[self.turn], True)
-                            self.check_finish()
-                        self.next_turn(end_turn=True)
-                    elif self.UI_platform.view_hints(mouse_pos=event_val):
-                        self.UI_platform.pop_message(self.game.get_hints(), text_color=BLACK)
-                    else:  # 没有合法落子且没有点击其它按键
-                        self.UI_platform.pop_message(message)
-                elif event_type == pygame.KEYDOWN:
-                    if event_val == pygame.K_RETURN:
-                        self.next_turn(end_turn=True)
-            
\ No newline at end of file
+    def play_game(self, game_name: str=None, board_size: int=None):
+        """
+        会话主循环：依次选择游戏、玩家登录、对局、显示胜者，之后回到选择游戏，直到玩家退出。
+        窗口、UI、AI 工厂与账户管理在整个会话中复用，每局结束后只替换对局引擎与玩家。
+        :param game_name: 第一局的游戏名称（可选）
+        :param board_size: 第一局的棋盘大小（可选）
+        """
+        self.state = SESSION_CHOOSE_GAME
+        while self.state != SESSION_EXIT:
+            if self.state == SESSION_CHOOSE_GAME:
+                self.reset_game()
+                self.choose_game(game_name)  # 选择游戏
+                self.set_game()  # 创建对局引擎并切换 UI
+                game_name = None
+                self.state = SESSION_LOGIN
+            elif self.state == SESSION_LOGIN:
+                self.login_players()
+                if not self.resume_game():
+                    self.init_board(board_size)  # 初始化棋盘，开始对局
+                if self.journal is not None:
+                    self.journal.attach(self.engine)  # 之后每一步写入对局日志
+                board_size = None
+                self.state = SESSION_PLAYING
+            elif self.state == SESSION_PLAYING:
+                self.play_turn()
+            elif self.state == SESSION_GAME_OVER:
+                is_new_game = self.UI_platform.show_winner(self.winner)
+                self.state = SESSION_CHOOSE_GAME if is_new_game else SESSION_EXIT
+        pygame.quit()
+
+    def start_playback(self, source):
+        """
+        开始回放（回放由主循环驱动，不阻塞输入）。
+        :param source: 局面读取器（Engine.load_state 回放时返回），或按顺序排列的各步棋盘
+        """
+        self.playback = Playback(source)
+        self.playback_chessboard = Chessboard(len(self.playback.board))
+        self.playback_chessboard.board = self.playback.board  # 回放原地更新棋盘，不需要逐帧复制
+        self.redraw_needed = True
+
+    def stop_playback(self):
+        """
+        结束回放，回到当前对局。
+        """
+        self.playback.close()
+        self.playback = None
+        self.playback_chessboard = None
+        self.state_changed()
+
+    def play_playback(self):
+        """
+        回放中的一次循环：按时钟推进并在当前步变化时重绘，等待输入直到下一步的时间。
+        空格暂停/继续，左右方向键单步，上下方向键调整速度，PageUp/PageDown 跳转 10 步，
+        Home/End 跳到开头/结尾，Esc、Enter 或再次点击回放按钮结束回放。
+        """
+        playback = self.playback
+        if playback.update(time.monotonic()) or self.redraw_needed:
+            self.redraw_needed = False
+            self.UI_platform.limit_frame_rate()
+            turn = playback.position % 2
+            player = self.players[turn]
+            self.UI_platform.display_chessboard(self.playback_chessboard, self.chess_color[turn], player.name, player.games, player.wins)
+            state = "Playing" if playback.playing else ("Finished" if playback.finished else "Paused")
+            total = "?" if playback.length is None else playback.length - 1  # 尚未读到最后一步
+            self.UI_platform.display_status([f"Move {playback.position}/{total}  x{playback.speed:g}", state,
+                                             "Space Arrows PgUp/Dn Esc"])
+
+        wait = playback.time_to_next_step(time.monotonic())
+        event = self.UI_platform.detect_event(timeout=None if wait is None else max(int(wait * 1000), 1))
+        if event is None:
+            return
+        self.redraw_needed = True
+        event_type, event_val = event
+        if event_type == pygame.MOUSEBUTTONDOWN:
+            if self.UI_platform.playback(mouse_pos=event_val):
+                self.stop_playback()
+        elif event_type == pygame.KEYDOWN:
+            if event_val in (pygame.K_ESCAPE, pygame.K_RETURN):
+                self.stop_playback()
+            elif event_val == pygame.K_SPACE:
+                playback.toggle()
+            elif event_val == pygame.K_RIGHT:
+                playback.step(1)
+            elif event_val == pygame.K_LEFT:
+                playback.step(-1)
+            elif event_val == pygame.K_UP:
+                playback.change_speed(2)
+            elif event_val == pygame.K_DOWN:
+                playback.change_speed(0.5)
+            elif event_val == pygame.K_PAGEDOWN:
+                playback.seek(playback.position + 10)
+            elif event_val == pygame.K_PAGEUP:
+                playback.seek(playback.position - 10)
+            elif event_val == pygame.K_HOME:
+                playback.seek(0)
+            elif event_val == pygame.K_END:
+                playback.seek_end()
+
+    def play_turn(self):
+        """
+        对局中的一次循环：只在状态变化后重绘棋盘并进行回合开始时的检查；
+        AI 回合由 AI 落子，玩家回合阻塞等待下一个操作事件并处理，必要时切换会话状态。
+        """
+        if self.engine.game_over:
+            self.finish_game()
+            return
+
+        if self.playback is not None:
+            self.play_playback()
+            return
+
+        if self.redraw_needed:
+            self.redraw_needed = False
+            self.UI_platform.limit_frame_rate()
+            self.display_chessboard()
+
+        # 回合开始：没有合法步可以走时自动结束回合（状态变化后才检查）
+        if not self.turn_checked:
+            self.turn_checked = True
+            if self.engine.begin_turn():
+                return
+
+        if self.players[self.turn].is_AI:
+            time.sleep(1)
+            self.engine.play_ai()  # AI 落子（围棋中自动提子，无处可下时虚着）
+            return
+        event = self.UI_platform.detect_event()  # 等待下一个 UI 操作事件
+        self.redraw_needed = True  # 操作可能弹出提示框，处理后重绘棋盘
+        if event is not None:
+            event_type, event_val = event
+            if event_type == pygame.MOUSEBUTTONDOWN:
+                # 计算点击位置对应的棋盘坐标
+                x, y = event_val
+                col = round((x - GRID_SIZE) / GRID_SIZE)
+                row = round((y - GRID_SIZE) / GRID_SIZE)
+                is_valid_move, message = self.engine.play(row, col)
+                if is_valid_move:
+                    pass
+                elif self.UI_platform.admit_defeat(mouse_pos=event_val):
+                    # 玩家认输
+                    self.engine.resign()
+                    self.finish_game(pause=False)
+                elif self.UI_platform.restart(mouse_pos=event_val):
+                    # 重新开始游戏
+                    if self.journal is not None:
+                        self.journal.discard()
+                    self.state = SESSION_CHOOSE_GAME
+                elif self.UI_platform.undo(mouse_pos=event_val):
+                    # 玩家请求悔棋
+                    _, message = self.engine.undo()
+                    self.UI_platform.pop_message(message)
+                elif self.UI_platform.store_state(mouse_pos=event_val):
+                    # 玩家请求存储当前局面
+                    if self.game.get_turn_taken():  # 玩家只能在自己行棋之前存储局面
+                        self.UI_platform.pop_message("You can only Store State before taking move.")
+                        return
+                    file_path = self.UI_platform.select_file(is_store=True)
+                    message = self.engine.store_state(file_path)
+                    self.UI_platform.pop_message(message)
+                elif self.UI_platform.load_state(mouse_pos=event_val):
+                    # 玩家请求加载历史局面
+                    if self.game.get_turn_taken():  # 玩家只能在自己行棋之前加载历史局面
+                        self.UI_platform.pop_message("You can only Load State before taking move.")
+                        return
+                    file_path = self.UI_platform.select_file(is_store=False)
+                    is_valid, message = self.engine.load_state(file_path, playback=False)
+                    if is_valid:
+                        if self.journal is not None:
+                            self.journal.checkpoint()  # 加载局面不经过落子事件，直接写入检查点
+                        self.state_changed()
+                    self.UI_platform.pop_message(message)
+                elif self.UI_platform.playback(mouse_pos=event_val):
+                    # 玩家请求回放历史局面
+                    file_path = self.UI_platform.select_file(is_store=False)
+                    is_valid, result = self.engine.load_state(file_path, playback=True)
+                    if not is_valid:
+                        self.UI_platform.pop_message(result)
+                    else:
+                        try:
+                            self.start_playback(result)
+                        except ValueError as e:  # 文件中没有可回放的局面
+                            self.UI_platform.pop_message(str(e))
+                elif self.UI_platform.capture(mouse_pos=event_val):
+                    # 围棋玩家请求提子
+                    message = self.engine.capture()
+                    self.UI_platform.pop_message(message)
+                elif self.UI_platform.end_turn(mouse_pos=event_val):
+                    # 只有围棋玩家有该按键
+                    self.next_turn(end_turn=True)
+                elif self.UI_platform.view_hints(mouse_pos=event_val):
+                    self.UI_platform.pop_message(self.game.get_hints(), text_color=BLACK)
+                else:  # 没有合法落子且没有点击其它按键
+                    self.UI_platform.pop_message(message)
+            elif event_type == pygame.KEYDOWN:
+                if event_val == pygame.K_RETURN:
+                    self.next_turn(end_turn=True)
@@ -21,3 +21,33 @@ COMMON_BUTTON_LEFT = (GRID_SIZE * 18 + SCREEN_WIDTH - BUTTON_WIDTH) // 2
 # 浮窗参数
 ITEM_HEIGHT = 30
 VISIBLE_ITEMS = 10
+
+# 开局库文件
+GOMOKU_BOOK_PATH = "books/gomoku.book"
+OTHELLO_BOOK_PATH = "books/othello.book"
+
+# AI 每步搜索的时间上限（秒），到时返回目前找到的最佳落子
+AI_TIME_LIMIT = 2.0
+
+# 黑白棋残局库文件（按棋盘大小区分）
+OTHELLO_TABLEBASE_PATH = "books/othello{size}.tb"
+
+ENGINE_NAME = "OOP2024-Chess"  # 文本协议前端（GTP、Gomocup）报告的引擎名称
+ENGINE_VERSION = "1.0"
+
+FRAME_RATE = 30  # 图形客户端每秒最多重绘的次数
+
+PLAYBACK_SPEED = 1.0  # 回放的默认速度（每秒步数）
+PLAYBACK_KEYFRAME_INTERVAL = 16  # 回放时每隔多少步保存一个完整棋盘
+
+AUTOSAVE_DIR = "states/autosave"  # 对局日志（自动保存）所在目录
+JOURNAL_FSYNC = "turn"  # 对局日志的 fsync 策略："always"、"turn" 或 "never"
+JOURNAL_CHECKPOINT_INTERVAL = 64  # 对局日志每隔多少条记录写一次检查点
+
+FONT_SIZE = 40
+SMALL_FONT_SIZE = 30
+BACKGROUND_IMAGE_PATH = "pics/backgroud.jpeg"
+TEXT_CACHE_SIZE = 512  # 缓存的已渲染文字数量上限
+
+STARTUP_TIME_TARGET = 1.0  # 图形客户端冷启动到显示首个界面的时间目标（秒）
+HEADLESS_STARTUP_TIME_TARGET = 0.5  # 无界面工具（引擎、协议前端）冷启动导入的时间目标（秒）
@@ -0,0 +1,341 @@
+from game_factory import *
+from memento import *
+from player import *
+
+# 对局事件类型
+EVENT_GAME_STARTED = "game_started"  # 对局开始：board_size
+EVENT_MOVE = "move"  # 落子：row, col, color, flipped（黑白棋翻转的棋子）
+EVENT_CAPTURE = "capture"  # 围棋提子：color, message, removed（被提走的棋子）
+EVENT_PASS = "pass"  # 围棋虚着：color
+EVENT_NO_VALID_MOVES = "no_valid_moves"  # 当前行棋方没有合法棋步：color
+EVENT_TURN = "turn"  # 轮到下一方：color
+EVENT_UNDO = "undo"  # 悔棋：color
+EVENT_GAME_OVER = "game_over"  # 对局结束：winner（颜色，平局为 None），reason
+
+# 对局事件
+class GameEvent:
+    def __init__(self, type: str, **data):
+        """
+        :param type: 事件类型（EVENT_* 常量）
+        :param data: 事件数据
+        """
+        self.type = type
+        self.data = data
+
+    def __repr__(self):
+        return f"GameEvent({self.type!r}, {self.data!r})"
+
+# 无界面的对局引擎：持有游戏、玩家、悔棋历史与回合逻辑，并向监听者发出事件
+class Engine:
+    """
+    不依赖 pygame，可被图形客户端、服务器、批量对局等不同前端驱动。
+    前端调用 begin_turn / play / next_turn / undo / capture / end_turn / resign 推进对局，
+    并通过 add_listener 注册的回调接收 GameEvent。
+    """
+    def __init__(self, game_factory: GameFactory, players: list[Player]=None, keep_history: bool=True):
+        """
+        :param game_factory: 游戏工厂
+        :param players: [先手玩家, 后手玩家]，可以之后再通过 set_player 设置
+        :param keep_history: 是否在每步之后保存备忘录（关闭后无法悔棋与存储局面，批量对局更快）
+        """
+        self.game_factory = game_factory
+        self.game: Game = None
+        self.caretaker: Caretaker = None  # 负责管理悔棋历史的对象
+        self.players: list[Player] = list(players) if players is not None else [None, None]
+        self.chess_color: list[str] = ["BLACK", "WHITE"]
+        self.turn: int = 0  # 当前轮到的玩家
+        self.allow_undo: bool = True  # 是否允许当前玩家悔棋
+        self.game_over: bool = False
+        self.winner: str = None  # 胜者颜色，平局或未结束时为 None
+        self.keep_history = keep_history
+        self.listeners = []
+
+    def add_listener(self, callback):
+        """
+        注册事件回调。
+        :param callback: 接收 GameEvent 的函数
+        """
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self.listeners.remove(callback)
+
+    def emit(self, type: str, **data):
+        """
+        向所有监听者发出事件。
+        """
+        event = GameEvent(type, **data)
+        for callback in list(self.listeners):
+            callback(event)
+
+    def set_player(self, index: int, player: Player):
+        """
+        :param index: 0 为先手（黑），1 为后手（白）
+        :param player: 玩家对象
+        """
+        self.players[index] = player
+
+    def start(self, board_size: int):
+        """
+        创建游戏并开始新的对局。
+        :param board_size: 棋盘大小
+        """
+        self.game = self.game_factory.createGame()
+        self.game.set_chessboard(board_size)
+        self.game.set_turn_taken(False)  # 新游戏的玩家还没有落子
+        self.caretaker = Caretaker()
+        self.caretaker.save_memento(self.game.create_memento())  # 存储初始棋盘
+        self.turn = 0
+        self.allow_undo = True
+        self.game_over = False
+        self.winner = None
+        self.emit(EVENT_GAME_STARTED, board_size=board_size)
+
+    def get_chessboard(self) -> Chessboard:
+        return self.game.get_chessboard()
+
+    def current_color(self) -> str:
+        return self.chess_color[self.turn]
+
+    def current_player(self) -> Player:
+        return self.players[self.turn]
+
+    def begin_turn(self) -> bool:
+        """
+        回合开始时的处理：当前行棋方没有合法棋步时记为虚着，检查终局并切换到对方。
+        :return: 是否已自动结束当前回合（或对局已结束）
+        """
+        if self.game_over:
+            return True
+        color = self.current_color()
+        if self.game.rule.has_valid_moves(self.game.chessboard, color):
+            return False
+        self.emit(EVENT_NO_VALID_MOVES, color=color)
+        self.game.set_skip_last_turn(color, True)
+        self.check_finish()
+        if not self.game_over:
+            self.game.set_turn_taken(True)
+            self.next_turn()
+        return True
+
+    def play(self, row: int, col: int) -> tuple[bool, str]:
+        """
+        当前行棋方落子，合法时保存状态并尝试结束回合。
+        :param row: 行坐标
+        :param col: 列坐标
+        :return: 是否落子成功，不成功时的提示信息
+        """
+        if self.game_over:
+            return False, "Game over."
+        color = self.current_color()
+        is_valid_move, message = self.game.rule.is_valid_move(row, col, self.game.get_chessboard(), color, self.game.get_turn_taken())
+        if not is_valid_move:
+            return False, message
+        self.game.make_move(row=row, col=col, curr_turn=color)
+        if self.keep_history:
+            self.caretaker.save_memento(self.game.create_memento(move=(row, col, color)))  # 保存当前状态
+        self.game.set_skip_last_turn(color, False)  # 围棋中取消跳过落子标记
+        self.emit(EVENT_MOVE, row=row, col=col, color=color, flipped=self.game.curr_flipped)
+        self.next_turn()
+        return True, None
+
+    def next_turn(self, end_turn: bool=False) -> tuple[bool, str]:
+        """
+        结束当前回合：检查是否终局，未终局时切换到下一方。
+        :param end_turn: 是否是玩家主动结束回合
+        :return: 是否切换成功，不成功时的提示信息
+        """
+        next_turn_allowed, message = self.game.next_turn_allowed(end_turn)
+        if not next_turn_allowed:  # 当前玩家尚未落子（或围棋中尚未提子）
+            return False, message
+        self.check_finish()
+        if not self.game_over:
+            self.new_turn()
+        return True, None
+
+    def new_turn(self):
+        """
+        切换到下一轮玩家。
+        """
+        self.allow_undo = True  # 允许悔棋
+        self.turn = 1 - self.turn  # 切换玩家
+        self.game.set_turn_taken(False)  # 新回合的玩家还没有落子
+        self.game.reset_curr_move()  # 清除 move
+        self.emit(EVENT_TURN, color=self.current_color())
+
+    def check_finish(self):
+        """
+        检查游戏是否结束（一方胜利或者平局）。
+        """
+        if self.game.allow_winner_check(self.current_color()):
+            if self.game.curr_move is not None:  # 刚落子时只需检查与该落子相关的部分
+                winner_color = self.game.rule.check_win_after_move(self.game.get_chessboard(), *self.game.curr_move)
+            else:
+                winner_color = self.game.rule.check_win(self.game.get_chessboard())
+            if winner_color:
+                self.finish(winner_color, "win")
+            elif self.game.rule.check_draw(self.game.get_chessboard()):
+                self.finish(None, "draw")
+
+    def finish(self, winner: str, reason: str):
+        """
+        结束对局。
+        :param winner: 胜者颜色，平局为 None
+        :param reason: 结束原因（"win"、"draw"、"resign"）
+        """
+        self.game_over = True
+        self.winner = winner
+        self.emit(EVENT_GAME_OVER, winner=winner, reason=reason)
+
+    def resign(self):
+        """
+        当前行棋方认输。
+        """
+        if not self.game_over:
+            self.finish(self.chess_color[1 - self.turn], "resign")
+
+    def undo(self) -> tuple[bool, str]:
+        """
+        执行悔棋操作，回到当前玩家上一次落子前的状态（每轮仅允许一次）。
+        :return: 是否成功，提示信息
+        """
+        if not self.allow_undo:
+            return False, "Undo not allowed."
+        memento = self.caretaker.undo()  # 获取上一个状态
+        if memento is None:
+            return False, "Undo not allowed."
+        self.game.restore_memento(memento)  # 恢复到上一个状态
+        self.allow_undo = False
+        self.emit(EVENT_UNDO, color=self.current_color())
+        return True, "Undo successfully."
+
+    def capture(self) -> str:
+        """
+        围棋提子。
+        :return: 提示信息
+        """
+        message = self.game.capture()
+        if self.keep_history and self.game.curr_captured:  # 悔棋历史中本步的局面改为提子之后的局面（与对局记录重放一致）
+            self.caretaker.memento_list[-1].set_chessboard(self.game.get_chessboard())
+        self.emit(EVENT_CAPTURE, color=self.current_color(), message=message, removed=self.game.curr_captured)
+        return message
+
+    def end_turn(self) -> tuple[bool, str]:
+        """
+        玩家主动结束回合（围棋）：尚未落子时记为虚着并检查终局。不允许虚着的游戏（五子棋、黑白棋）中不改变状态也不发出事件。
+        :return: 是否切换成功，不成功时的提示信息
+        """
+        if not self.game.get_turn_taken():  # 玩家执行虚着
+            next_turn_allowed, message = self.game.next_turn_allowed(end_turn=True)
+            if not next_turn_allowed:  # 先检查是否允许虚着，再记录虚着
+                return False, message
+            color = self.current_color()
+            self.game.set_skip_last_turn(color, True)
+            self.emit(EVENT_PASS, color=color)
+            self.check_finish()
+            if self.game_over:
+                return True, None
+        return self.next_turn(end_turn=True)
+
+    def play_move(self, row: int, col: int) -> tuple[bool, str]:
+        """
+        落子并结束回合；落子后仍需提子时（围棋）自动提子。供无界面前端使用。
+        :return: 是否落子成功，不成功时的提示信息
+        """
+        color = self.current_color()
+        is_valid, message = self.play(row, col)
+        if is_valid and not self.game_over and self.current_color() == color:
+            self.capture()
+            self.next_turn(end_turn=True)
+        return is_valid, message
+
+    def play_ai(self) -> tuple[bool, str]:
+        """
+        由当前 AI 玩家计算并落子，没有可下的位置时虚着。
+        :return: 是否落子成功，不成功时的提示信息
+        """
+        move = self.current_player().calculate_move(self.game.chessboard)
+        if move is None:
+            return self.end_turn()
+        return self.play_move(*move)
+
+    def force_turn(self, color: str):
+        """
+        将行棋方设为指定颜色（文本协议前端按指令设置局面时使用，不记为虚着）。
+        :param color: "BLACK" 或 "WHITE"
+        """
+        if self.current_color() != color:
+            self.new_turn()
+
+    def resume(self):
+        """
+        继续因双方虚着而结束的对局：清除终局状态与双方的虚着标记，行棋方不变。
+        """
+        self.game_over = False
+        self.winner = None
+        for color in self.chess_color:
+            self.game.set_skip_last_turn(color, False)
+
+    def set_position(self, board_size: int, moves: list[tuple[int, int, str]]) -> tuple[bool, str]:
+        """
+        从落子序列重建局面（双方连续虚着不结束对局）。
+        :param board_size: 棋盘大小
+        :param moves: [(row, col, color), ...]，按落子顺序；row 为 None 表示虚着
+        :return: 是否全部落子成功，不成功时的提示信息
+        """
+        self.start(board_size)
+        for row, col, color in moves:
+            self.force_turn(color)
+            if row is None:
+                self.end_turn()
+                if self.game_over:  # 双方虚着：对局按记录继续（如文本协议中虚着后的收官阶段）
+                    self.resume()
+                continue
+            is_valid, message = self.play_move(row, col)
+            if not is_valid:
+                return False, message or f"Invalid move ({row}, {col})."
+        return True, None
+
+    def restore_record(self, board_size: int, setup: list, moves: list[tuple[int, int, str]]):
+        """
+        按对局记录恢复局面：开始新的对局，按规则重放落子序列得到棋盘与悔棋历史，并设置行棋方与虚着标记。
+        重放不发出落子事件（只发出 EVENT_GAME_STARTED）。
+        :param board_size: 棋盘大小
+        :param setup: 初始局面的所有棋子，为 None 时为标准开局
+        :param moves: 落子序列 [(row, col, color), ...]，虚着的 row 为 None
+        """
+        self.start(board_size)
+        mementos, self.turn = self.game.replay_record(board_size, setup, moves)
+        self.game.chessboard.set_board(mementos[-1].get_chessboard().board)
+        self.caretaker.memento_list[:] = mementos
+        for color in self.chess_color:
+            own_moves = [row for row, _, move_color in moves if move_color == color]
+            self.game.set_skip_last_turn(color, bool(own_moves) and own_moves[-1] is None)  # 最近一次是否虚着
+
+    def run(self, max_plies: int=None) -> str:
+        """
+        由双方 AI 下完整局（无界面）。
+        :param max_plies: 最多的回合数，为 None 时不限
+        :return: 胜者颜色，平局或未下完时为 None
+        """
+        plies = 0
+        while not self.game_over and (max_plies is None or plies < max_plies):
+            plies += 1
+            if self.begin_turn():
+                continue
+            is_valid, message = self.play_ai()
+            if not is_valid:
+                raise ValueError(f"{self.current_player().name} made an invalid move: {message}")
+        return self.winner
+
+    def store_state(self, file_path: str) -> str:
+        """
+        存储当前局面及历史（初始局面加落子序列）到指定文件。
+        """
+        return self.game.store_state(file_path, self.turn, self.caretaker.memento_list)
+
+    def load_state(self, file_path: str, playback: bool) -> tuple[bool, object]:
+        """
+        从指定文件加载历史局面（或取得回放用的棋盘序列），加载局面时悔棋历史替换为对局记录中的各步。
+        """
+        return self.game.load_state(file_path, self.turn, playback=playback, memento_list=self.caretaker.memento_list)
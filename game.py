@@ -2,12 +2,17 @@ from abc import ABC, abstractmethod
 from game_rule import *
 from memento import *
 from chessboard import *
+from game_record import *
+from record_reader import *
 import copy
 import os
 import json
 
 # 抽象产品 & 发起人角色：Game
 class Game(ABC):
+    record_name: str = None  # 对局记录中的游戏名称
+    record_extension: str = ".txt"  # 对局记录文件的扩展名
+
     def __init__(self):
         """
         初始化游戏基类，包含棋盘和规则属性。
@@ -17,14 +22,17 @@ class Game(ABC):
         self.turn_taken: bool = False  # 当前回合的玩家是否已经落子
         self.states_stored: list[str] = []  # 当前游戏存储的历史局面
         self.curr_move: tuple[int, int] = None
+        self.curr_flipped: list[tuple[int, int]] = []  # 最近一次落子翻转的棋子（黑白棋）
+        self.curr_captured: list[tuple[int, int]] = []  # 最近一次提走的棋子（围棋）
         self.hints: str = None  # 游戏规则，指导玩家下棋
     
-    def create_memento(self):
+    def create_memento(self, move: tuple[int, int, str]=None):
         """
         创建当前棋盘状态的备忘录。
+        :param move: 得到当前状态的落子 (row, col, color)
         :return: 保存棋盘状态的 Memento 对象
         """
-        return Memento(self.chessboard)
+        return Memento(self.chessboard, move)
         
     def restore_memento(self, memento: Memento):
         """
@@ -83,6 +91,13 @@ class Game(ABC):
         :param skip: 是否跳过（布尔值）
         """
         pass
+
+    def get_skip_last_turn(self, turn: str) -> bool:
+        """
+        :param turn: 玩家颜色（"BLACK" 或 "WHITE"）
+        :return: 该玩家是否跳过了上一回合（不需要此逻辑的游戏始终为 False）
+        """
+        return False
     
     def set_turn_taken(self, taken):
         """
@@ -102,7 +117,7 @@ class Game(ABC):
     
     def store_state(self, file_path, curr_turn, momento_list: list[Memento]):
         """
-        存储当前局面和当前局面对应的下一个行棋方到指定文件。
+        存储对局记录（初始局面加落子序列）和当前局面对应的下一个行棋方到指定文件。
         :param file_path: 指定文件。
         :param curr_turn: 当前回合的玩家。
         :ruturn 成功/不成功
@@ -110,7 +125,7 @@ class Game(ABC):
         if file_path is None:
             return
         base_name = os.path.splitext(file_path)[0]
-        file_path = base_name + ".json"
+        file_path = base_name + self.record_extension
         if os.path.exists(file_path):
             return f"Please don't cover existing file {file_path}."
             
@@ -121,27 +136,35 @@ class Game(ABC):
             error_message = f"Failed to create directory '{file_dir}': {str(e)}"
             return error_message
         
-        state = {"curr_turn": curr_turn,
-                 "chessboards": [momento.get_chessboard().board for momento in momento_list]}
         with open(file_path, 'w') as f:
-            json.dump(state, f)
+            f.write(self.format_record(*self.get_record(curr_turn, momento_list)))
             
         self.states_stored.append(file_path)
         
         return f"Successfully stored current state to {file_path}."
     
-    def load_state(self, file_path: str, curr_turn: str, playback: bool):
+    def load_state(self, file_path: str, curr_turn: str, playback: bool, memento_list: list[Memento]=None):
         """
-        从指定文件加载历史局面和历史局面对应的下一个行棋方。
+        从指定文件加载对局记录，按规则重放各步得到历史局面和历史局面对应的下一个行棋方。
         :param file_path: 指定文件。
         :param curr_turn: 当前回合的玩家。
+        :param playback: 是否为回放（回放时返回局面读取器 PositionReader，不重放整个对局）
+        :param memento_list: 加载局面时替换为重放得到的各步备忘录（悔棋历史）
         :ruturn 成功/不成功
         """
         if file_path is None:
             return False, f"Input a valid file path."
+        if playback == True:  # 回放时不重放整个对局，由读取器按需读取各步局面
+            try:
+                reader = open_record_reader(file_path, self)
+            except Exception as e:
+                return False, f"Failed to load '{file_path}': {str(e)}"
+            if file_path not in self.states_stored:
+                reader.close()
+                return False, f"File {file_path} isn't a valid state for current game."
+            return True, reader
         try:
-            with open(file_path, 'r') as f:
-                state = json.load(f)
+            mementos, next_turn = self.read_record(file_path)
         except Exception as e:
             error_message = f"Failed to load '{file_path}': {str(e)}"
             return False, error_message
@@ -149,14 +172,116 @@ class Game(ABC):
         if file_path not in self.states_stored:
             return False, f"File {file_path} isn't a valid state for current game."
         
-        if playback == False:
-            if curr_turn == state["curr_turn"]:
-                self.chessboard.set_board(state["chessboards"][-1])
-                return True, f"Successfully loaded history state from {file_path}."
-            else:
-                return False, "Player of the state to be loaded dosen't match current state."
+        if curr_turn == next_turn:
+            self.chessboard.set_board(mementos[-1].get_chessboard().board)
+            if memento_list is not None:
+                memento_list[:] = mementos
+            return True, f"Successfully loaded history state from {file_path}."
         else:
-            return True, state["chessboards"]
+            return False, "Player of the state to be loaded dosen't match current state."
+
+    def get_record(self, curr_turn, momento_list: list[Memento]):
+        """
+        由悔棋历史得到对局记录。各步的落子直接取自备忘录（没有记录落子时比较相邻两个棋盘），
+        因此只与步数有关，不需要保存每一步的整个棋盘。
+        :param curr_turn: 当前回合的玩家。
+        :return: (棋盘大小, 初始局面（标准开局时为 None）, 落子序列)
+        """
+        initial = momento_list[0].get_chessboard()
+        moves = [momento.get_move() for momento in momento_list[1:]]
+        setup = self.get_setup(initial.board)
+        if None in moves:
+            moves = self.moves_from_boards(setup, [momento.get_chessboard().board for momento in momento_list])
+        return initial.get_size(), setup, fill_passes(moves, ["BLACK", "WHITE"][curr_turn])
+
+    def get_setup(self, board: list[list[str]]) -> list:
+        """
+        :return: 初始局面的所有棋子，标准开局时为 None
+        """
+        standard = type(self)()
+        standard.set_chessboard(len(board))
+        return None if standard.chessboard.board == board else setup_stones(board)
+
+    def moves_from_boards(self, setup: list, chessboards: list[list[list[str]]]) -> list:
+        """
+        比较相邻两个棋盘还原落子序列（用于没有记录落子的备忘录与旧的逐步保存整个棋盘的文件）。
+        边比较边按规则重放，使比较的是提子之后的棋盘。
+        :return: 落子序列（不含虚着）
+        """
+        game = self.start_record_game(len(chessboards[0]), setup)
+        moves = []
+        for chessboard in chessboards[1:]:
+            move = placed_stone(game.chessboard.board, chessboard)
+            if move is None or not game.rule.is_valid_move(move[0], move[1], game.chessboard, move[2], False)[0]:
+                continue
+            game.make_move(*move)
+            game.capture()
+            moves.append(move)
+        return moves
+
+    def start_record_game(self, board_size: int, setup: list):
+        """
+        :param setup: 初始局面的所有棋子，为 None 时为标准开局
+        :return: 用于重放对局记录的新游戏（不影响当前对局）
+        """
+        game = type(self)()
+        game.set_chessboard(board_size)
+        if setup is not None:
+            game.chessboard = Chessboard(board_size)
+            for row, col, color in setup:
+                game.chessboard.set_chess(row, col, color)
+        return game
+
+    def format_record(self, board_size: int, setup: list, moves: list) -> str:
+        """
+        生成对局记录文本（落子记谱，围棋为 SGF）。
+        """
+        return format_notation(self.record_name, board_size, setup, moves)
+
+    def parse_record(self, text: str):
+        """
+        解析对局记录文本。
+        :return: (棋盘大小, 初始局面（标准开局时为 None）, 落子序列)
+        """
+        game_name, board_size, setup, moves = parse_notation(text)
+        if game_name != self.record_name:
+            raise ValueError(f"Record is a {game_name} game.")
+        return board_size, setup, moves
+
+    def read_record(self, file_path: str):
+        """
+        读取对局记录并按规则重放（也兼容旧的逐步保存整个棋盘的 .json 文件）。
+        :return: (各步的备忘录, 下一个行棋方)
+        """
+        with open(file_path, 'r') as f:
+            if os.path.splitext(file_path)[1] != ".json":
+                return self.replay_record(*self.parse_record(f.read()))
+            state = json.load(f)
+        chessboards = state["chessboards"]
+        setup = self.get_setup(chessboards[0])
+        moves = fill_passes(self.moves_from_boards(setup, chessboards), ["BLACK", "WHITE"][state["curr_turn"]])
+        return self.replay_record(len(chessboards[0]), setup, moves)
+
+    def replay_record(self, board_size: int, setup: list, moves: list):
+        """
+        在新的棋盘上按规则重放落子序列（黑白棋自动翻转，围棋自动提子），不影响当前对局。
+        :param board_size: 棋盘大小
+        :param setup: 初始局面的所有棋子，为 None 时为标准开局
+        :param moves: 落子序列
+        :return: (初始局面与每次落子之后的备忘录, 下一个行棋方)
+        """
+        game = self.start_record_game(board_size, setup)
+        mementos = [game.create_memento()]
+        for row, col, color in moves:
+            if row is None:  # 虚着
+                continue
+            is_valid, message = game.rule.is_valid_move(row, col, game.chessboard, color, False)
+            if not is_valid:
+                raise ValueError(message or f"Invalid move {point_name(row, col)}.")
+            game.make_move(row, col, color)
+            game.capture()
+            mementos.append(game.create_memento(move=(row, col, color)))
+        return mementos, 0 if next_color(moves) == "BLACK" else 1
         
     @abstractmethod
     def next_turn_allowed(self, end_turn: bool=False) -> tuple[bool, str]:
@@ -185,6 +310,8 @@ class Game(ABC):
 
 # 具体产品（五子棋）
 class GomokuGame(Game):
+    record_name = "Gomoku"
+
     def __init__(self) -> None:
         """
         初始化五子棋游戏。
@@ -238,6 +365,9 @@ class GomokuGame(Game):
     
 # 具体产品（围棋）
 class GoGame(Game):
+    record_name = "Go"
+    record_extension = ".sgf"
+
     def __init__(self) -> None:
         """
         初始化围棋游戏。
@@ -258,14 +388,28 @@ class GoGame(Game):
         """
         执行玩家的提子操作。
         """
+        self.curr_captured = []
         if self.curr_move is not None:
             curr_capture = self.rule.get_curr_capture(self.curr_move[0], self.curr_move[1], self.chessboard)  # 获取可以提的子
             if curr_capture == []:
                 return "No chess to capture."
             self.rule.capture(curr_capture, self.chessboard)  # 执行提子操作
+            self.curr_captured = curr_capture
             return "Succesfully captured."
         else:
             return "Please set chess first."
+
+    def format_record(self, board_size, setup, moves):
+        """
+        生成 SGF 对局记录（虚着记为 B[] / W[]）。
+        """
+        return format_sgf(board_size, setup, moves, komi=self.rule.komi)
+
+    def parse_record(self, text):
+        """
+        解析 SGF 对局记录的主线。
+        """
+        return parse_sgf(text)
         
     def allow_winner_check(self, curr_turn):
         """
@@ -285,6 +429,9 @@ class GoGame(Game):
         elif turn == "WHITE":
             self.white_skip_last_turn = skip
 
+    def get_skip_last_turn(self, turn):
+        return self.black_skip_last_turn if turn == "BLACK" else self.white_skip_last_turn
+
     def set_turn_taken(self, taken):
         """
         设置当前回合的玩家是否已经落子。
@@ -296,7 +443,7 @@ class GoGame(Game):
         """
         是否可以进行下一轮。
         """
-        if not self.turn_taken:  # skip case（虚着）
+        if not self.turn_taken or self.curr_move is None:  # skip case（虚着，包括没有合法棋步时自动结束的回合）
             return True, None
         
         curr_capture = self.rule.get_curr_capture(self.curr_move[0], self.curr_move[1], self.chessboard)  # 获取可以提的子
@@ -310,6 +457,7 @@ class OthelloGame(Game):
     """
     黑白棋游戏类，继承自 Game。
     """
+    record_name = "Othello"
 
     def __init__(self) -> None:
         """
@@ -362,6 +510,9 @@ class OthelloGame(Game):
         elif turn == "WHITE":
             self.white_skip_last_turn = skip
 
+    def get_skip_last_turn(self, turn):
+        return self.black_skip_last_turn if turn == "BLACK" else self.white_skip_last_turn
+
     def next_turn_allowed(self, end_turn=False):
         """
         是否可以进行下一轮。
@@ -381,4 +532,5 @@ class OthelloGame(Game):
         flippable = self.rule.get_flippable_chess(row, col, self.chessboard, curr_turn)
         self.chessboard.set_chess(row, col, curr_turn)
         self.rule.flip_chess(flippable, self.chessboard, curr_turn)
+        self.curr_flipped = flippable
         self.set_turn_taken(True)
@@ -0,0 +1,202 @@
+from engine import *
+from commons import JOURNAL_FSYNC, JOURNAL_CHECKPOINT_INTERVAL
+import json
+import os
+
+JOURNAL_FSYNC_POLICIES = ("always", "turn", "never")
+
+# 只追加的对局日志：每次落子、提子、虚着、换手、悔棋、认输各写一行，用于崩溃后恢复对局
+class GameJournal:
+    """
+    由两个文件组成：
+        <path>        日志，每行一条记录 "<seq> <类型> <参数...>"：
+                          m row col color   落子          x         提子
+                          p color           虚着          n color   没有合法棋步
+                          t color           轮到 color    u         悔棋
+                          r                 认输
+        <path>.ckpt   检查点：{"seq", "game", "record", "passed"}，record 为 Game.format_record 生成的对局记录，
+                      passed 为跳过了上一回合的玩家颜色
+    每条记录只有几个字节，与对局长度无关。每隔 checkpoint_interval 条记录（在换手时）写一次检查点并清空日志，
+    检查点先写入临时文件再原子替换；恢复时从检查点重放对局记录，再应用日志中序号大于检查点的记录。
+    最后一行写到一半时崩溃的记录会被忽略。
+    fsync 策略：
+        "always"  每条记录之后 fsync
+        "turn"    每条记录写入操作系统（进程崩溃不丢失），换手、悔棋与认输时 fsync（断电最多丢失当前回合）
+        "never"   只写入操作系统，由操作系统决定何时落盘
+    需要对局引擎保存悔棋历史（keep_history=True），检查点由悔棋历史生成。
+    """
+    def __init__(self, path: str, fsync: str=JOURNAL_FSYNC, checkpoint_interval: int=JOURNAL_CHECKPOINT_INTERVAL):
+        """
+        :param path: 日志文件路径
+        :param fsync: fsync 策略（"always"、"turn" 或 "never"）
+        :param checkpoint_interval: 两次检查点之间最多的记录数
+        """
+        if fsync not in JOURNAL_FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}'.")
+        self.path = path
+        self.checkpoint_path = path + ".ckpt"
+        self.fsync = fsync
+        self.checkpoint_interval = checkpoint_interval
+        self.engine: Engine = None
+        self.file = None
+        self.seq = 0  # 最后一条记录的序号（跨检查点递增）
+        self.since_checkpoint = 0  # 上次检查点之后的记录数
+
+    def exists(self) -> bool:
+        """
+        :return: 是否有可以恢复的对局
+        """
+        return os.path.exists(self.checkpoint_path)
+
+    def attach(self, engine: Engine):
+        """
+        开始记录对局：先把当前局面写为检查点，之后记录引擎发出的每个事件。
+        :param engine: 对局引擎（已开始对局）
+        """
+        self.detach()
+        self.engine = engine
+        engine.add_listener(self.on_event)
+        self.checkpoint()
+
+    def detach(self):
+        """
+        停止记录（保留文件，之后仍可恢复）。
+        """
+        if self.engine is not None:
+            self.engine.remove_listener(self.on_event)
+            self.engine = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def discard(self):
+        """
+        停止记录并删除日志与检查点（对局正常结束或被放弃时）。
+        """
+        self.detach()
+        for path in (self.path, self.checkpoint_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def on_event(self, event: GameEvent):
+        data = event.data
+        if event.type == EVENT_GAME_STARTED:  # 同一引擎开始新的对局
+            self.checkpoint()
+        elif event.type == EVENT_MOVE:
+            self.append(f"m {data['row']} {data['col']} {data['color']}")
+        elif event.type == EVENT_CAPTURE:
+            self.append("x")
+        elif event.type == EVENT_PASS:
+            self.append(f"p {data['color']}")
+        elif event.type == EVENT_NO_VALID_MOVES:
+            self.append(f"n {data['color']}")
+        elif event.type == EVENT_TURN:
+            self.append(f"t {data['color']}", sync=True)
+            if self.since_checkpoint >= self.checkpoint_interval:
+                self.checkpoint()
+        elif event.type == EVENT_UNDO:
+            self.append("u", sync=True)
+        elif event.type == EVENT_GAME_OVER and data["reason"] == "resign":
+            self.append("r", sync=True)
+
+    def append(self, record: str, sync: bool=False):
+        """
+        追加一条记录。
+        :param sync: 是否为需要在 "turn" 策略下 fsync 的记录
+        """
+        self.seq += 1
+        self.since_checkpoint += 1
+        self.file.write(f"{self.seq} {record}\n")
+        self.file.flush()
+        if self.fsync == "always" or (sync and self.fsync == "turn"):
+            os.fsync(self.file.fileno())
+
+    def checkpoint(self):
+        """
+        把当前局面（对局记录）写为检查点，然后清空日志。
+        """
+        game = self.engine.game
+        checkpoint = {"seq": self.seq, "game": game.record_name,
+                      "record": game.format_record(*game.get_record(self.engine.turn, self.engine.caretaker.memento_list)),
+                      "passed": [color for color in self.engine.chess_color if game.get_skip_last_turn(color)]}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(checkpoint, f)
+            f.flush()
+            if self.fsync != "never":
+                os.fsync(f.fileno())
+        os.replace(temp_path, self.checkpoint_path)  # 崩溃时保留旧的或新的完整检查点
+        # 清空日志；在此之前崩溃时，日志中已包含在检查点内的记录按序号跳过
+        if self.file is not None:
+            self.file.close()
+        self.file = open(self.path, "w")
+        self.since_checkpoint = 0
+
+    def recover(self, engine: Engine) -> tuple[bool, str]:
+        """
+        从检查点与之后的日志恢复对局（不会写入日志，恢复后调用 attach 继续记录）。
+        :param engine: 对局引擎（与记录的游戏相同，玩家已设置）
+        :return: 是否恢复成功，提示信息
+        """
+        try:
+            with open(self.checkpoint_path, "r") as f:
+                checkpoint = json.load(f)
+            game = engine.game_factory.createGame()
+            if checkpoint["game"] != game.record_name:
+                return False, f"Autosave is a {checkpoint['game']} game."
+            engine.restore_record(*game.parse_record(checkpoint["record"]))
+            if "passed" in checkpoint:  # 悔棋后对局记录中的虚着不一定反映双方的虚着标记，以检查点中的为准
+                for color in engine.chess_color:
+                    engine.game.set_skip_last_turn(color, color in checkpoint["passed"])
+        except Exception as e:
+            return False, f"Failed to recover '{self.checkpoint_path}': {str(e)}"
+        self.seq = checkpoint["seq"]
+
+        applied = 0
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                for line in f:
+                    if not line.endswith("\n"):  # 写到一半的最后一行
+                        break
+                    fields = line.split()
+                    if not fields or not fields[0].isdigit():
+                        break
+                    seq = int(fields[0])
+                    if seq <= self.seq:  # 已包含在检查点中
+                        continue
+                    if not self.apply(engine, fields[1:]):
+                        break
+                    self.seq = seq
+                    applied += 1
+        return True, f"Recovered autosaved game ({applied} journal records after checkpoint)."
+
+    def apply(self, engine: Engine, record: list[str]) -> bool:
+        """
+        把一条日志记录应用到对局引擎。
+        :return: 是否应用成功
+        """
+        kind, args = record[0], record[1:]
+        if kind == "m":
+            if engine.current_color() != args[2]:
+                return False
+            is_valid, _ = engine.play(int(args[0]), int(args[1]))
+            return is_valid
+        if kind == "x":
+            engine.capture()
+        elif kind == "p":
+            engine.end_turn()
+        elif kind == "n":
+            engine.begin_turn()
+        elif kind == "t":
+            if engine.current_color() != args[0]:
+                engine.next_turn(end_turn=True)
+        elif kind == "u":
+            engine.undo()
+        elif kind == "r":
+            engine.resign()
+        else:
+            return False
+        return True
@@ -0,0 +1,209 @@
+import re
+
+# 对局记录：初始局面加落子序列，取代逐步保存整个棋盘。
+# 围棋使用 SGF（FF[4]），五子棋与黑白棋使用如下落子记谱：
+#     Othello 8
+#     setup B:d5,e4 W:d4,e5        （可选，只有初始局面不是标准开局时才有）
+#     f5 d6 c3 d3 c4 pass ...
+# 落子记为列字母加行号（第 0 行为 1），"pass" 为虚着，双方轮流行棋、黑方先行。
+# 落子序列中的一项为 (row, col, color)，虚着的 row 与 col 为 None。
+
+COLOR_CODES = {"BLACK": "B", "WHITE": "W"}
+CODE_COLORS = {"B": "BLACK", "W": "WHITE"}
+MOVES_PER_LINE = 16
+SGF_PROPERTY = re.compile(r"\s*([A-Z]+)((?:\s*\[(?:\\.|[^\]\\])*\])+)", re.S)
+SGF_VALUE = re.compile(r"\[((?:\\.|[^\]\\])*)\]", re.S)
+
+def other_color(color: str) -> str:
+    return "WHITE" if color == "BLACK" else "BLACK"
+
+def next_color(moves: list[tuple[int, int, str]]) -> str:
+    """
+    :return: 落子序列之后的行棋方颜色
+    """
+    return other_color(moves[-1][2]) if moves else "BLACK"
+
+def placed_stone(before: list[list[str]], after: list[list[str]]) -> tuple[int, int, str]:
+    """
+    找出从 before 到 after 新落下的棋子：新出现的棋子（黑白棋中被翻转的棋子原来就有子，
+    围棋中可能落在刚被提走的位置，因此 before 应为提子之后的棋盘）。
+    :return: (row, col, color)，找不到或无法确定时为 None
+    """
+    changed = [(row, col) for row in range(len(after)) for col in range(len(after))
+               if after[row][col] is not None and after[row][col] != before[row][col]]
+    if len(changed) > 1:  # 黑白棋：翻转的棋子原来就有子
+        changed = [(row, col) for row, col in changed if before[row][col] is None]
+    if len(changed) != 1:
+        return None
+    row, col = changed[0]
+    return row, col, after[row][col]
+
+def fill_passes(moves: list[tuple[int, int, str]], curr_turn: str=None) -> list[tuple[int, int, str]]:
+    """
+    在同一方连续的两次落子之间补上对方的虚着，使落子序列从黑方开始双方轮流。
+    :param moves: 落子序列
+    :param curr_turn: 序列之后的行棋方颜色，与序列不符时在末尾补一个虚着
+    :return: 补全后的落子序列
+    """
+    filled = []
+    for move in moves:
+        if next_color(filled) != move[2]:
+            filled.append((None, None, other_color(move[2])))
+        filled.append(move)
+    if curr_turn is not None and next_color(filled) != curr_turn:
+        filled.append((None, None, other_color(curr_turn)))
+    return filled
+
+def setup_stones(board: list[list[str]]) -> list[tuple[int, int, str]]:
+    """
+    :return: 棋盘上所有棋子 [(row, col, color), ...]
+    """
+    return [(row, col, chess) for row, line in enumerate(board) for col, chess in enumerate(line) if chess is not None]
+
+def point_name(row: int, col: int) -> str:
+    return f"{chr(ord('a') + col)}{row + 1}"
+
+def parse_point(name: str, board_size: int) -> tuple[int, int]:
+    match = re.fullmatch(r"([a-z])(\d+)", name)
+    if match is None:
+        raise ValueError(f"Invalid move '{name}'.")
+    row, col = int(match.group(2)) - 1, ord(match.group(1)) - ord("a")
+    if not (0 <= row < board_size and 0 <= col < board_size):
+        raise ValueError(f"Move '{name}' is off the board.")
+    return row, col
+
+def format_notation(game_name: str, board_size: int, setup: list[tuple[int, int, str]], moves: list[tuple[int, int, str]]) -> str:
+    """
+    生成落子记谱。
+    :param game_name: 游戏名称
+    :param board_size: 棋盘大小
+    :param setup: 初始局面的所有棋子，为 None 时为标准开局
+    :param moves: 落子序列（从黑方开始双方轮流）
+    :return: 记谱文本
+    """
+    lines = [f"{game_name} {board_size}"]
+    if setup is not None:
+        lines.append("setup " + " ".join(
+            code + ":" + ",".join(point_name(row, col) for row, col, chess in setup if chess == color)
+            for color, code in COLOR_CODES.items()))
+    tokens = ["pass" if row is None else point_name(row, col) for row, col, _ in moves]
+    lines.extend(" ".join(tokens[i:i + MOVES_PER_LINE]) for i in range(0, len(tokens), MOVES_PER_LINE))
+    return "\n".join(lines) + "\n"
+
+def parse_notation(text: str) -> tuple[str, int, list, list]:
+    """
+    解析落子记谱。
+    :return: (游戏名称, 棋盘大小, 初始局面（None 为标准开局）, 落子序列)
+    """
+    lines = text.split("\n")
+    header = lines[0].split()
+    if len(header) != 2 or not header[1].isdigit():
+        raise ValueError("Invalid record header.")
+    game_name, board_size = header[0], int(header[1])
+    setup = None
+    body = lines[1:]
+    if body and body[0].startswith("setup"):
+        setup = []
+        for group in body[0].split()[1:]:
+            code, _, points = group.partition(":")
+            if code not in CODE_COLORS:
+                raise ValueError(f"Invalid setup '{group}'.")
+            setup.extend((*parse_point(point, board_size), CODE_COLORS[code]) for point in points.split(",") if point)
+        body = body[1:]
+    moves = []
+    for token in " ".join(body).split():
+        color = next_color(moves)
+        moves.append((None, None, color) if token == "pass" else (*parse_point(token, board_size), color))
+    return game_name, board_size, setup, moves
+
+def sgf_point(row: int, col: int) -> str:
+    return chr(ord("a") + col) + chr(ord("a") + row)
+
+def format_sgf(board_size: int, setup: list[tuple[int, int, str]], moves: list[tuple[int, int, str]], komi: float=None) -> str:
+    """
+    生成 SGF（围棋）。
+    :param board_size: 棋盘大小
+    :param setup: 初始局面的所有棋子（AB / AW），为 None 时为空棋盘
+    :param moves: 落子序列，虚着记为 B[] / W[]
+    :param komi: 贴目
+    :return: SGF 文本
+    """
+    root = f"(;GM[1]FF[4]CA[UTF-8]SZ[{board_size}]"
+    if komi is not None:
+        root += f"KM[{komi}]"
+    for color, code in COLOR_CODES.items():
+        points = [sgf_point(row, col) for row, col, chess in setup or () if chess == color]
+        if points:
+            root += "A" + code + "".join(f"[{point}]" for point in points)
+    nodes = [f";{COLOR_CODES[color]}[{'' if row is None else sgf_point(row, col)}]" for row, col, color in moves]
+    lines = [root] + ["".join(nodes[i:i + MOVES_PER_LINE]) for i in range(0, len(nodes), MOVES_PER_LINE)]
+    return "\n".join(lines) + ")\n"
+
+def parse_sgf(text: str) -> tuple[int, list, list]:
+    """
+    解析 SGF 的主线（每个分支只取第一个变化）。
+    :return: (棋盘大小, 初始局面（None 为空棋盘）, 落子序列)
+    """
+    def skip_space(position: int) -> int:
+        while position < len(text) and text[position].isspace():
+            position += 1
+        return position
+
+    def parse_tree(position: int) -> tuple[list[dict], int]:
+        """
+        :param position: "(" 的位置
+        :return: (该子树主线上各节点的属性, 子树结束后的位置)
+        """
+        nodes, main_line = [], True
+        position = skip_space(position + 1)
+        while position < len(text) and text[position] != ")":
+            if text[position] == ";":
+                nodes.append({})
+                position += 1
+            elif text[position] == "(":
+                variation, position = parse_tree(position)
+                if main_line:  # 只取第一个变化
+                    nodes.extend(variation)
+                    main_line = False
+            else:
+                match = SGF_PROPERTY.match(text, position)
+                if match is None or not nodes:
+                    raise ValueError("Invalid SGF.")
+                nodes[-1].setdefault(match.group(1), []).extend(SGF_VALUE.findall(match.group(2)))
+                position = match.end()
+            position = skip_space(position)
+        if position >= len(text):
+            raise ValueError("Invalid SGF: unterminated game tree.")
+        return nodes, position + 1
+
+    start = skip_space(0)
+    if start >= len(text) or text[start] != "(":
+        raise ValueError("Invalid SGF.")
+    nodes, _ = parse_tree(start)
+    if not nodes:
+        raise ValueError("Invalid SGF.")
+
+    root = nodes[0]
+    if root.get("GM", ["1"])[0] != "1":
+        raise ValueError("SGF record is not a Go game.")
+    board_size = int(root.get("SZ", ["19"])[0].split(":")[0])
+
+    def point(value: str) -> tuple[int, int]:
+        if value == "" or (value == "tt" and board_size <= 19):
+            return None, None
+        if len(value) != 2:
+            raise ValueError(f"Invalid SGF point '{value}'.")
+        row, col = ord(value[1]) - ord("a"), ord(value[0]) - ord("a")
+        if not (0 <= row < board_size and 0 <= col < board_size):
+            raise ValueError(f"SGF point '{value}' is off the board.")
+        return row, col
+
+    setup = None
+    if "AB" in root or "AW" in root:
+        setup = [(*point(value), CODE_COLORS[code]) for code in "BW" for value in root.get("A" + code, [])]
+    moves = []
+    for node in nodes:
+        for code in "BW":
+            if code in node:
+                moves.append((*point(node[code][0]), CODE_COLORS[code]))
+    return board_size, setup, moves
@@ -36,6 +36,16 @@ class GameRule(ABC):
         """
         pass
     
+    def check_win_after_move(self, board: Chessboard, row: int, col: int):
+        """
+        在某次落子之后检查是否有人获胜（默认检查整个棋盘，子类可以只检查与该落子相关的部分）。
+        :param board: 当前棋盘状态（Chessboard 对象）
+        :param row: 最近落子的行坐标
+        :param col: 最近落子的列坐标
+        :return: 获胜方颜色（"BLACK" 或 "WHITE"），若无人获胜则返回 None
+        """
+        return self.check_win(board)
+
     @abstractmethod
     def check_draw(self, board: Chessboard):
         """
@@ -141,6 +151,29 @@ class GomokuRule(GameRule):
                     return board.get_chess(row, col)  # 返回获胜方的颜色
         return None
     
+    def check_win_after_move(self, board, row, col):
+        """
+        落子后只检查经过该落子的四条线上是否形成连续 5 个同色棋子（之前的局面中不会已有五连）。
+        :param board: 当前棋盘状态（Chessboard 对象）
+        :param row: 最近落子的行坐标
+        :param col: 最近落子的列坐标
+        :return: 获胜方颜色（"BLACK" 或 "WHITE"），若无人获胜则返回 None
+        """
+        color = board.get_chess(row, col)
+        if color is None:
+            return self.check_win(board)
+        size = board.get_size()
+        for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            for sign in (1, -1):
+                curr_row, curr_col = row + sign * d_row, col + sign * d_col
+                while 0 <= curr_row < size and 0 <= curr_col < size and board.board[curr_row][curr_col] == color:
+                    count += 1
+                    curr_row, curr_col = curr_row + sign * d_row, curr_col + sign * d_col
+            if count >= 5:
+                return color
+        return None
+
     def check_draw(self, board):
         """
         检查是否平局。
@@ -165,6 +198,8 @@ class GomokuRule(GameRule):
     
 # 具体策略类：围棋规则
 class GoRule(GameRule):
+    komi: float = 3.25  # 黑棋贴目
+
     def get_territory(self, row: int, col: int, board: Chessboard) -> list[(int, int)]:
         """
         通过深度优先搜索，找到指定位置棋子的连通区域。
@@ -291,14 +326,14 @@ class GoRule(GameRule):
         """
         return 0 <= row < board.get_size() and 0 <= col < board.get_size()
 
-    def check_win(self, board):
+    def get_score(self, board):
         """
-        检查是否分出胜负，基于围棋计分规则：
+        基于围棋计分规则计算双方得分：
         1. 清除棋盘上无气的子。
         2. 根据棋盘状态计算双方得分。
-        3. 黑棋让六目半。
+        3. 黑棋贴目（komi）。
         :param board: 棋盘对象
-        :return: 获胜方颜色（"BLACK" 或 "WHITE"），若无胜负返回 None
+        :return: (黑棋得分, 白棋得分)
         """
         # 清除无气的子
         for row in range(board.get_size()):
@@ -308,7 +343,7 @@ class GoRule(GameRule):
                     self.capture(territory, board)
                     
         black_points = 0
-        white_points = 3.25  # 黑子让六目半
+        white_points = self.komi
         visited = [[False for _ in range(board.get_size())] for _ in range(board.get_size())]
 
         for row in range(board.get_size()):
@@ -322,6 +357,15 @@ class GoRule(GameRule):
                     white_points += len(territory)
                 for (r, c) in territory:
                     visited[r][c] = True
+        return black_points, white_points
+
+    def check_win(self, board):
+        """
+        检查是否分出胜负（见 get_score）。
+        :param board: 棋盘对象
+        :return: 获胜方颜色（"BLACK" 或 "WHITE"），若无胜负返回 None
+        """
+        black_points, white_points = self.get_score(board)
         if black_points > white_points:
             return "BLACK"
         elif white_points > black_points:
@@ -0,0 +1,228 @@
+from engine import *
+from AI_factory import GomokuAIFactory
+from commons import AI_TIME_LIMIT, ENGINE_NAME, ENGINE_VERSION
+from search_control import allocate_time
+import argparse
+import sys
+
+GOMOCUP_MIN_SIZE = 5
+
+# 五子棋 Gomocup（Piskvork）协议引擎前端：通过标准输入输出与对局管理程序通信
+class GomocupEngine:
+    """
+    坐标格式为 "x,y"，x 为列坐标，y 为行坐标。
+    引擎执黑还是执白由对局管理程序的指令决定：BEGIN 表示己方先手，TURN 时对方已落子。
+    """
+    def __init__(self, level: int=3, time_limit: float=AI_TIME_LIMIT):
+        """
+        :param level: AI 等级
+        :param time_limit: 没有时限信息时每步的搜索时间（秒）
+        """
+        self.AI_factory = GomokuAIFactory(time_limit=time_limit)
+        self.level = level
+        self.default_time_limit = time_limit
+        self.engine = Engine(GomokuFactory(), keep_history=False)
+        self.board_size: int = None
+        self.color: str = None  # 己方颜色
+        self.AI = None  # 己方 AI，确定颜色后创建
+        self.moves: list[tuple[int, int, str]] = []  # 落子记录，用于悔棋
+        self.board_lines: list[str] = None  # 正在接收的 BOARD 指令内容
+        self.timeout_turn: float = None  # 每步时限（秒）
+        self.timeout_match: float = None  # 整局时限（秒）
+        self.time_left: float = None  # 整局剩余时间（秒）
+        self.running = True
+        self.commands = {
+            "START": self.cmd_start,
+            "RESTART": self.cmd_restart,
+            "BEGIN": self.cmd_begin,
+            "TURN": self.cmd_turn,
+            "BOARD": self.cmd_board,
+            "TAKEBACK": self.cmd_takeback,
+            "INFO": self.cmd_info,
+            "ABOUT": self.cmd_about,
+            "END": self.cmd_end,
+        }
+
+    def reset(self, board_size: int):
+        self.board_size = board_size
+        self.engine.start(board_size)
+        self.color = None
+        self.AI = None
+        self.moves = []
+
+    def set_color(self, color: str):
+        """
+        确定己方颜色并创建对应的 AI。
+        """
+        if self.color != color:
+            self.color = color
+            self.AI = self.AI_factory.createAI(self.level, color)
+
+    def parse_move(self, text: str) -> tuple[int, int]:
+        """
+        :param text: "x,y"
+        :return: (row, col)
+        """
+        try:
+            x, y = (int(value) for value in text.split(",")[:2])
+        except ValueError:
+            raise ValueError(f"invalid coordinates {text}")
+        if not (0 <= x < self.board_size and 0 <= y < self.board_size):
+            raise ValueError(f"coordinates out of board {text}")
+        return y, x
+
+    def place(self, row: int, col: int, color: str):
+        self.engine.force_turn(color)
+        is_valid, message = self.engine.play_move(row, col)
+        if not is_valid:
+            raise ValueError(message or f"invalid move {col},{row}")
+        self.moves.append((row, col, color))
+
+    def move_time(self) -> float:
+        """
+        根据 INFO 指令给出的时限分配本步的搜索时间。
+        """
+        empty = self.board_size * self.board_size - len(self.moves)
+        moves_to_go = max(empty // 4, 10)  # 估计己方剩余需要下的步数
+        time_left = self.time_left if self.timeout_match else None
+        if time_left is None and self.timeout_turn is None:
+            return self.default_time_limit
+        return allocate_time(time_left, moves_to_go, self.timeout_turn)
+
+    def think(self) -> str:
+        """
+        己方落子。
+        :return: 落子坐标 "x,y"，没有可下的位置（棋盘已满）时为 ERROR
+        """
+        self.AI.search_control.time_limit = self.move_time()
+        move = self.AI.calculate_move(self.engine.get_chessboard())
+        if move is None:
+            return "ERROR no move available"
+        row, col = move
+        self.place(row, col, self.color)
+        return f"{col},{row}"
+
+    def cmd_start(self, args):
+        if not args or not args[0].isdigit() or int(args[0]) < GOMOCUP_MIN_SIZE:
+            return "ERROR unsupported size"
+        self.reset(int(args[0]))
+        return "OK"
+
+    def cmd_restart(self, args):
+        if self.board_size is None:
+            return "ERROR no game started"
+        self.reset(self.board_size)
+        return "OK"
+
+    def cmd_begin(self, args):
+        self.set_color("BLACK")
+        return self.think()
+
+    def cmd_turn(self, args):
+        row, col = self.parse_move(args[0] if args else "")
+        opponent_color = "BLACK" if not self.moves else ("WHITE" if self.moves[-1][2] == "BLACK" else "BLACK")
+        self.set_color("WHITE" if opponent_color == "BLACK" else "BLACK")
+        self.place(row, col, opponent_color)
+        return self.think()
+
+    def cmd_board(self, args):
+        self.board_lines = []
+        return None
+
+    def finish_board(self) -> str:
+        """
+        BOARD 指令接收完毕：按给出的顺序重建局面（1 为己方棋子，其余为对方棋子）后落子。
+        """
+        stones = []
+        for line in self.board_lines:
+            fields = line.split(",")
+            row, col = self.parse_move(",".join(fields[:2]))
+            stones.append((row, col, fields[2].strip() == "1" if len(fields) > 2 else True))
+        self.board_lines = None
+        own = sum(is_own for _, _, is_own in stones)
+        self.set_color("BLACK" if own == len(stones) - own else "WHITE")  # 双方子数相同时己方执黑
+        opponent_color = "WHITE" if self.color == "BLACK" else "BLACK"
+        moves = [(row, col, self.color if is_own else opponent_color) for row, col, is_own in stones]
+        is_valid, message = self.engine.set_position(self.board_size, moves)
+        if not is_valid:
+            raise ValueError(message)
+        self.moves = moves
+        return self.think()
+
+    def cmd_takeback(self, args):
+        row, col = self.parse_move(args[0] if args else "")
+        if not self.moves or self.moves[-1][:2] != (row, col):
+            return "ERROR cannot take back"
+        self.moves.pop()
+        self.engine.set_position(self.board_size, self.moves)
+        return "OK"
+
+    def cmd_info(self, args):
+        if len(args) < 2:
+            return None
+        key, value = args[0].lower(), args[1]
+        if key in ("timeout_turn", "timeout_match", "time_left") and value.lstrip("-").isdigit():
+            seconds = int(value) / 1000
+            if key == "timeout_turn":
+                self.timeout_turn = seconds if seconds > 0 else 0.0  # 0 表示尽快落子
+            elif key == "timeout_match":
+                self.timeout_match = seconds if seconds > 0 else None  # 0 表示整局不限时
+            else:
+                self.time_left = max(seconds, 0.0)
+        return None
+
+    def cmd_about(self, args):
+        return f'name="{ENGINE_NAME}", version="{ENGINE_VERSION}", author="OOP2024", country="CN"'
+
+    def cmd_end(self, args):
+        self.running = False
+        return None
+
+    def handle(self, line: str) -> str:
+        """
+        执行一条 Gomocup 指令。
+        :param line: 指令行
+        :return: 应答文本，不需要应答时返回 None
+        """
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            if self.board_lines is not None:  # BOARD 指令的后续行
+                if line.upper() == "DONE":
+                    return self.finish_board()
+                self.board_lines.append(line)
+                return None
+            words = line.split()
+            command = words[0].upper()
+            if command not in self.commands:
+                return f"UNKNOWN {words[0]}"
+            if command in ("BEGIN", "TURN", "BOARD", "TAKEBACK", "RESTART") and self.board_size is None:
+                return "ERROR no game started"
+            return self.commands[command](words[1:])
+        except ValueError as e:
+            self.board_lines = None
+            return f"ERROR {e}"
+
+    def run(self, stdin=sys.stdin, stdout=sys.stdout):
+        """
+        读取标准输入中的指令并应答，直到收到 END 或输入结束。
+        """
+        while self.running:
+            line = stdin.readline()
+            if not line:
+                break
+            response = self.handle(line)
+            if response is not None:
+                stdout.write(response + "\n")
+                stdout.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Gomoku AI as a Gomocup (Piskvork) engine over stdin/stdout.")
+    parser.add_argument("--level", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=AI_TIME_LIMIT, help="seconds per move without INFO time limits")
+    args = parser.parse_args()
+    GomocupEngine(args.level, args.time_limit).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+from chessboard import Chessboard
+from functools import lru_cache
+import random
+import re
+
+# 棋型（数值越小越强）
+FIVE = 0  # 连五
+OPEN_FOUR = 1  # 活四
+FOUR = 2  # 冲四
+OPEN_THREE = 3  # 活三
+THREE = 4  # 眠三
+OPEN_TWO = 5  # 活二
+TWO = 6  # 眠二
+NONE = 7  # 无棋型
+
+PATTERN_NAMES = ["FIVE", "OPEN_FOUR", "FOUR", "OPEN_THREE", "THREE", "OPEN_TWO", "TWO", "NONE"]
+PATTERN_SCORES = [100000, 10000, 1000, 1000, 100, 100, 10, 0]
+
+# 棋型模板：x 为己方棋子，. 为空位（越界或对方棋子在窗口中记为 o，不匹配任何模板）
+PATTERN_TEMPLATES = [
+    (FIVE, ["xxxxx"]),
+    (OPEN_FOUR, [".xxxx."]),
+    (FOUR, ["xxxx.", ".xxxx", "xxx.x", "x.xxx", "xx.xx"]),
+    (OPEN_THREE, [".xxx..", "..xxx.", ".xx.x.", ".x.xx."]),
+    (THREE, ["xxx..", "..xxx", "xx.x.", ".x.xx", "x.xx.", ".xx.x", "x..xx", "xx..x", "x.x.x"]),
+    (OPEN_TWO, ["..xx..", ".xx..", "..xx.", ".x.x.", ".x..x."]),
+    (TWO, ["xx...", "...xx", "x.x..", "..x.x", "x..x.", ".x..x"]),
+]
+
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]  # 横、竖、正斜、反斜方向
+WINDOW_RADIUS = 5  # 判断某点棋型时向两侧各查看的格数
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size: int) -> dict[str, list[list[int]]]:
+    """
+    生成固定的 Zobrist 随机键（同一棋盘大小在各进程中相同）。
+    :param size: 棋盘大小
+    :return: {颜色: size x size 的 64 位随机数表}
+    """
+    rnd = random.Random(size)
+    return {color: [[rnd.getrandbits(64) for _ in range(size)] for _ in range(size)] for color in ("BLACK", "WHITE")}
+
+@lru_cache(maxsize=None)
+def classify_window(window: str) -> int:
+    """
+    判断窗口中心点落子后在该方向上形成的棋型。
+    :param window: 长度为 2 * WINDOW_RADIUS + 1 的字符串，中心为假设落下的己方棋子
+    :return: 棋型常量
+    """
+    for pattern, templates in PATTERN_TEMPLATES:
+        for template in templates:
+            start = window.find(template)
+            while start != -1:
+                if start <= WINDOW_RADIUS < start + len(template):  # 模板必须覆盖中心点
+                    return pattern
+                start = window.find(template, start + 1)
+    return NONE
+
+@lru_cache(maxsize=65536)
+def score_line(line: str) -> int:
+    """
+    计算一整条线上己方棋子的棋型得分：按连续棋子段长度及两端是否为空分类。
+    :param line: 由 x（己方）、o（对方）、.（空位）组成的字符串
+    :return: 该线得分
+    """
+    score = 0
+    for match in re.finditer("x+", line):
+        length = match.end() - match.start()
+        open_ends = (match.start() > 0 and line[match.start() - 1] == ".") + (match.end() < len(line) and line[match.end()] == ".")
+        if length >= 5:
+            score += PATTERN_SCORES[FIVE]
+        elif open_ends == 0 or length == 1:
+            continue
+        elif length == 4:
+            score += PATTERN_SCORES[OPEN_FOUR if open_ends == 2 else FOUR]
+        elif length == 3:
+            score += PATTERN_SCORES[OPEN_THREE if open_ends == 2 else THREE]
+        else:
+            score += PATTERN_SCORES[OPEN_TWO if open_ends == 2 else TWO]
+    return score
+
+# 增量棋型评估器
+class PatternEvaluator:
+    """
+    五子棋棋型评估器。维护：
+        - 每个空位在四个方向上落子后形成的棋型（分黑白两方）及其得分；
+        - 每条线的棋型得分及全局得分。
+    落子或提子时只更新经过该点的四条线，代价为 O(size) 而不是 O(size²)。
+    """
+    def __init__(self, chessboard: Chessboard):
+        """
+        根据棋盘初始化评估器（评估器持有棋盘的副本）。
+        :param chessboard: 棋盘对象
+        """
+        self.size = chessboard.get_size()
+        self.board: list[list[str]] = [row[:] for row in chessboard.board]
+        size = self.size
+
+        # 预计算所有线：lines[i] 为线上各点坐标，line_of[d][row][col] 为该点在方向 d 上所在线的编号
+        self.lines: list[list[tuple[int, int]]] = []
+        self.line_of = [[[None] * size for _ in range(size)] for _ in DIRECTIONS]
+        for d, (d_row, d_col) in enumerate(DIRECTIONS):
+            for row in range(size):
+                for col in range(size):
+                    if self.line_of[d][row][col] is not None:
+                        continue
+                    # 回退到线的起点
+                    r, c = row, col
+                    while 0 <= r - d_row < size and 0 <= c - d_col < size:
+                        r, c = r - d_row, c - d_col
+                    line = []
+                    while 0 <= r < size and 0 <= c < size:
+                        self.line_of[d][r][c] = len(self.lines)
+                        line.append((r, c))
+                        r, c = r + d_row, c + d_col
+                    self.lines.append(line)
+
+        self.patterns = {color: [[[NONE] * len(DIRECTIONS) for _ in range(size)] for _ in range(size)] for color in ("BLACK", "WHITE")}
+        self.cell_scores = {color: [[0] * size for _ in range(size)] for color in ("BLACK", "WHITE")}
+        self.line_scores = {color: [0] * len(self.lines) for color in ("BLACK", "WHITE")}
+        self.total_scores = {"BLACK": 0, "WHITE": 0}
+        self.zobrist = zobrist_keys(size)
+        self.hash = 0  # 局面的 Zobrist 哈希，随落子/提子增量更新
+        for row in range(size):
+            for col in range(size):
+                if self.board[row][col] is not None:
+                    self.hash ^= self.zobrist[self.board[row][col]][row][col]
+
+        for index in range(len(self.lines)):
+            self._update_line_score(index)
+        for row in range(size):
+            for col in range(size):
+                for d in range(len(DIRECTIONS)):
+                    self._update_cell_pattern(row, col, d)
+
+    def _window(self, row: int, col: int, d: int, color: str) -> str:
+        """
+        生成某点某方向上以该点为中心的窗口字符串（中心记为己方棋子）。
+        """
+        d_row, d_col = DIRECTIONS[d]
+        chars = []
+        for offset in range(-WINDOW_RADIUS, WINDOW_RADIUS + 1):
+            r, c = row + offset * d_row, col + offset * d_col
+            if offset == 0:
+                chars.append("x")
+            elif not (0 <= r < self.size and 0 <= c < self.size):
+                chars.append("o")
+            else:
+                chess = self.board[r][c]
+                chars.append("." if chess is None else ("x" if chess == color else "o"))
+        return "".join(chars)
+
+    def _update_cell_pattern(self, row: int, col: int, d: int):
+        """
+        重新计算某点在方向 d 上的棋型（黑白两方），并更新该点得分。
+        """
+        for color in ("BLACK", "WHITE"):
+            old_pattern = self.patterns[color][row][col][d]
+            new_pattern = NONE if self.board[row][col] is not None else classify_window(self._window(row, col, d, color))
+            if new_pattern != old_pattern:
+                self.patterns[color][row][col][d] = new_pattern
+                self.cell_scores[color][row][col] += PATTERN_SCORES[new_pattern] - PATTERN_SCORES[old_pattern]
+
+    def _update_line_score(self, index: int):
+        """
+        重新计算一条线的得分，并更新全局得分。
+        """
+        for color in ("BLACK", "WHITE"):
+            line = "".join("." if self.board[r][c] is None else ("x" if self.board[r][c] == color else "o") for r, c in self.lines[index])
+            new_score = score_line(line)
+            self.total_scores[color] += new_score - self.line_scores[color][index]
+            self.line_scores[color][index] = new_score
+
+    def _refresh(self, row: int, col: int):
+        """
+        某点棋子变化后，只更新经过该点的四条线及线上窗口范围内的空位。
+        每个方向只生成一次覆盖所有受影响窗口的线段字符串，各点的窗口直接从中切片。
+        """
+        radius = WINDOW_RADIUS
+        for d, (d_row, d_col) in enumerate(DIRECTIONS):
+            self._update_line_score(self.line_of[d][row][col])
+            cells = [(row + offset * d_row, col + offset * d_col) for offset in range(-2 * radius, 2 * radius + 1)]
+            segments = {}
+            for color in ("BLACK", "WHITE"):
+                chars = []
+                for r, c in cells:
+                    if not (0 <= r < self.size and 0 <= c < self.size):
+                        chars.append("o")
+                    else:
+                        chess = self.board[r][c]
+                        chars.append("." if chess is None else ("x" if chess == color else "o"))
+                segments[color] = "".join(chars)
+            for offset in range(2 * radius + 1):
+                r, c = cells[offset + radius]
+                if not (0 <= r < self.size and 0 <= c < self.size):
+                    continue
+                for color in ("BLACK", "WHITE"):
+                    old_pattern = self.patterns[color][r][c][d]
+                    if self.board[r][c] is not None:
+                        new_pattern = NONE
+                    else:
+                        segment = segments[color]
+                        new_pattern = classify_window(segment[offset:offset + radius] + "x" + segment[offset + radius + 1:offset + 2 * radius + 1])
+                    if new_pattern != old_pattern:
+                        self.patterns[color][r][c][d] = new_pattern
+                        self.cell_scores[color][r][c] += PATTERN_SCORES[new_pattern] - PATTERN_SCORES[old_pattern]
+
+    def place(self, row: int, col: int, color: str):
+        """
+        落子并增量更新评估。
+        :param row: 行坐标
+        :param col: 列坐标
+        :param color: 棋子颜色（"BLACK" 或 "WHITE"）
+        """
+        self.board[row][col] = color
+        self.hash ^= self.zobrist[color][row][col]
+        self._refresh(row, col)
+
+    def remove(self, row: int, col: int):
+        """
+        移除棋子并增量更新评估。
+        :param row: 行坐标
+        :param col: 列坐标
+        """
+        self.hash ^= self.zobrist[self.board[row][col]][row][col]
+        self.board[row][col] = None
+        self._refresh(row, col)
+
+    def get_pattern(self, row: int, col: int, color: str) -> int:
+        """
+        获取某空位落子后形成的最强棋型。
+        :param row: 行坐标
+        :param col: 列坐标
+        :param color: 落子方颜色
+        :return: 棋型常量
+        """
+        return min(self.patterns[color][row][col])
+
+    def get_cell_score(self, row: int, col: int, color: str) -> int:
+        """
+        获取某空位对落子方的得分（四个方向棋型得分之和）。
+        """
+        return self.cell_scores[color][row][col]
+
+    def find_cells(self, color: str, pattern: int) -> list[tuple[int, int]]:
+        """
+        找出落子后能形成不弱于指定棋型的所有空位。
+        :param color: 落子方颜色
+        :param pattern: 棋型常量
+        :return: 空位坐标列表
+        """
+        patterns = self.patterns[color]
+        return [(row, col) for row in range(self.size) for col in range(self.size)
+                if self.board[row][col] is None and min(patterns[row][col]) <= pattern]
+
+    def candidate_moves(self, color: str, limit: int=None) -> list[tuple[int, int]]:
+        """
+        按进攻得分与防守得分之和从高到低列出候选落子（只包含有棋型的空位）。
+        :param color: 落子方颜色
+        :param limit: 最多返回的候选数
+        :return: 空位坐标列表；没有空位有棋型时（空棋盘或后期拥挤的棋盘）返回中心点或第一个空位，只有棋盘已满时为空
+        """
+        opponent_color = "BLACK" if color == "WHITE" else "WHITE"
+        own, other = self.cell_scores[color], self.cell_scores[opponent_color]
+        scored = [(own[row][col] + other[row][col], row, col) for row in range(self.size) for col in range(self.size)
+                  if self.board[row][col] is None and own[row][col] + other[row][col] > 0]
+        if not scored:
+            center = self.size // 2
+            if self.board[center][center] is None:
+                return [(center, center)]
+            empty = [(row, col) for row in range(self.size) for col in range(self.size) if self.board[row][col] is None]
+            return empty[:1]
+        scored.sort(key=lambda item: -item[0])
+        return [(row, col) for _, row, col in scored[:limit]]
+
+    def evaluate(self, color: str) -> int:
+        """
+        全局局面评估。
+        :param color: 评估视角的颜色
+        :return: 己方全局得分减去对方全局得分
+        """
+        opponent_color = "BLACK" if color == "WHITE" else "WHITE"
+        return self.total_scores[color] - self.total_scores[opponent_color]
@@ -0,0 +1,174 @@
+from chessboard import Chessboard
+from gomoku_pattern import *
+
+# 威胁空间搜索被节点上限或外部控制打断
+class ThreatSearchAborted(Exception):
+    pass
+
+# 五子棋威胁空间搜索：连续冲四胜（VCF）与连续活三/冲四胜（VCT）
+class ThreatSolver:
+    """
+    只在进攻方的威胁着法（冲四、活四、活三）及防守方的被迫应对中搜索，
+    分支远少于全宽度搜索，能快速找到较长的必胜序列。
+    求解结果只在确实必胜时返回；找不到（或超出预算）时返回 None。
+    """
+    def __init__(self, max_vcf_depth: int=10, vct_vcf_depth: int=4, max_vct_depth: int=4, vct_width: int=8, node_limit: int=1000):
+        """
+        :param max_vcf_depth: VCF 最多的进攻步数
+        :param vct_vcf_depth: VCT 各节点中 VCF 最多的进攻步数
+        :param max_vct_depth: VCT 最多的活三步数
+        :param vct_width: VCT 每步最多尝试的进攻着法数
+        :param node_limit: 每次求解的节点数上限
+        """
+        self.max_vcf_depth = max_vcf_depth
+        self.vct_vcf_depth = vct_vcf_depth
+        self.max_vct_depth = max_vct_depth
+        self.vct_width = vct_width
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.visit = None  # 外部节点回调，返回 True 时中止搜索（如 GameAI.visit_node）
+        self.failed_vcf: dict[tuple[int, str], int] = {}  # 已证明在某深度内无 VCF 的局面
+        self.failed_vct: dict[tuple[int, str], int] = {}  # 已证明在某深度内无 VCT 的局面
+
+    def solve(self, chessboard: Chessboard, color: str, vct: bool=True, visit=None) -> list[tuple[int, int]]:
+        """
+        求解必胜序列。
+        :param chessboard: 棋盘对象
+        :param color: 进攻方颜色
+        :param vct: 是否在没有 VCF 时继续搜索 VCT
+        :param visit: 节点回调，返回 True 时中止搜索
+        :return: 必胜序列（进攻方与防守方交替的落子列表，第一步为进攻方），没有找到时返回 None
+        """
+        return self.solve_evaluator(PatternEvaluator(chessboard), color, vct, visit)
+
+    def solve_evaluator(self, evaluator: PatternEvaluator, color: str, vct: bool=True, visit=None) -> list[tuple[int, int]]:
+        """
+        同 solve，但直接使用已有的评估器（搜索结束后评估器恢复原状）。
+        """
+        self.nodes = 0
+        self.visit = visit
+        self.failed_vcf = {}
+        self.failed_vct = {}
+        try:
+            line = self.vcf(evaluator, color, self.max_vcf_depth)
+            if line is None and vct:
+                line = self.vct(evaluator, color, self.max_vct_depth)
+        except ThreatSearchAborted:
+            return None
+        return line
+
+    def _visit(self):
+        self.nodes += 1
+        if self.nodes > self.node_limit or (self.visit is not None and self.visit()):
+            raise ThreatSearchAborted()
+
+    def vcf(self, evaluator: PatternEvaluator, attacker: str, depth: int) -> list[tuple[int, int]]:
+        """
+        连续冲四胜：进攻方每步都形成四，防守方只能挡在唯一的成五点上。
+        :param evaluator: 棋型评估器（搜索中原地落子/提子，返回前恢复）
+        :param attacker: 进攻方颜色
+        :param depth: 剩余进攻步数
+        :return: 必胜序列，没有时返回 None
+        """
+        self._visit()
+        defender = "BLACK" if attacker == "WHITE" else "WHITE"
+        wins = evaluator.find_cells(attacker, FIVE)
+        if wins:
+            return [wins[0]]
+        threats = evaluator.find_cells(defender, FIVE)
+        if len(threats) > 1 or depth == 0:  # 对方已有两个成五点，无法同时挡住
+            return None
+        key = (evaluator.hash, attacker)
+        if self.failed_vcf.get(key, -1) >= depth:
+            return None
+
+        candidates = evaluator.find_cells(attacker, FOUR)
+        if threats:  # 对方有成五点时，只能走既能挡住又能成四的点
+            candidates = [move for move in candidates if move == threats[0]]
+        for row, col in candidates:
+            evaluator.place(row, col, attacker)
+            try:
+                completions = evaluator.find_cells(attacker, FIVE)
+                if len(completions) >= 2 and not evaluator.find_cells(defender, FOUR):  # 活四或双四，且对方无法以冲四反击
+                    return [(row, col), completions[0], completions[1]]
+                if len(completions) == 1:
+                    block = completions[0]
+                    evaluator.place(block[0], block[1], defender)
+                    try:
+                        line = self.vcf(evaluator, attacker, depth - 1)
+                    finally:
+                        evaluator.remove(block[0], block[1])
+                    if line is not None:
+                        return [(row, col), block] + line
+            finally:
+                evaluator.remove(row, col)
+        self.failed_vcf[key] = depth
+        return None
+
+    def defence_moves(self, evaluator: PatternEvaluator, move: tuple[int, int], attacker: str) -> list[tuple[int, int]]:
+        """
+        进攻方形成活三后防守方的有效应对：
+            - 经过该点四条线上窗口范围内、落子后进攻方不再有活四点的空位；
+            - 防守方自己的冲四点（以攻代守）。
+        其他应对之后进攻方直接走成活四，不必展开。
+        :param evaluator: 棋型评估器（已落下进攻方的棋子）
+        :param move: 进攻方刚落下的位置
+        :param attacker: 进攻方颜色
+        :return: 应对落子列表
+        """
+        defender = "BLACK" if attacker == "WHITE" else "WHITE"
+        row, col = move
+        replies = []
+        for d_row, d_col in DIRECTIONS:
+            for offset in range(-WINDOW_RADIUS + 1, WINDOW_RADIUS):
+                r, c = row + offset * d_row, col + offset * d_col
+                if not (0 <= r < evaluator.size and 0 <= c < evaluator.size) or evaluator.board[r][c] is not None:
+                    continue
+                evaluator.place(r, c, defender)
+                if not evaluator.find_cells(attacker, OPEN_FOUR):
+                    replies.append((r, c))
+                evaluator.remove(r, c)
+        replies.extend(evaluator.find_cells(defender, FOUR))
+        return list(dict.fromkeys(replies))
+
+    def vct(self, evaluator: PatternEvaluator, attacker: str, depth: int) -> list[tuple[int, int]]:
+        """
+        连续活三胜：进攻方每步形成活三或四，防守方的每一种应对之后进攻方仍然必胜。
+        :param evaluator: 棋型评估器（搜索中原地落子/提子，返回前恢复）
+        :param attacker: 进攻方颜色
+        :param depth: 剩余活三步数
+        :return: 必胜序列（防守方应对取第一种），没有时返回 None
+        """
+        line = self.vcf(evaluator, attacker, self.vct_vcf_depth)
+        if line is not None or depth == 0:
+            return line
+        defender = "BLACK" if attacker == "WHITE" else "WHITE"
+        if evaluator.find_cells(defender, FIVE):  # 对方有成五点而己方无法用冲四挡住，失去先手
+            return None
+        key = (evaluator.hash, attacker)
+        if self.failed_vct.get(key, -1) >= depth:
+            return None
+
+        candidates = evaluator.find_cells(attacker, OPEN_THREE)
+        candidates.sort(key=lambda move: -evaluator.get_cell_score(move[0], move[1], attacker))
+        for row, col in candidates[:self.vct_width]:
+            evaluator.place(row, col, attacker)
+            try:
+                first_line = None
+                for reply in self.defence_moves(evaluator, (row, col), attacker):
+                    evaluator.place(reply[0], reply[1], defender)
+                    try:
+                        line = self.vct(evaluator, attacker, depth - 1)
+                    finally:
+                        evaluator.remove(reply[0], reply[1])
+                    if line is None:  # 防守方找到了应对
+                        break
+                    if first_line is None:
+                        first_line = [reply] + line
+                else:
+                    if first_line is not None:
+                        return [(row, col)] + first_line
+            finally:
+                evaluator.remove(row, col)
+        self.failed_vct[key] = depth
+        return None
@@ -0,0 +1,276 @@
+from engine import *
+from AI_factory import GoAIFactory
+from commons import AI_TIME_LIMIT, ENGINE_NAME, ENGINE_VERSION
+from search_control import allocate_time
+import argparse
+import copy
+import sys
+
+GTP_COLUMNS = "ABCDEFGHJKLMNOPQRSTUVWXYZ"  # GTP 列坐标（跳过 I）
+GTP_MAX_SIZE = len(GTP_COLUMNS)
+
+# GTP 指令执行失败
+class GTPError(Exception):
+    pass
+
+# 围棋 GTP（Go Text Protocol 2）引擎前端：通过标准输入输出与对局管理程序通信
+class GTPEngine:
+    def __init__(self, level: int=2, board_size: int=19, time_limit: float=AI_TIME_LIMIT):
+        """
+        :param level: AI 等级
+        :param board_size: 初始棋盘大小
+        :param time_limit: 没有时限信息时每步的搜索时间（秒）
+        """
+        self.AI_factory = GoAIFactory(time_limit=time_limit)
+        self.default_time_limit = time_limit
+        self.engine = Engine(GoFactory(), [self.AI_factory.createAI(level, "BLACK"), self.AI_factory.createAI(level, "WHITE")])
+        self.board_size = board_size
+        self.komi = GoRule.komi
+        self.moves: list[tuple[int, int, str]] = []  # 落子记录（row 为 None 表示虚着），用于悔棋
+        self.main_time: float = None  # 基本时间（秒）
+        self.byo_yomi_time: float = None  # 读秒时间（秒）
+        self.byo_yomi_stones: int = 0  # 每个读秒周期需要下的步数
+        self.time_left: dict[str, tuple[float, int]] = {"BLACK": None, "WHITE": None}  # 剩余时间与读秒剩余步数
+        self.running = True
+        self.commands = {
+            "protocol_version": self.cmd_protocol_version,
+            "name": self.cmd_name,
+            "version": self.cmd_version,
+            "known_command": self.cmd_known_command,
+            "list_commands": self.cmd_list_commands,
+            "quit": self.cmd_quit,
+            "boardsize": self.cmd_boardsize,
+            "clear_board": self.cmd_clear_board,
+            "komi": self.cmd_komi,
+            "play": self.cmd_play,
+            "genmove": self.cmd_genmove,
+            "undo": self.cmd_undo,
+            "showboard": self.cmd_showboard,
+            "final_score": self.cmd_final_score,
+            "time_settings": self.cmd_time_settings,
+            "time_left": self.cmd_time_left,
+        }
+        self.reset()
+
+    def reset(self):
+        """
+        清空棋盘，重新开始对局。
+        """
+        self.engine.start(self.board_size)
+        self.engine.game.rule.komi = self.komi
+        self.moves = []
+
+    def parse_color(self, text: str) -> str:
+        text = text.lower()
+        if text in ("b", "black"):
+            return "BLACK"
+        if text in ("w", "white"):
+            return "WHITE"
+        raise GTPError("invalid color")
+
+    def parse_vertex(self, text: str) -> tuple[int, int]:
+        """
+        :param text: GTP 坐标（如 "D4"）或 "pass"
+        :return: (row, col)，虚着时返回 None
+        """
+        text = text.upper()
+        if text == "PASS":
+            return None
+        if len(text) < 2 or text[0] not in GTP_COLUMNS or not text[1:].isdigit():
+            raise GTPError("invalid vertex")
+        col = GTP_COLUMNS.index(text[0])
+        row = self.board_size - int(text[1:])  # GTP 行号自下而上，棋盘第 0 行在最上方
+        if not (0 <= row < self.board_size and 0 <= col < self.board_size):
+            raise GTPError("invalid vertex")
+        return row, col
+
+    def format_vertex(self, move: tuple[int, int]) -> str:
+        if move is None:
+            return "pass"
+        row, col = move
+        return f"{GTP_COLUMNS[col]}{self.board_size - row}"
+
+    def replay(self, moves: list[tuple[int, int, str]]):
+        """
+        从落子记录重建局面。
+        """
+        self.engine.set_position(self.board_size, moves)
+        self.engine.game.rule.komi = self.komi
+        self.moves = list(moves)
+
+    def cmd_protocol_version(self, args):
+        return "2"
+
+    def cmd_name(self, args):
+        return ENGINE_NAME
+
+    def cmd_version(self, args):
+        return ENGINE_VERSION
+
+    def cmd_known_command(self, args):
+        return "true" if args and args[0] in self.commands else "false"
+
+    def cmd_list_commands(self, args):
+        return "\n".join(self.commands)
+
+    def cmd_quit(self, args):
+        self.running = False
+        return ""
+
+    def cmd_boardsize(self, args):
+        if not args or not args[0].isdigit() or not 2 <= int(args[0]) <= GTP_MAX_SIZE:
+            raise GTPError("unacceptable size")
+        self.board_size = int(args[0])
+        self.reset()
+        return ""
+
+    def cmd_clear_board(self, args):
+        self.reset()
+        return ""
+
+    def cmd_komi(self, args):
+        try:
+            self.komi = float(args[0])
+        except (IndexError, ValueError):
+            raise GTPError("syntax error")
+        self.engine.game.rule.komi = self.komi
+        return ""
+
+    def cmd_play(self, args):
+        if len(args) < 2:
+            raise GTPError("syntax error")
+        color, move = self.parse_color(args[0]), self.parse_vertex(args[1])
+        if self.engine.game_over:  # 双方虚着后继续下棋：从记录重建局面
+            self.replay(self.moves)
+        self.engine.force_turn(color)
+        if move is None:
+            self.engine.end_turn()
+        else:
+            is_valid, _ = self.engine.play_move(*move)
+            if not is_valid:
+                raise GTPError("illegal move")
+        self.moves.append((None, None, color) if move is None else (move[0], move[1], color))
+        return ""
+
+    def cmd_genmove(self, args):
+        if not args:
+            raise GTPError("syntax error")
+        color = self.parse_color(args[0])
+        if self.engine.game_over:
+            self.replay(self.moves)
+        self.engine.force_turn(color)
+        AI = self.engine.current_player()
+        AI.search_control.time_limit = self.move_time(color)
+        move = AI.calculate_move(self.engine.get_chessboard())
+        if move is None or not self.engine.play_move(*move)[0]:
+            self.engine.end_turn()
+            move = None
+        self.moves.append((None, None, color) if move is None else (move[0], move[1], color))
+        return self.format_vertex(move)
+
+    def cmd_undo(self, args):
+        if not self.moves:
+            raise GTPError("cannot undo")
+        self.replay(self.moves[:-1])
+        return ""
+
+    def cmd_showboard(self, args):
+        chessboard = self.engine.get_chessboard()
+        lines = ["   " + " ".join(GTP_COLUMNS[:self.board_size])]
+        for row in range(self.board_size):
+            cells = ["." if chessboard.get_chess(row, col) is None else chessboard.get_chess(row, col)[0] for col in range(self.board_size)]
+            lines.append(f"{self.board_size - row:2d} " + " ".join(cells))
+        return "\n" + "\n".join(lines)
+
+    def cmd_final_score(self, args):
+        chessboard = copy.deepcopy(self.engine.get_chessboard())  # 计分会清除无气的子，不影响当前局面
+        black_points, white_points = self.engine.game.rule.get_score(chessboard)
+        if black_points == white_points:
+            return "0"
+        winner = "B" if black_points > white_points else "W"
+        return f"{winner}+{abs(black_points - white_points):g}"
+
+    def cmd_time_settings(self, args):
+        try:
+            self.main_time, self.byo_yomi_time, self.byo_yomi_stones = float(args[0]), float(args[1]), int(args[2])
+        except (IndexError, ValueError):
+            raise GTPError("syntax error")
+        self.time_left = {"BLACK": None, "WHITE": None}
+        return ""
+
+    def cmd_time_left(self, args):
+        try:
+            color, time_left, stones = self.parse_color(args[0]), float(args[1]), int(args[2])
+        except (IndexError, ValueError):
+            raise GTPError("syntax error")
+        self.time_left[color] = (time_left, stones)
+        return ""
+
+    def move_time(self, color: str) -> float:
+        """
+        根据时限设置与剩余时间分配本步的搜索时间。
+        """
+        empty = sum(cell is None for row in self.engine.get_chessboard().board for cell in row)
+        moves_to_go = max(empty // 3, 10)  # 估计剩余需要下的步数
+        if self.time_left[color] is not None:
+            time_left, stones = self.time_left[color]
+            if stones > 0:  # 读秒阶段：剩余时间需要支撑 stones 步
+                return allocate_time(time_left, stones)
+            if time_left > 0 or not self.byo_yomi_time:
+                return allocate_time(time_left, moves_to_go)
+        if self.byo_yomi_time:
+            return allocate_time(self.byo_yomi_time, max(self.byo_yomi_stones, 1))
+        if self.main_time:
+            return allocate_time(self.main_time, moves_to_go)
+        return self.default_time_limit  # 没有时限
+
+    def handle(self, line: str) -> str:
+        """
+        执行一条 GTP 指令。
+        :param line: 指令行
+        :return: 完整的应答文本，空行或注释返回 None
+        """
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            return None
+        words = line.split()
+        command_id = ""
+        if words[0].isdigit():
+            command_id = words.pop(0)
+        if not words:
+            return None
+        command, args = words[0].lower(), words[1:]
+        if command not in self.commands:
+            return f"?{command_id} unknown command\n\n"
+        try:
+            result = self.commands[command](args)
+        except GTPError as e:
+            return f"?{command_id} {e}\n\n"
+        return f"={command_id} {result}".rstrip(" ") + "\n\n"
+
+    def run(self, stdin=sys.stdin, stdout=sys.stdout):
+        """
+        读取标准输入中的指令并应答，直到收到 quit 或输入结束。
+        """
+        while True:
+            line = stdin.readline()
+            if not line:
+                break
+            response = self.handle(line)
+            if response is None:
+                continue
+            stdout.write(response)
+            stdout.flush()
+            if not self.running:
+                break
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Go AI as a GTP engine over stdin/stdout.")
+    parser.add_argument("--level", type=int, default=2)
+    parser.add_argument("--size", type=int, default=19)
+    parser.add_argument("--time-limit", type=float, default=AI_TIME_LIMIT, help="seconds per move without time settings")
+    args = parser.parse_args()
+    GTPEngine(args.level, args.size, args.time_limit).run()
+
+if __name__ == "__main__":
+    main()
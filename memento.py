@@ -3,12 +3,14 @@ import copy
 
 # 备忘录类，用于存储棋盘状态的快照
 class Memento:
-    def __init__(self, state: Chessboard):
+    def __init__(self, state: Chessboard, move: tuple[int, int, str]=None):
         """
         初始化备忘录，保存当前棋盘的状态。
         :param state: 当前的棋盘状态（Chessboard 对象）
+        :param move: 得到该状态的落子 (row, col, color)，初始局面为 None
         """
         self.state: Chessboard = copy.deepcopy(state)  # 深拷贝棋盘状态
+        self.move = move
         
     def get_chessboard(self) -> Chessboard:
         """
@@ -17,6 +19,13 @@ class Memento:
         """
         return self.state
     
+    def get_move(self) -> tuple[int, int, str]:
+        """
+        获取得到该状态的落子。
+        :return: (row, col, color)，初始局面为 None
+        """
+        return self.move
+
     def set_chessboard(self, state: Chessboard):
         """
         更新备忘录中存储的棋盘状态。
@@ -0,0 +1,232 @@
+from chessboard import Chessboard
+from engine import Engine, GameEvent, EVENT_MOVE
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+
+# 开局库文件格式：文件头 + 按局面哈希升序排列的定长条目
+BOOK_MAGIC = b"OBK1"
+HEADER_FORMAT = "<4sI"  # 魔数，条目数
+ENTRY_FORMAT = "<QBBh"  # 局面哈希，行坐标，列坐标，评分
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+CHESS_CODES = {None: 0, "BLACK": 1, "WHITE": 2}
+
+def position_hash(chessboard: Chessboard, curr_turn: str) -> int:
+    """
+    计算局面哈希（与进程无关，可写入文件）。
+    :param chessboard: 棋盘对象
+    :param curr_turn: 当前行棋方颜色（"BLACK" 或 "WHITE"）
+    :return: 64 位无符号整数哈希
+    """
+    data = bytearray([chessboard.get_size(), CHESS_CODES[curr_turn]])
+    for row in chessboard.board:
+        data.extend(CHESS_CODES[chess] for chess in row)
+    return int.from_bytes(hashlib.blake2b(bytes(data), digest_size=8).digest(), "little")
+
+# 开局库：通过 mmap 打开，二分查找，不把整个文件读入内存
+class OpeningBook:
+    def __init__(self, file_path: str):
+        """
+        打开开局库文件。多个进程打开同一文件时共享操作系统的页缓存。
+        :param file_path: 开局库文件路径
+        """
+        self.file_path = file_path
+        self.file = open(file_path, "rb")
+        try:
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"Opening book '{file_path}' is empty.")
+        if len(self.mm) < HEADER_SIZE:
+            self.close()
+            raise ValueError(f"'{file_path}' is not a valid opening book.")
+        magic, self.count = struct.unpack_from(HEADER_FORMAT, self.mm, 0)
+        if magic != BOOK_MAGIC or len(self.mm) != HEADER_SIZE + self.count * ENTRY_SIZE:
+            self.close()
+            raise ValueError(f"'{file_path}' is not a valid opening book.")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_entry(self, index: int) -> tuple[int, int, int, int]:
+        """
+        读取第 index 个条目。
+        :param index: 条目下标
+        :return: (局面哈希, 行坐标, 列坐标, 评分)
+        """
+        return struct.unpack_from(ENTRY_FORMAT, self.mm, HEADER_SIZE + index * ENTRY_SIZE)
+
+    def lookup(self, chessboard: Chessboard, curr_turn: str) -> tuple[int, int, int]:
+        """
+        查询局面的推荐落子。
+        :param chessboard: 棋盘对象
+        :param curr_turn: 当前行棋方颜色
+        :return: (行坐标, 列坐标, 评分)，开局库中没有该局面时返回 None
+        """
+        return self.lookup_hash(position_hash(chessboard, curr_turn))
+
+    def lookup_hash(self, key: int) -> tuple[int, int, int]:
+        """
+        按局面哈希二分查找。
+        :param key: 局面哈希
+        :return: (行坐标, 列坐标, 评分)，不存在时返回 None
+        """
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self.get_entry(mid)[0] < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self.count:
+            entry_key, row, col, score = self.get_entry(low)
+            if entry_key == key:
+                return row, col, score
+        return None
+
+    def close(self):
+        """
+        关闭文件映射。
+        """
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        self.file.close()
+
+# 开局库构建器：从自我对弈或已存储的对局中统计每个局面的最佳落子
+class OpeningBookBuilder:
+    def __init__(self, max_plies: int=12):
+        """
+        :param max_plies: 每局只收录前 max_plies 手
+        """
+        self.max_plies = max_plies
+        # 局面哈希 -> {落子: [出现次数, 累计结果]}
+        self.stats: dict[int, dict[tuple[int, int], list[int]]] = {}
+
+    def add_position(self, chessboard: Chessboard, curr_turn: str, move: tuple[int, int], result: int=0):
+        """
+        收录一个局面及其落子。
+        :param chessboard: 落子前的棋盘
+        :param curr_turn: 行棋方颜色
+        :param move: 落子位置 (row, col)
+        :param result: 对行棋方而言的对局结果（胜 1，负 -1，和或未知 0）
+        """
+        moves = self.stats.setdefault(position_hash(chessboard, curr_turn), {})
+        record = moves.setdefault(tuple(move), [0, 0])
+        record[0] += 1
+        record[1] += result
+
+    def add_game(self, chessboards: list[list[list[str]]], winner: str=None):
+        """
+        收录一局棋。相邻两个局面之间由空变为有子的唯一位置即为落子，棋子颜色即为行棋方。
+        :param chessboards: 依次排列的棋盘状态（Chessboard.board 格式）
+        :param winner: 获胜方颜色，未知或平局时为 None
+        """
+        plies = 0
+        for before, after in zip(chessboards, chessboards[1:]):
+            if plies >= self.max_plies:
+                break
+            placed = [(row, col) for row in range(len(before)) for col in range(len(before))
+                      if before[row][col] is None and after[row][col] is not None]
+            if len(placed) != 1:  # 虚着或无法识别的变化
+                continue
+            row, col = placed[0]
+            color = after[row][col]
+            chessboard = Chessboard(len(before))
+            chessboard.set_board(before)
+            result = 0 if winner is None else (1 if winner == color else -1)
+            self.add_position(chessboard, color, (row, col), result)
+            plies += 1
+
+    def add_saved_game(self, file_path: str, game):
+        """
+        收录一个由 Game.store_state 存储的对局文件。
+        :param file_path: 对局文件路径
+        :param game: 对应游戏的 Game 对象，用于按规则重放对局记录
+        """
+        mementos, _ = game.read_record(file_path)
+        self.add_game([memento.get_chessboard().board for memento in mementos])
+
+    def add_self_play(self, game_factory, black_ai, white_ai, board_size: int, games: int=1):
+        """
+        让两个 AI 自我对弈并收录对局。
+        :param game_factory: 游戏工厂（GameFactory 对象）
+        :param black_ai: 执黑 AI
+        :param white_ai: 执白 AI
+        :param board_size: 棋盘大小
+        :param games: 对局数
+        """
+        for _ in range(games):
+            engine = Engine(game_factory, [black_ai, white_ai], keep_history=False)
+            chessboards = []
+
+            def on_event(event: GameEvent):
+                if event.type == EVENT_MOVE:
+                    chessboards.append([row[:] for row in engine.get_chessboard().board])
+
+            engine.add_listener(on_event)
+            engine.start(board_size)
+            chessboards.append([row[:] for row in engine.get_chessboard().board])
+            winner = engine.run()
+            self.add_game(chessboards, winner)
+
+    def build(self, file_path: str) -> int:
+        """
+        为每个局面选出结果最好（其次出现次数最多）的落子，按哈希排序写入开局库文件。
+        :param file_path: 输出文件路径
+        :return: 写入的条目数
+        """
+        entries = []
+        for key, moves in self.stats.items():
+            (row, col), (count, result) = max(moves.items(), key=lambda item: (item[1][1], item[1][0]))
+            entries.append((key, row, col, max(-32768, min(32767, result))))
+        entries.sort()
+
+        file_dir = os.path.dirname(file_path)
+        if file_dir:
+            os.makedirs(file_dir, exist_ok=True)
+        with open(file_path, "wb") as f:
+            f.write(struct.pack(HEADER_FORMAT, BOOK_MAGIC, len(entries)))
+            for entry in entries:
+                f.write(struct.pack(ENTRY_FORMAT, *entry))
+        return len(entries)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an opening book from self-play and saved games.")
+    parser.add_argument("--game", choices=["Gomoku", "Othello"], required=True)
+    parser.add_argument("--size", type=int, default=None, help="board size (default: 15 for Gomoku, 8 for Othello)")
+    parser.add_argument("--self-play", type=int, default=0, help="number of self-play games")
+    parser.add_argument("--black-level", type=int, default=1)
+    parser.add_argument("--white-level", type=int, default=1)
+    parser.add_argument("--max-plies", type=int, default=12)
+    parser.add_argument("--saved", nargs="*", default=[], help="saved game files (Store State)")
+    parser.add_argument("--output", "-o", required=True)
+    args = parser.parse_args()
+
+    from game_factory import GomokuFactory, OthelloFactory
+    from AI_factory import GomokuAIFactory, OthelloAIFactory
+    if args.game == "Gomoku":
+        game_factory, AI_factory, size = GomokuFactory(), GomokuAIFactory(book_path=None), args.size or 15
+    else:
+        game_factory, AI_factory, size = OthelloFactory(), OthelloAIFactory(book_path=None), args.size or 8
+
+    builder = OpeningBookBuilder(max_plies=args.max_plies)
+    for file_path in args.saved:
+        builder.add_saved_game(file_path, game_factory.createGame())
+    if args.self_play > 0:
+        builder.add_self_play(game_factory, AI_factory.createAI(args.black_level, "BLACK"),
+                              AI_factory.createAI(args.white_level, "WHITE"), size, args.self_play)
+    count = builder.build(args.output)
+    print(f"Wrote {count} positions to {args.output}.")
+
+if __name__ == "__main__":
+    main()
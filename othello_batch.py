@@ -0,0 +1,210 @@
+from board_array import np, EMPTY, BLACK_CHESS, WHITE_CHESS, stack_boards, othello_square_weights
+from othello_solver import OthelloSolver
+
+# 向量化的多棋盘黑白棋模拟器
+#
+# N 个棋盘以 numpy uint64 位棋盘保存（第 row * size + col 位表示 (row, col)，与 OthelloSolver 相同），
+# 合法落子生成、落子翻转与终局判断都对 N 个棋盘一次完成。
+# 翻转规则与 OthelloRule.get_flippable_chess / OthelloGame.make_move 相同；
+# 终局规则与本平台一致：任一方没有合法棋步（棋盘下满时双方都没有）即终局，棋子多者胜。
+
+def popcount(bits):
+    """
+    计算 uint64 数组中每个元素为 1 的位数。
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bits).astype(np.int64)
+    return np.unpackbits(bits.view(np.uint8).reshape(bits.shape + (8,)), axis=-1).sum(axis=-1).astype(np.int64)
+
+class OthelloBatch:
+    def __init__(self, n: int, size: int=8, seed: int=None):
+        """
+        创建 n 个初始局面（与 OthelloGame.set_chessboard 相同），黑方先行。
+        :param n: 棋盘数
+        :param size: 棋盘大小（位棋盘最多 8 x 8）
+        :param seed: 随机落子策略的随机种子
+        """
+        if np is None:
+            raise ImportError("OthelloBatch requires numpy.")
+        if not 4 <= size <= 8 or size % 2:
+            raise ValueError("OthelloBatch supports even board sizes from 4 to 8.")
+        self.n = n
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        solver = OthelloSolver(size)
+        self.full = np.uint64(solver.full)
+        # 八个方向的平移：(位移量, 是否左移, 平移后需要保留的掩码)，与 OthelloSolver.shifts 相同
+        self.shifts = [(np.uint64(abs(amount)), amount > 0, np.uint64(mask)) for amount, mask in solver.shifts]
+        self.bit_values = np.uint64(1) << np.arange(size * size, dtype=np.uint64)  # 每个位置对应的位
+
+        mid = size // 2
+        white = (1 << ((mid - 1) * size + mid - 1)) | (1 << (mid * size + mid))
+        black = (1 << ((mid - 1) * size + mid)) | (1 << (mid * size + mid - 1))
+        self.black = np.full(n, black, dtype=np.uint64)
+        self.white = np.full(n, white, dtype=np.uint64)
+        self.to_move = np.full(n, BLACK_CHESS, dtype=np.int8)  # 各棋盘的行棋方编码
+        self.done = np.zeros(n, dtype=bool)  # 各棋盘是否已终局
+        self.plies = np.zeros(n, dtype=np.int64)  # 各棋盘已下的步数
+
+    @classmethod
+    def from_boards(cls, boards, to_move, seed: int=None) -> "OthelloBatch":
+        """
+        从已有局面创建模拟器。
+        :param boards: Chessboard 对象或二维列表组成的序列，或形状为 (N, size, size) 的数组（board_array 编码）
+        :param to_move: 各棋盘行棋方的颜色（"BLACK" / "WHITE"）或编码，可以是单个值
+        :param seed: 随机种子
+        :return: OthelloBatch 对象
+        """
+        arrays = stack_boards(boards)
+        batch = cls(arrays.shape[0], arrays.shape[-1], seed)
+        flat = arrays.reshape(arrays.shape[0], -1)
+        batch.black = ((flat == BLACK_CHESS) * batch.bit_values).sum(axis=1, dtype=np.uint64)
+        batch.white = ((flat == WHITE_CHESS) * batch.bit_values).sum(axis=1, dtype=np.uint64)
+        codes = {"BLACK": BLACK_CHESS, "WHITE": WHITE_CHESS}
+        if isinstance(to_move, (str, int)):
+            to_move = [to_move] * batch.n
+        batch.to_move = np.array([codes.get(color, color) for color in to_move], dtype=np.int8)
+        own, opponent = batch.own_opponent()
+        batch.done = (batch.legal_bits(own, opponent) == 0) | (batch.legal_bits(opponent, own) == 0)
+        return batch
+
+    def shift(self, bits, direction: int):
+        amount, left, mask = self.shifts[direction]
+        return ((bits << amount) if left else (bits >> amount)) & mask
+
+    def own_opponent(self):
+        """
+        :return: (行棋方位棋盘, 对方位棋盘)
+        """
+        is_black = self.to_move == BLACK_CHESS
+        return np.where(is_black, self.black, self.white), np.where(is_black, self.white, self.black)
+
+    def legal_bits(self, own, opponent):
+        """
+        :return: 每个棋盘上行棋方所有合法落子位组成的位掩码
+        """
+        empty = self.full & ~(own | opponent)
+        moves = np.zeros_like(own)
+        for direction in range(8):
+            candidates = self.shift(own, direction) & opponent
+            for _ in range(self.size - 3):
+                candidates |= self.shift(candidates, direction) & opponent
+            moves |= self.shift(candidates, direction) & empty
+        return moves
+
+    def legal_moves(self):
+        """
+        :return: 形状为 (N, size * size) 的布尔数组，第 i 行为第 i 个棋盘上行棋方的合法位置（已终局的棋盘全为 False）
+        """
+        own, opponent = self.own_opponent()
+        bits = np.where(self.done, np.uint64(0), self.legal_bits(own, opponent))
+        return (bits[:, None] & self.bit_values) != 0
+
+    def flips(self, own, opponent, move_bits):
+        """
+        :param move_bits: 每个棋盘的落子位（只有一位为 1，为 0 时不翻转）
+        :return: 每个棋盘落子后被翻转的棋子位掩码
+        """
+        flipped = np.zeros_like(own)
+        for direction in range(8):
+            line = np.zeros_like(own)
+            cursor = self.shift(move_bits, direction)
+            for _ in range(self.size - 2):  # 一条线上最多连续 size - 2 个对方棋子
+                running = (cursor & opponent) != 0
+                if not running.any():
+                    break
+                line = np.where(running, line | cursor, line)
+                cursor = np.where(running, self.shift(cursor, direction), cursor)
+            flipped |= np.where((cursor & own) != 0, line, np.uint64(0))
+        return flipped
+
+    def step(self, moves):
+        """
+        所有未终局的棋盘同时落子、翻转、判断终局并交换行棋方。
+        :param moves: 形状为 (N,) 的落子位置编号 row * size + col（已终局的棋盘忽略）
+        """
+        active = ~self.done
+        moves = np.asarray(moves, dtype=np.int64)
+        move_bits = np.where(active, self.bit_values[np.clip(moves, 0, self.size * self.size - 1)], np.uint64(0))
+        own, opponent = self.own_opponent()
+        legal = self.legal_bits(own, opponent)
+        if ((move_bits & legal) != move_bits).any():
+            raise ValueError("Illegal move in batch step.")
+
+        flipped = self.flips(own, opponent, move_bits)
+        own = own | flipped | move_bits
+        opponent = opponent & ~flipped
+        is_black = self.to_move == BLACK_CHESS
+        self.black = np.where(is_black, own, opponent)
+        self.white = np.where(is_black, opponent, own)
+        self.plies += active
+
+        # 落子方或对方没有合法棋步即终局
+        finished = (self.legal_bits(own, opponent) == 0) | (self.legal_bits(opponent, own) == 0)
+        self.done |= active & finished
+        switch = active & ~self.done
+        self.to_move = np.where(switch, BLACK_CHESS + WHITE_CHESS - self.to_move, self.to_move).astype(np.int8)
+
+    def random_moves(self):
+        """
+        随机策略：在每个棋盘的合法位置中均匀随机选择。
+        :return: 形状为 (N,) 的落子位置编号（已终局的棋盘为 0）
+        """
+        legal = self.legal_moves()
+        scores = np.where(legal, self.rng.random(legal.shape), -1.0)
+        return scores.argmax(axis=1)
+
+    def heuristic_moves(self, weights=None, noise: float=0.5):
+        """
+        启发式策略：选择位置权重最高的合法位置（权重相同时随机）。
+        :param weights: 形状为 (size, size) 的位置权重，默认与 OthelloAILevel2 的角、边、危险区域参数一致
+        :param noise: 加在权重上的均匀随机噪声幅度
+        :return: 形状为 (N,) 的落子位置编号（已终局的棋盘为 0）
+        """
+        if weights is None:
+            weights = othello_square_weights(self.size)
+        legal = self.legal_moves()
+        scores = np.asarray(weights, dtype=np.float64).reshape(-1) + noise * self.rng.random(legal.shape)
+        return np.where(legal, scores, -np.inf).argmax(axis=1)
+
+    def play_out(self, black_policy: str="random", white_policy: str="random", max_plies: int=None):
+        """
+        用指定策略把所有棋盘下到终局。
+        :param black_policy: 黑方策略（"random" 或 "heuristic"）
+        :param white_policy: 白方策略
+        :param max_plies: 最多的步数，为 None 时下到全部终局
+        :return: winners()
+        """
+        policies = {"random": self.random_moves, "heuristic": self.heuristic_moves}
+        plies = 0
+        while not self.done.all() and (max_plies is None or plies < max_plies):
+            if black_policy == white_policy:
+                moves = policies[black_policy]()
+            else:
+                moves = np.where(self.to_move == BLACK_CHESS, policies[black_policy](), policies[white_policy]())
+            self.step(moves)
+            plies += 1
+        return self.winners()
+
+    def counts(self):
+        """
+        :return: (黑子数, 白子数)，均为形状 (N,) 的数组
+        """
+        return popcount(self.black), popcount(self.white)
+
+    def winners(self):
+        """
+        :return: 形状为 (N,) 的数组：BLACK_CHESS / WHITE_CHESS 为胜者，EMPTY 为平局或未终局
+        """
+        black_count, white_count = self.counts()
+        winners = np.where(black_count > white_count, BLACK_CHESS, np.where(white_count > black_count, WHITE_CHESS, EMPTY))
+        return np.where(self.done, winners, EMPTY).astype(np.int8)
+
+    def boards(self):
+        """
+        :return: 形状为 (N, size, size) 的 int8 数组（board_array 编码），可直接用于 othello_evaluate_batch 等批量函数
+        """
+        black = (self.black[:, None] & self.bit_values) != 0
+        white = (self.white[:, None] & self.bit_values) != 0
+        arrays = np.where(black, BLACK_CHESS, np.where(white, WHITE_CHESS, EMPTY)).astype(np.int8)
+        return arrays.reshape(self.n, self.size, self.size)
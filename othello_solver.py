@@ -0,0 +1,362 @@
+from chessboard import Chessboard
+from opening_book import OpeningBook, HEADER_FORMAT, ENTRY_FORMAT, BOOK_MAGIC, ENTRY_SIZE
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import hashlib
+import heapq
+import os
+import struct
+import sys
+import tempfile
+
+# 黑白棋精确求解器与残局库
+#
+# 终局规则与本平台一致（见 Client.check_finish 与 OthelloGame.allow_winner_check）：
+# 任一方没有合法棋步（棋盘下满时双方都没有）即终局，按双方棋子数之差计算结果。
+
+# 位棋盘编码：第 row * size + col 位表示 (row, col)
+class OthelloSolver:
+    def __init__(self, size: int, memo_limit: int=None):
+        """
+        :param size: 棋盘大小
+        :param memo_limit: 置换表最多保存的局面数，为 None 时不限（超出时由 on_flush 回调接管后清空）
+        """
+        self.size = size
+        self.full = (1 << (size * size)) - 1
+        self.memo_limit = memo_limit
+        self.memo: dict[int, tuple[int, int]] = {}  # 规范局面键 -> (结果, 规范方向下的最佳落子位)
+        self.on_flush = None  # 置换表满时调用 on_flush(memo)
+
+        not_first_col = self.full
+        not_last_col = self.full
+        for row in range(size):
+            not_first_col &= ~(1 << (row * size))
+            not_last_col &= ~(1 << (row * size + size - 1))
+        # 八个方向的平移：(位移量, 平移后需要保留的掩码)
+        self.shifts = [
+            (1, not_first_col), (-1, not_last_col),  # 右、左
+            (size, self.full), (-size, self.full),  # 下、上
+            (size + 1, not_first_col), (size - 1, not_last_col),  # 右下、左下
+            (-(size - 1), not_first_col), (-(size + 1), not_last_col),  # 右上、左上
+        ]
+
+        # 八种对称变换（旋转与翻转）下每一位的映射
+        self.transforms: list[list[int]] = []
+        for transform in range(8):
+            mapping = []
+            for index in range(size * size):
+                row, col = divmod(index, size)
+                if transform & 4:
+                    row, col = col, row
+                if transform & 2:
+                    row = size - 1 - row
+                if transform & 1:
+                    col = size - 1 - col
+                mapping.append(row * size + col)
+            self.transforms.append(mapping)
+        self.inverse_transforms = []
+        for mapping in self.transforms:
+            inverse = [0] * (size * size)
+            for index, target in enumerate(mapping):
+                inverse[target] = index
+            self.inverse_transforms.append(inverse)
+
+    def shift(self, bits: int, direction: int) -> int:
+        amount, mask = self.shifts[direction]
+        return ((bits << amount) if amount > 0 else (bits >> -amount)) & mask
+
+    def legal_moves(self, own: int, opponent: int) -> int:
+        """
+        :return: 行棋方所有合法落子位组成的位掩码
+        """
+        empty = self.full & ~(own | opponent)
+        moves = 0
+        for direction in range(8):
+            candidates = self.shift(own, direction) & opponent
+            for _ in range(self.size - 3):
+                candidates |= self.shift(candidates, direction) & opponent
+            moves |= self.shift(candidates, direction) & empty
+        return moves
+
+    def flips(self, own: int, opponent: int, move: int) -> int:
+        """
+        :param move: 落子位（只有一位为 1）
+        :return: 落子后被翻转的棋子位掩码（与 OthelloRule.get_flippable_chess 相同）
+        """
+        flipped = 0
+        for direction in range(8):
+            line = 0
+            cursor = self.shift(move, direction)
+            while cursor & opponent:
+                line |= cursor
+                cursor = self.shift(cursor, direction)
+            if cursor & own:
+                flipped |= line
+        return flipped
+
+    def transform(self, bits: int, transform: int) -> int:
+        mapping = self.transforms[transform]
+        result = 0
+        while bits:
+            low = bits & -bits
+            result |= 1 << mapping[low.bit_length() - 1]
+            bits ^= low
+        return result
+
+    def key(self, own: int, opponent: int) -> int:
+        """
+        局面键：行棋方与对方的位棋盘拼接；超过 64 位时取哈希。
+        """
+        cells = self.size * self.size
+        if 2 * cells <= 64:
+            return own | (opponent << cells)
+        data = own.to_bytes((cells + 7) // 8, "little") + opponent.to_bytes((cells + 7) // 8, "little")
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+    def canonical(self, own: int, opponent: int) -> tuple[int, int]:
+        """
+        求局面在八种对称变换下的规范键。
+        :return: (规范键, 变换编号)
+        """
+        return min((self.key(self.transform(own, t), self.transform(opponent, t)), t) for t in range(8))
+
+    def solve(self, own: int, opponent: int) -> int:
+        """
+        完全搜索求出局面的精确结果，并把所有经过的非终局局面记入置换表。
+        :param own: 行棋方位棋盘
+        :param opponent: 对方位棋盘
+        :return: 双方都完美应对时，终局时行棋方棋子数减对方棋子数
+        """
+        moves = self.legal_moves(own, opponent)
+        if moves == 0 or self.legal_moves(opponent, own) == 0:  # 终局
+            return bin(own).count("1") - bin(opponent).count("1")
+        key, transform = self.canonical(own, opponent)
+        entry = self.memo.get(key)
+        if entry is not None:
+            return entry[0]
+
+        best_value, best_move = None, None
+        while moves:
+            move = moves & -moves
+            moves ^= move
+            flipped = self.flips(own, opponent, move)
+            value = -self.solve(opponent & ~flipped, own | move | flipped)
+            if best_value is None or value > best_value:
+                best_value, best_move = value, move.bit_length() - 1
+
+        if self.memo_limit is not None and len(self.memo) >= self.memo_limit and self.on_flush is not None:
+            self.on_flush(self.memo)
+            self.memo = {}
+        self.memo[key] = (best_value, self.transforms[transform][best_move])
+        return best_value
+
+    def to_bits(self, chessboard: Chessboard, color: str) -> tuple[int, int]:
+        """
+        将棋盘转换为 (行棋方, 对方) 位棋盘。
+        """
+        own = opponent = 0
+        for row in range(self.size):
+            for col in range(self.size):
+                chess = chessboard.get_chess(row, col)
+                if chess == color:
+                    own |= 1 << (row * self.size + col)
+                elif chess is not None:
+                    opponent |= 1 << (row * self.size + col)
+        return own, opponent
+
+    def solve_position(self, chessboard: Chessboard, color: str) -> tuple[int, tuple[int, int]]:
+        """
+        求解棋盘局面（可作为其他黑白棋引擎的正确性参照）。
+        :param chessboard: 棋盘对象
+        :param color: 行棋方颜色
+        :return: (精确结果, 最佳落子 (row, col))，终局时最佳落子为 None
+        """
+        own, opponent = self.to_bits(chessboard, color)
+        value = self.solve(own, opponent)
+        key, transform = self.canonical(own, opponent)
+        entry = self.memo.get(key)
+        if entry is None:
+            return value, None
+        return value, divmod(self.inverse_transforms[transform][entry[1]], self.size)
+
+    def initial_position(self) -> tuple[int, int]:
+        """
+        :return: 初始局面的 (黑棋, 白棋) 位棋盘（与 OthelloGame.set_chessboard 相同，黑棋先行）
+        """
+        mid = self.size // 2
+        white = (1 << ((mid - 1) * self.size + mid - 1)) | (1 << (mid * self.size + mid))
+        black = (1 << ((mid - 1) * self.size + mid)) | (1 << (mid * self.size + mid - 1))
+        return black, white
+
+# 残局库：规范局面键 -> (最佳落子, 精确结果)，文件格式与开局库相同
+class OthelloTablebase:
+    def __init__(self, file_path: str, size: int):
+        """
+        :param file_path: 残局库文件路径
+        :param size: 棋盘大小
+        """
+        self.book = OpeningBook(file_path)
+        self.solver = OthelloSolver(size)
+
+    def lookup(self, chessboard: Chessboard, color: str) -> tuple[int, int, int]:
+        """
+        查询局面的完美应对。
+        :param chessboard: 棋盘对象
+        :param color: 行棋方颜色
+        :return: (行坐标, 列坐标, 精确结果)，不在残局库中时返回 None
+        """
+        own, opponent = self.solver.to_bits(chessboard, color)
+        key, transform = self.solver.canonical(own, opponent)
+        entry = self.book.lookup_hash(key)
+        if entry is None:
+            return None
+        row, col, value = entry
+        move = self.solver.inverse_transforms[transform][row * self.solver.size + col]
+        return divmod(move, self.solver.size) + (value,)
+
+    def close(self):
+        self.book.close()
+
+# 按棋盘大小延迟打开的残局库集合
+class OthelloTablebases:
+    def __init__(self, path_template: str):
+        """
+        :param path_template: 残局库路径模板，如 "books/othello{size}.tb"
+        """
+        self.path_template = path_template
+        self.tablebases: dict[int, OthelloTablebase] = {}
+
+    def get(self, size: int) -> OthelloTablebase:
+        """
+        :return: 该棋盘大小的残局库，文件不存在时返回 None
+        """
+        if size not in self.tablebases:
+            file_path = self.path_template.format(size=size)
+            self.tablebases[size] = OthelloTablebase(file_path, size) if os.path.exists(file_path) else None
+        return self.tablebases[size]
+
+    def lookup(self, chessboard: Chessboard, color: str) -> tuple[int, int, int]:
+        tablebase = self.get(chessboard.get_size())
+        return None if tablebase is None else tablebase.lookup(chessboard, color)
+
+def _write_run(memo: dict[int, tuple[int, int]], size: int, tmp_dir: str, runs: list[str]):
+    """
+    将置换表按键排序写入一个临时分段文件。
+    """
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+    with os.fdopen(fd, "wb") as f:
+        for key in sorted(memo):
+            value, move = memo[key]
+            f.write(struct.pack(ENTRY_FORMAT, key, move // size, move % size, value))
+    runs.append(path)
+
+def _solve_subtree(task: tuple) -> tuple[int, int, list[str]]:
+    """
+    进程池任务：求解一个子树，置换表满时分段写入临时文件以限制内存。
+    :param task: (棋盘大小, 行棋方, 对方, 置换表上限, 临时目录)
+    :return: (规范键, 精确结果, 分段文件列表)
+    """
+    size, own, opponent, memo_limit, tmp_dir = task
+    solver = OthelloSolver(size, memo_limit)
+    runs = []
+    solver.on_flush = lambda memo: _write_run(memo, size, tmp_dir, runs)
+    value = solver.solve(own, opponent)
+    _write_run(solver.memo, size, tmp_dir, runs)
+    return solver.canonical(own, opponent)[0], value, runs
+
+def _read_run(path: str):
+    """
+    依次读出分段文件中的条目。
+    """
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(ENTRY_SIZE)
+            if len(data) < ENTRY_SIZE:
+                return
+            yield struct.unpack(ENTRY_FORMAT, data)
+
+def build_tablebase(size: int, file_path: str, workers: int=None, split_depth: int=4, memo_limit: int=1000000) -> int:
+    """
+    枚举初始局面可达的所有非终局局面并求出精确结果，写入残局库。
+    前 split_depth 手在主进程中展开，之后每个（去除对称后的）子树交给进程池求解；
+    各进程的置换表超过 memo_limit 时分段写入临时文件，最后多路归并去重。
+    :param size: 棋盘大小
+    :param file_path: 输出文件路径
+    :param workers: 进程数
+    :param split_depth: 主进程展开的手数
+    :param memo_limit: 每个进程置换表的最大局面数
+    :return: 写入的局面数
+    """
+    solver = OthelloSolver(size)
+    black, white = solver.initial_position()
+
+    # 收集分割深度处的子树根局面（去除对称）
+    frontier: dict[int, tuple[int, int]] = {}
+    def collect(own, opponent, depth):
+        moves = solver.legal_moves(own, opponent)
+        if moves == 0 or solver.legal_moves(opponent, own) == 0:
+            return
+        key, _ = solver.canonical(own, opponent)
+        if depth == split_depth:
+            frontier.setdefault(key, (own, opponent))
+            return
+        while moves:
+            move = moves & -moves
+            moves ^= move
+            flipped = solver.flips(own, opponent, move)
+            collect(opponent & ~flipped, own | move | flipped, depth + 1)
+    collect(black, white, 0)
+
+    tmp_dir = tempfile.mkdtemp(prefix="othello_tb_")
+    runs: list[str] = []
+    try:
+        tasks = [(size, own, opponent, memo_limit, tmp_dir) for own, opponent in frontier.values()]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for key, value, subtree_runs in executor.map(_solve_subtree, tasks):
+                solver.memo[key] = (value, None)  # 子树根的结果，最佳落子已写入分段文件
+                runs.extend(subtree_runs)
+
+        # 主进程求解分割深度以上的局面（子树根结果已在置换表中）
+        top = OthelloSolver(size)
+        top.memo = dict(solver.memo)
+        top.solve(black, white)
+        top_memo = {key: entry for key, entry in top.memo.items() if entry[1] is not None}
+        _write_run(top_memo, size, tmp_dir, runs)
+
+        # 多路归并写入残局库（同一局面可能在多个子树中出现，只保留一条）
+        file_dir = os.path.dirname(file_path)
+        if file_dir:
+            os.makedirs(file_dir, exist_ok=True)
+        count, last_key = 0, None
+        with open(file_path, "wb") as f:
+            f.write(struct.pack(HEADER_FORMAT, BOOK_MAGIC, 0))
+            for entry in heapq.merge(*(_read_run(path) for path in runs)):
+                if entry[0] == last_key:
+                    continue
+                f.write(struct.pack(ENTRY_FORMAT, *entry))
+                last_key = entry[0]
+                count += 1
+            f.seek(0)
+            f.write(struct.pack(HEADER_FORMAT, BOOK_MAGIC, count))
+    finally:
+        for path in runs:
+            os.remove(path)
+        os.rmdir(tmp_dir)
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve small Othello boards and build a perfect-play tablebase.")
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--output", "-o", default=None, help="default: books/othello{size}.tb")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--split-depth", type=int, default=4)
+    parser.add_argument("--memo-limit", type=int, default=1000000)
+    args = parser.parse_args()
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 4 * args.size * args.size))
+    output = args.output or f"books/othello{args.size}.tb"
+    count = build_tablebase(args.size, output, args.workers, args.split_depth, args.memo_limit)
+    print(f"Wrote {count} positions to {output}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+from commons import PLAYBACK_SPEED
+from record_reader import PositionReader, ListReader
+
+PLAYBACK_MIN_SPEED = 0.25
+PLAYBACK_MAX_SPEED = 32.0
+
+# 对局回放：由主循环的时钟驱动，不阻塞输入
+class Playback:
+    """
+    各步局面按需从局面读取器（PositionReader）取得，只保存当前步的棋盘：向前播放时顺序读取下一个局面，
+    跳转时由读取器从最近的关键帧或偏移处开始读取。因此打开文件后可以立即开始播放，内存占用与对局长度无关。
+    对局总步数在读到最后一步之前可能未知（length 为 None）。
+    """
+    def __init__(self, source, speed: float=PLAYBACK_SPEED):
+        """
+        :param source: 局面读取器（如 Game.load_state 回放时返回的读取器），或按顺序排列的各步棋盘列表，至少包含一个局面
+        :param speed: 播放速度（每秒步数）
+        """
+        self.reader: PositionReader = source if isinstance(source, PositionReader) else ListReader(source)
+        self.stream = self.reader.positions(0)  # 从当前步之后顺序读取的局面
+        first = next(self.stream, None)
+        if first is None:
+            self.close()
+            raise ValueError("Nothing to play back.")
+        self.board: list[list[str]] = [line[:] for line in first]  # 当前步的棋盘（原地更新）
+        self.position = 0  # 当前步
+        self.speed = speed
+        self.playing = True
+        self.last_time: float = None  # 上次推进的时间
+
+    @property
+    def length(self) -> int:
+        """
+        :return: 总步数（包括初始局面），尚未读到最后一步时为 None
+        """
+        return self.reader.length
+
+    @property
+    def finished(self) -> bool:
+        return self.length is not None and self.position == self.length - 1
+
+    def show(self, board: list[list[str]]):
+        for row, line in enumerate(board):
+            self.board[row][:] = line
+
+    def seek(self, position: int) -> bool:
+        """
+        跳转到指定步。
+        :param position: 目标步（超出范围时取最近的有效值）
+        :return: 当前步是否发生变化
+        """
+        position = max(0, position)
+        if self.length is not None:
+            position = min(position, self.length - 1)
+        if position == self.position:
+            return False
+        if position < self.position:  # 向后跳转：由读取器从目标步重新开始顺序读取
+            self.stream.close()
+            self.stream = self.reader.positions(position)
+            self.show(next(self.stream))
+            self.position = position
+            return True
+        last = None
+        while self.position < position:  # 向前：继续顺序读取，读到最后一步时停止
+            board = next(self.stream, None)
+            if board is None:
+                break
+            last = board
+            self.position += 1
+        if last is None:
+            return False
+        self.show(last)
+        return True
+
+    def seek_end(self) -> bool:
+        """
+        跳转到最后一步。
+        """
+        return self.seek(self.length - 1 if self.length is not None else float("inf"))
+
+    def step(self, steps: int=1) -> bool:
+        """
+        单步前进（steps 为负时后退），并暂停播放。
+        :return: 当前步是否发生变化
+        """
+        self.playing = False
+        return self.seek(self.position + steps)
+
+    def toggle(self):
+        """
+        暂停或继续播放（已播放到最后时从头开始）。
+        """
+        if not self.playing and self.finished:
+            self.seek(0)
+        self.playing = not self.playing
+        self.last_time = None
+
+    def change_speed(self, factor: float):
+        """
+        :param factor: 速度倍数（如 2 表示加快一倍）
+        """
+        self.speed = max(PLAYBACK_MIN_SPEED, min(self.speed * factor, PLAYBACK_MAX_SPEED))
+
+    def update(self, now: float) -> bool:
+        """
+        根据时钟推进播放。
+        :param now: 当前时间（秒，如 time.monotonic()）
+        :return: 当前步是否发生变化
+        """
+        if not self.playing:
+            return False
+        if self.last_time is None:
+            self.last_time = now
+            return False
+        steps = int((now - self.last_time) * self.speed)
+        if steps <= 0:
+            return False
+        self.last_time += steps / self.speed
+        changed = self.seek(self.position + steps)
+        if self.finished:
+            self.playing = False
+        return changed
+
+    def time_to_next_step(self, now: float) -> float:
+        """
+        :return: 距离下一步的时间（秒），暂停时为 None
+        """
+        if not self.playing:
+            return None
+        if self.last_time is None:
+            return 1 / self.speed
+        return max(self.last_time + 1 / self.speed - now, 0.0)
+
+    def close(self):
+        """
+        结束回放，关闭读取器（及其映射的文件）。
+        """
+        self.stream.close()
+        self.reader.close()
@@ -0,0 +1,259 @@
+from abc import ABC, abstractmethod
+from game_record import *
+from commons import PLAYBACK_KEYFRAME_INTERVAL
+from array import array
+from collections import OrderedDict
+import itertools
+import json
+import mmap
+import os
+import re
+
+KEYFRAME_CACHE_SIZE = 32  # 落子记录读取器最多缓存的关键帧棋盘数
+NOTATION_TOKEN = re.compile(rb"pass|[a-z]\d+")
+SGF_MOVE = re.compile(rb"(?<![A-Z])([BW])\[([a-z]{0,2})\]")
+
+# 对局记录的局面读取器：按需逐个读取各步局面，不把所有局面读入内存
+class PositionReader(ABC):
+    """
+    第 0 个局面为初始局面，之后每次落子一个局面（虚着不产生局面）。
+    返回的棋盘只在读取下一个局面之前有效，需要保留时应复制。
+    """
+    length: int = None  # 局面总数，读到末尾之前可能为 None
+
+    @abstractmethod
+    def positions(self, start: int=0):
+        """
+        从第 start 个局面开始依次生成局面（Chessboard.board 格式）。
+        """
+        pass
+
+    def board_at(self, index: int) -> list[list[str]]:
+        """
+        :return: 第 index 个局面，超出范围时为 None
+        """
+        return next(self.positions(index), None)
+
+    def close(self):
+        pass
+
+# 已在内存中的局面列表
+class ListReader(PositionReader):
+    def __init__(self, chessboards: list[list[list[str]]]):
+        self.chessboards = chessboards
+        self.length = len(chessboards)
+
+    def positions(self, start=0):
+        yield from itertools.islice(self.chessboards, start, None)
+
+# 旧的逐步保存整个棋盘的 JSON 文件：通过 mmap 逐个解析 "chessboards" 中的棋盘
+class JsonReader(PositionReader):
+    """
+    不调用 json.load 解析整个文件，而是用 raw_decode 每次只解析一个棋盘，
+    并记下已经读到的每个棋盘在文件中的偏移（每个局面 8 字节），跳转时直接从偏移处解析。
+    """
+    def __init__(self, file_path: str):
+        self.file = open(file_path, "rb")
+        try:
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"'{file_path}' is empty.")
+        self.decoder = json.JSONDecoder()
+        key = self.mm.find(b'"chessboards"')
+        start = self.mm.find(b"[", key) if key >= 0 else -1
+        if start < 0:
+            self.close()
+            raise ValueError(f"'{file_path}' has no chessboards.")
+        first = self.skip_space(start + 1)
+        if self.mm[first:first + 1] == b"]":
+            self.close()
+            raise ValueError(f"'{file_path}' has no chessboards.")
+        self.offsets = array("q", [first])  # 已知的各棋盘偏移
+
+    def skip_space(self, offset: int) -> int:
+        while offset < len(self.mm) and self.mm[offset:offset + 1].isspace():
+            offset += 1
+        return offset
+
+    def decode_at(self, offset: int) -> tuple[list, int]:
+        """
+        解析 offset 处的一个棋盘。
+        :return: (棋盘, 棋盘之后的偏移)
+        """
+        window = 4096
+        while True:
+            text = self.mm[offset:offset + window].decode()
+            try:
+                board, end = self.decoder.raw_decode(text)
+                return board, offset + len(text[:end].encode())
+            except json.JSONDecodeError:
+                if offset + window >= len(self.mm):
+                    raise ValueError("Truncated chessboard.")
+                window *= 2
+
+    def positions(self, start=0):
+        index = min(start, len(self.offsets) - 1)
+        offset = self.offsets[index]
+        while True:
+            board, end = self.decode_at(offset)
+            if index >= start:
+                yield board
+            index += 1
+            offset = self.skip_space(end)
+            if self.mm[offset:offset + 1] != b",":  # 列表结束
+                self.length = index
+                return
+            offset = self.skip_space(offset + 1)
+            if index == len(self.offsets):
+                self.offsets.append(offset)
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        self.file.close()
+
+# 落子记录（落子记谱或 SGF）：通过 mmap 逐个读取落子并按规则重放
+class MoveListReader(PositionReader):
+    """
+    每隔 keyframe_interval 个局面记下下一手在文件中的偏移，并缓存至多 KEYFRAME_CACHE_SIZE 个关键帧棋盘；
+    跳转时从不晚于目标的最近关键帧（没有缓存时从初始局面）开始重放。
+    SGF 只按顺序读取 B[] / W[] 落子，带分支的 SGF 先整体解析主线。
+    规则不允许的落子及其之后的部分不回放。
+    """
+    def __init__(self, file_path: str, game, keyframe_interval: int=PLAYBACK_KEYFRAME_INTERVAL):
+        """
+        :param file_path: 对局记录文件路径
+        :param game: 对应游戏的 Game 对象（提供规则与记录格式）
+        :param keyframe_interval: 关键帧间隔（局面数）
+        """
+        self.game = game
+        self.keyframe_interval = keyframe_interval
+        self.file = open(file_path, "rb")
+        try:
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"'{file_path}' is empty.")
+        self.moves: list = None  # 整体解析得到的落子序列（只用于带分支的 SGF）
+        try:
+            self.is_sgf = game.record_extension == ".sgf"
+            if self.is_sgf:
+                body = self.mm.find(b";", self.mm.find(b";") + 1)  # 根节点之后
+                body = len(self.mm) if body < 0 else body
+                if self.mm.find(b"(", self.mm.find(b"(") + 1) >= 0:  # 有分支
+                    self.board_size, self.setup, self.moves = game.parse_record(self.mm[:].decode())
+                    body = 0  # 偏移改为落子序号
+                else:
+                    self.board_size, self.setup, _ = game.parse_record(self.mm[:body].decode() + ")")
+            else:
+                body = 0
+                for _ in range(2):  # 标题行与可选的 setup 行
+                    end = self.mm.find(b"\n", body)
+                    if end < 0 or (body > 0 and not self.mm[body:end].startswith(b"setup")):
+                        break
+                    body = end + 1
+                self.board_size, self.setup, _ = game.parse_record(self.mm[:body].decode())
+        except Exception:
+            self.close()
+            raise
+        initial = game.start_record_game(self.board_size, self.setup).chessboard.board
+        self.keyframe_offsets = array("q", [body])  # 第 k 个关键帧之后下一手的偏移（整体解析时为序号）
+        self.keyframe_colors = ["BLACK"]  # 第 k 个关键帧之后的行棋方（落子记谱中双方轮流）
+        self.cache: OrderedDict[int, list[list[str]]] = OrderedDict([(0, initial)])  # 关键帧编号 -> 棋盘
+
+    def read_moves(self, offset: int, color: str):
+        """
+        从 offset 开始依次生成 (row, col, color, 之后的偏移)，虚着的 row 为 None。
+        """
+        if self.moves is not None:  # 整体解析的落子序列，offset 为序号
+            for index in range(offset, len(self.moves)):
+                yield (*self.moves[index], index + 1)
+            return
+        if self.is_sgf:
+            for match in SGF_MOVE.finditer(self.mm, offset):
+                value = match.group(2).decode()
+                color = CODE_COLORS[match.group(1).decode()]
+                if value == "" or (value == "tt" and self.board_size <= 19):
+                    yield None, None, color, match.end()
+                else:
+                    if len(value) != 2:
+                        return
+                    row, col = ord(value[1]) - ord("a"), ord(value[0]) - ord("a")
+                    if not (0 <= row < self.board_size and 0 <= col < self.board_size):  # 超出棋盘
+                        return
+                    yield row, col, color, match.end()
+            return
+        for match in NOTATION_TOKEN.finditer(self.mm, offset):
+            token = match.group(0).decode()
+            if token == "pass":
+                yield None, None, color, match.end()
+            else:
+                try:
+                    row, col = parse_point(token, self.board_size)
+                except ValueError:  # 超出棋盘
+                    return
+                yield row, col, color, match.end()
+            color = other_color(color)
+
+    def positions(self, start=0):
+        # 最近的已缓存关键帧
+        keyframe = min(start // self.keyframe_interval, len(self.keyframe_offsets) - 1)
+        while keyframe not in self.cache:
+            keyframe -= 1
+        self.cache.move_to_end(keyframe)
+        game = self.game.start_record_game(self.board_size, setup_stones(self.cache[keyframe]))
+        index = keyframe * self.keyframe_interval
+        if index >= start:
+            yield game.chessboard.board
+        for row, col, color, end in self.read_moves(self.keyframe_offsets[keyframe], self.keyframe_colors[keyframe]):
+            if row is None:
+                continue
+            if not game.rule.is_valid_move(row, col, game.chessboard, color, False)[0]:
+                break
+            game.make_move(row, col, color)
+            game.capture()
+            index += 1
+            if index % self.keyframe_interval == 0:
+                self.add_keyframe(index // self.keyframe_interval, game.chessboard.board, end, other_color(color))
+            if index >= start:
+                yield game.chessboard.board
+        self.length = index + 1
+
+    def add_keyframe(self, keyframe: int, board: list[list[str]], offset: int, color: str):
+        if keyframe == len(self.keyframe_offsets):
+            self.keyframe_offsets.append(offset)
+            self.keyframe_colors.append(color)
+        if keyframe not in self.cache:
+            self.cache[keyframe] = [line[:] for line in board]
+            if len(self.cache) > KEYFRAME_CACHE_SIZE:
+                del self.cache[self.evicted_keyframe()]
+
+    def evicted_keyframe(self) -> int:
+        """
+        选出要移出缓存的关键帧：移除后与前后缓存关键帧之间间隔最小的（相同时取最久未使用的），
+        使缓存的关键帧均匀分布在已读过的部分。初始局面、最后一个与最近使用的关键帧始终保留。
+        """
+        keys = sorted(self.cache)
+        spans = {keys[i]: keys[i + 1] - keys[i - 1] for i in range(1, len(keys) - 1)}
+        recent = next(reversed(self.cache))
+        candidates = [key for key in self.cache if key in spans and key != recent]  # 按使用先后排列
+        return min(candidates, key=spans.get)
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        self.file.close()
+
+def open_record_reader(file_path: str, game) -> PositionReader:
+    """
+    打开对局记录文件的局面读取器（.json 为旧的逐步保存整个棋盘的文件，其余为落子记录）。
+    :param file_path: 文件路径
+    :param game: 对应游戏的 Game 对象
+    :return: PositionReader 对象
+    """
+    if os.path.splitext(file_path)[1] == ".json":
+        return JsonReader(file_path)
+    return MoveListReader(file_path, game)
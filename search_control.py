@@ -0,0 +1,109 @@
+import threading
+import time
+
+# 搜索控制：限制一次搜索的时间与节点数，并允许从其他线程取消
+class SearchControl:
+    def __init__(self, time_limit: float=None, node_limit: int=None):
+        """
+        :param time_limit: 每次搜索的时间上限（秒），为 None 时不限
+        :param node_limit: 每次搜索的节点数上限，为 None 时不限
+        """
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.deadline: float = None  # 本次搜索的截止时刻（time.perf_counter 时间）
+        self.cancelled = threading.Event()  # 取消标记
+
+    def start(self, time_limit: float=None):
+        """
+        开始一次新的搜索：根据时间上限计算截止时刻。不清除取消标记，搜索开始前发出的取消同样生效。
+        :param time_limit: 仅对本次搜索生效的时间上限（秒），为 None 时使用默认上限
+        """
+        time_limit = self.time_limit if time_limit is None else time_limit
+        self.deadline = None if time_limit is None else time.perf_counter() + time_limit
+
+    def finish(self):
+        """
+        结束一次搜索：清除取消标记，之后的搜索不再受本次取消的影响。
+        """
+        self.cancelled.clear()
+
+    def cancel(self):
+        """
+        取消当前（或即将开始的）搜索（线程安全），搜索将尽快返回目前找到的最佳落子。
+        """
+        self.cancelled.set()
+
+    def should_stop(self, nodes: int) -> bool:
+        """
+        判断搜索是否应当停止。
+        :param nodes: 已搜索的节点数
+        :return: 是否已取消、超出节点数上限或到达截止时刻
+        """
+        if self.cancelled.is_set():
+            return True
+        if self.node_limit is not None and nodes >= self.node_limit:
+            return True
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+# 搜索统计
+class SearchStats:
+    def __init__(self):
+        self.start_time: float = time.perf_counter()
+        self.end_time: float = None
+        self.nodes: int = 0  # 搜索的节点数
+        self.depth: int = 0  # 完成的搜索深度
+        self.score: float = None  # 最佳落子的评分
+        self.pv: list[tuple[int, int]] = []  # 主要变例
+        self.tt_probes: int = 0  # 置换表查询次数
+        self.tt_hits: int = 0  # 置换表命中次数
+        self.stopped: bool = False  # 是否因时间、节点上限或取消而提前结束
+
+    @property
+    def elapsed(self) -> float:
+        """
+        已用时间（秒），搜索进行中时返回到目前为止的时间。
+        """
+        end_time = self.end_time if self.end_time is not None else time.perf_counter()
+        return end_time - self.start_time
+
+    @property
+    def nodes_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.nodes / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def as_dict(self) -> dict:
+        """
+        :return: 便于打印或写入日志的统计字典
+        """
+        return {
+            "nodes": self.nodes,
+            "elapsed": self.elapsed,
+            "nps": self.nodes_per_second,
+            "depth": self.depth,
+            "score": self.score,
+            "pv": self.pv,
+            "tt_hit_rate": self.tt_hit_rate,
+            "stopped": self.stopped,
+        }
+
+def allocate_time(time_left: float=None, moves_to_go: int=30, turn_limit: float=None, margin: float=0.1) -> float:
+    """
+    根据对局时限分配本步的搜索时间（供文本协议前端使用）。
+    :param time_left: 剩余总时间（秒），为 None 时不限
+    :param moves_to_go: 剩余时间需要支撑的步数
+    :param turn_limit: 每步的时间上限（秒），为 None 时不限
+    :param margin: 留给通信与启动开销的安全余量（比例）
+    :return: 本步的搜索时间（秒），两者都不限时返回 None
+    """
+    budgets = []
+    if time_left is not None:
+        budgets.append(max(time_left, 0.0) / max(moves_to_go, 1))
+    if turn_limit is not None:
+        budgets.append(turn_limit)
+    if not budgets:
+        return None
+    return max(min(budgets) * (1 - margin), 0.001)
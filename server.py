@@ -0,0 +1,547 @@
+from engine import *
+from commons import AI_TIME_LIMIT
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import argparse
+import asyncio
+import copy
+import itertools
+import json
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 9400
+MAX_SESSIONS = 10000
+SPECTATOR_BUFFER_SIZE = 256  # 每个观战者最多积压的消息数，超过时丢弃积压的增量并重新同步
+
+# 各游戏的工厂、AI 工厂类名与可选的棋盘大小
+SERVER_GAMES = {
+    "Gomoku": (GomokuFactory, "GomokuAIFactory", range(8, 20)),
+    "Go": (GoFactory, "GoAIFactory", range(8, 20)),
+    "Othello": (OthelloFactory, "OthelloAIFactory", (4, 6, 8)),
+}
+
+CELL_CODES = {None: ".", "BLACK": "B", "WHITE": "W"}
+
+# 请求无效
+class RequestError(Exception):
+    pass
+
+def encode_board(chessboard: Chessboard) -> list[str]:
+    """
+    :return: 每行一个字符串，"B" 为黑子，"W" 为白子，"." 为空
+    """
+    return ["".join(CELL_CODES[cell] for cell in row) for row in chessboard.board]
+
+def encode_event(event: GameEvent) -> dict:
+    return {"type": event.type, **event.data}
+
+def encode_message(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+def get_int(request: dict, key: str, error: str) -> int:
+    """
+    :return: 请求中的整数参数（不接受 bool 与浮点数）
+    :raises RequestError: 参数缺失或不是整数
+    """
+    value = request.get(key)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise RequestError(error)
+    return value
+
+# 一个观战者：独立的有界发送队列与发送任务
+class Subscriber:
+    def __init__(self, feed: "SpectatorFeed", writer: asyncio.StreamWriter, buffer_size: int):
+        """
+        :param feed: 所属的观战推送
+        :param writer: 观战者连接
+        :param buffer_size: 最多积压的消息数
+        """
+        self.feed = feed
+        self.writer = writer
+        self.buffer_size = buffer_size
+        self.queue: deque[bytes] = deque()  # 待发送的已编码消息
+        self.resync = True  # 下一条发送完整局面（加入时或积压溢出后）
+        self.resyncs = 0  # 因积压溢出而重新同步的次数
+        self.closed = False
+        self.wakeup = asyncio.Event()
+        self.wakeup.set()
+        self.task = asyncio.create_task(self.run())
+
+    def push(self, message: bytes):
+        """
+        加入一条消息，不等待发送。积压已满时丢弃积压的消息，改为之后发送一次完整局面。
+        """
+        if self.closed or self.resync:  # 等待重新同步时，之后的增量已包含在将要发送的完整局面中
+            return
+        if len(self.queue) >= self.buffer_size:
+            self.queue.clear()
+            self.resync = True
+            self.resyncs += 1
+        else:
+            self.queue.append(message)
+        self.wakeup.set()
+
+    def close(self, message: bytes=None):
+        """
+        发送完积压的消息（以及最后一条消息）后结束。
+        """
+        if message is not None:
+            self.queue.append(message)
+        self.closed = True
+        self.wakeup.set()
+
+    async def run(self):
+        try:
+            while True:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+                while self.resync or self.queue:
+                    if self.resync:
+                        self.resync = False
+                        message = self.feed.snapshot()  # 发送时的局面，已包含溢出期间丢弃的所有增量
+                    else:
+                        message = self.queue.popleft()
+                    self.writer.write(message)
+                    await self.writer.drain()  # 只阻塞该观战者自己的发送任务
+                if self.closed:
+                    return
+        except ConnectionError:
+            pass
+
+# 观战推送：向任意数量的观战者广播对局的增量更新
+class SpectatorFeed:
+    """
+    每步只广播落子与被翻转（黑白棋）或被提走（围棋）的棋子；完整局面只在观战者加入、
+    积压溢出后重新同步、以及悔棋或重新开局时发送。每条消息只编码一次，由所有观战者共享。
+    消息带有递增的序号 seq，完整局面的 seq 为其已包含的最后一条增量的序号。
+    增量消息：
+        move       {"seq", "color", "at": [row, col], "flipped": [[row, col], ...]}（被翻转的棋子变为 color）
+        capture    {"seq", "color", "removed": [[row, col], ...]}（被提走的棋子变为空）
+        pass       {"seq", "color"}
+        turn       {"seq", "color"}
+        game_over  {"seq", "winner", "reason"}
+    """
+    def __init__(self, session: "GameSession", buffer_size: int=SPECTATOR_BUFFER_SIZE):
+        """
+        :param session: 被观战的对局
+        :param buffer_size: 每个观战者最多积压的消息数
+        """
+        self.session = session
+        self.buffer_size = buffer_size
+        self.seq = 0
+        self.subscribers: dict[int, Subscriber] = {}  # 按连接编号
+        self.cached_snapshot: tuple[int, bytes] = None  # (seq, 已编码的完整局面)
+        session.engine.add_listener(self.on_event)
+
+    def snapshot(self) -> bytes:
+        """
+        :return: 已编码的完整局面（同一 seq 只编码一次）
+        """
+        if self.cached_snapshot is None or self.cached_snapshot[0] != self.seq:
+            self.cached_snapshot = (self.seq, encode_message({"type": "snapshot", "seq": self.seq, **self.session.snapshot()}))
+        return self.cached_snapshot[1]
+
+    def on_event(self, event: GameEvent):
+        self.seq += 1
+        if not self.subscribers:
+            return
+        data, color = event.data, CELL_CODES.get(event.data.get("color"))
+        if event.type == EVENT_MOVE:
+            message = {"type": "move", "seq": self.seq, "color": color, "at": [data["row"], data["col"]]}
+            if data["flipped"]:
+                message["flipped"] = data["flipped"]
+        elif event.type == EVENT_CAPTURE:
+            if not data["removed"]:
+                return
+            message = {"type": "capture", "seq": self.seq, "color": color, "removed": sorted(set(data["removed"]))}
+        elif event.type in (EVENT_PASS, EVENT_NO_VALID_MOVES):
+            message = {"type": "pass", "seq": self.seq, "color": color}
+        elif event.type == EVENT_TURN:
+            message = {"type": "turn", "seq": self.seq, "color": color}
+        elif event.type == EVENT_GAME_OVER:
+            message = {"type": "game_over", "seq": self.seq, "winner": CELL_CODES.get(data["winner"]), "reason": data["reason"]}
+        else:  # 悔棋、重新开局：局面整体改变，发送完整局面
+            self.broadcast(self.snapshot())
+            return
+        self.broadcast(encode_message(message))
+
+    def broadcast(self, message: bytes):
+        for subscriber in self.subscribers.values():
+            subscriber.push(message)
+
+    def subscribe(self, connection: int, writer: asyncio.StreamWriter) -> Subscriber:
+        """
+        加入观战，之后先收到完整局面，再收到增量。
+        """
+        self.unsubscribe(connection)
+        subscriber = self.subscribers[connection] = Subscriber(self, writer, self.buffer_size)
+        return subscriber
+
+    def unsubscribe(self, connection: int) -> bool:
+        """
+        :return: 该连接是否正在观战
+        """
+        subscriber = self.subscribers.pop(connection, None)
+        if subscriber is None:
+            return False
+        subscriber.task.cancel()
+        return True
+
+    def close(self):
+        """
+        对局关闭：通知所有观战者。
+        """
+        message = encode_message({"type": "closed", "session": self.session.session_id})
+        for subscriber in self.subscribers.values():
+            subscriber.close(message)
+        self.subscribers.clear()
+
+# 服务器上的一局对局
+class GameSession:
+    def __init__(self, session_id: int, game_name: str, engine: Engine, owner: int):
+        """
+        :param session_id: 对局编号
+        :param game_name: 游戏名称
+        :param engine: 对局引擎（每局独立的游戏状态、悔棋历史与玩家）
+        :param owner: 创建对局的连接编号，连接断开时对局随之关闭
+        """
+        self.session_id = session_id
+        self.game_name = game_name
+        self.engine = engine
+        self.owner = owner
+        self.closed = False  # 已关闭的对局不再继续 AI 回合
+        self.lock = asyncio.Lock()  # 同一局的请求（包括 AI 计算）依次处理
+        self.events: list[dict] = []  # 尚未发给客户端的事件
+        engine.add_listener(lambda event: self.events.append(encode_event(event)))
+        self.feed = SpectatorFeed(self)
+
+    def take_events(self) -> list[dict]:
+        events, self.events = self.events, []
+        return events
+
+    def snapshot(self) -> dict:
+        """
+        :return: 对局的完整状态
+        """
+        engine = self.engine
+        return {
+            "session": self.session_id,
+            "game": self.game_name,
+            "board": encode_board(engine.get_chessboard()),
+            "turn": engine.current_color(),
+            "game_over": engine.game_over,
+            "winner": engine.winner,
+        }
+
+# 多对局服务器：通过本地 TCP 连接同时托管多局对局
+class GameServer:
+    """
+    协议为每行一个 JSON 对象。请求包含 "cmd" 与参数（可选 "id" 原样返回），应答包含 "ok"，失败时包含 "error"。
+    指令：
+        new      {"game", "size", "black", "white"}，玩家为 "human" 或 AI 等级（整数）；返回 session
+        move     {"session", "row", "col"}
+        pass     {"session"}（围棋虚着）
+        undo     {"session"}
+        resign   {"session"}
+        board    {"session"}
+        close    {"session"}
+        list     {}
+        watch    {"session"}，观战：之后推送完整局面与增量消息（见 SpectatorFeed，推送消息包含 "type"，没有 "ok"）
+        unwatch  {"session"}
+    落子类指令（move、pass、undo、resign）与 close 只接受创建对局的连接；board、list 与观战对所有连接开放。
+    落子类指令会继续完成其后所有 AI 回合，应答中的 "events" 为这期间的全部对局事件。
+    AI 计算在线程池中进行，不阻塞事件循环。
+    """
+    def __init__(self, max_sessions: int=MAX_SESSIONS, time_limit: float=AI_TIME_LIMIT, executor=None):
+        """
+        :param max_sessions: 同时托管的对局数上限
+        :param time_limit: AI 每步的搜索时间上限（秒）
+        :param executor: 执行 AI 计算的线程池，为 None 时自动创建
+        """
+        self.max_sessions = max_sessions
+        self.time_limit = time_limit
+        self.executor = executor if executor is not None else ThreadPoolExecutor()
+        self.sessions: dict[int, GameSession] = {}
+        self.session_ids = itertools.count(1)
+        self.connection_ids = itertools.count(1)
+        self.writers: dict[int, asyncio.StreamWriter] = {}  # 按连接编号
+        self.AI_factories = {}  # 各游戏的 AI 工厂（共享开局库），首次需要 AI 时创建
+        self.commands = {
+            "new": self.cmd_new,
+            "move": self.cmd_move,
+            "pass": self.cmd_pass,
+            "undo": self.cmd_undo,
+            "resign": self.cmd_resign,
+            "board": self.cmd_board,
+            "close": self.cmd_close,
+            "list": self.cmd_list,
+            "watch": self.cmd_watch,
+            "unwatch": self.cmd_unwatch,
+        }
+
+    def get_AI_factory(self, game_name: str):
+        if game_name not in self.AI_factories:
+            import AI_factory
+            self.AI_factories[game_name] = getattr(AI_factory, SERVER_GAMES[game_name][1])(time_limit=self.time_limit)
+        return self.AI_factories[game_name]
+
+    def create_player(self, game_name: str, spec, color: str) -> Player:
+        """
+        :param spec: "human" 或 AI 等级
+        """
+        if spec is None or spec == "human":
+            return Player(is_guest=True, is_AI=False, name="GUEST", color=color)
+        if not isinstance(spec, int) or isinstance(spec, bool):
+            raise RequestError("Invalid player.")
+        try:
+            return self.get_AI_factory(game_name).createAI(spec, color)
+        except ValueError as e:
+            raise RequestError(str(e))
+
+    def get_session(self, request: dict) -> GameSession:
+        session = self.sessions.get(get_int(request, "session", "Unknown session."))
+        if session is None:
+            raise RequestError("Unknown session.")
+        return session
+
+    def get_owned_session(self, request: dict, connection: int) -> GameSession:
+        """
+        :return: 请求的连接创建的对局
+        :raises RequestError: 对局不存在或不属于该连接
+        """
+        session = self.get_session(request)
+        if session.owner != connection:
+            raise RequestError("Not your session.")
+        return session
+
+    async def advance(self, session: GameSession):
+        """
+        处理回合开始（无合法棋步时自动结束回合），并完成接下来所有 AI 回合，直到轮到人类玩家或对局结束。
+        """
+        engine = session.engine
+        loop = asyncio.get_running_loop()
+        while not engine.game_over and not session.closed:
+            if engine.begin_turn():
+                continue
+            player = engine.current_player()
+            if not player.is_AI:
+                break
+            # AI 在副本上计算（搜索时可能临时改动棋盘），事件循环中读取的棋盘不受影响
+            move = await loop.run_in_executor(self.executor, player.calculate_move, copy.deepcopy(engine.get_chessboard()))
+            if session.closed:  # 计算期间对局被关闭
+                break
+            if move is None:
+                is_valid, message = engine.end_turn()
+                if not is_valid:  # 不能虚着的游戏（五子棋）中 AI 无处可下时判负，避免反复计算
+                    engine.resign()
+                continue
+            is_valid, message = engine.play_move(*move)
+            if not is_valid:  # AI 给出非法落子时判负，避免对局卡住
+                engine.resign()
+
+    async def cmd_new(self, request: dict, connection: int) -> dict:
+        if len(self.sessions) >= self.max_sessions:
+            raise RequestError("Too many sessions.")
+        game_name = request.get("game")
+        if game_name not in SERVER_GAMES:
+            raise RequestError("Unknown game.")
+        game_factory_class, _, sizes = SERVER_GAMES[game_name]
+        board_size = get_int(request, "size", "Unsupported board size.") if "size" in request else max(sizes)
+        if board_size not in sizes:
+            raise RequestError("Unsupported board size.")
+        players = [self.create_player(game_name, request.get("black"), "BLACK"),
+                   self.create_player(game_name, request.get("white"), "WHITE")]
+        engine = Engine(game_factory_class(), players, keep_history=bool(request.get("undo", True)))
+        engine.start(board_size)
+        session = GameSession(next(self.session_ids), game_name, engine, connection)
+        self.sessions[session.session_id] = session
+        async with session.lock:
+            await self.advance(session)
+            if session.closed:
+                raise RequestError("Session closed.")
+            return {**session.snapshot(), "events": session.take_events()}
+
+    async def play(self, request: dict, connection: int, action) -> dict:
+        """
+        在对局锁内执行一个操作，然后完成接下来的 AI 回合。只有创建对局的连接可以操作。
+        :param connection: 请求的连接编号
+        :param action: 接收对局引擎、返回 (是否成功, 提示信息) 的函数
+        """
+        session = self.get_owned_session(request, connection)
+        async with session.lock:
+            if session.closed:  # 等待对局锁期间对局被关闭
+                raise RequestError("Unknown session.")
+            if session.engine.game_over:
+                raise RequestError("Game over.")
+            if session.engine.current_player().is_AI:
+                raise RequestError("Not your turn.")
+            is_valid, message = action(session.engine)
+            if not is_valid:
+                session.take_events()
+                raise RequestError(message or "Invalid request.")
+            await self.advance(session)
+            if session.closed:
+                raise RequestError("Session closed.")
+            return {**session.snapshot(), "events": session.take_events()}
+
+    async def cmd_move(self, request, connection):
+        row, col = get_int(request, "row", "Invalid coordinates."), get_int(request, "col", "Invalid coordinates.")
+        return await self.play(request, connection, lambda engine: engine.play_move(row, col))
+
+    async def cmd_pass(self, request, connection):
+        return await self.play(request, connection, lambda engine: engine.end_turn())
+
+    async def cmd_resign(self, request, connection):
+        def resign(engine: Engine):
+            engine.resign()
+            return True, None
+        return await self.play(request, connection, resign)
+
+    async def cmd_undo(self, request, connection):
+        return await self.play(request, connection, lambda engine: engine.undo())
+
+    async def cmd_board(self, request, connection):
+        return self.get_session(request).snapshot()
+
+    def close_session(self, session: GameSession):
+        """
+        关闭对局：取消 AI 正在进行的搜索，之后不再继续 AI 回合。
+        """
+        del self.sessions[session.session_id]
+        session.closed = True
+        for player in session.engine.players:
+            if player.is_AI and player.search_control is not None:
+                player.search_control.cancel()
+        session.feed.close()
+
+    async def cmd_close(self, request, connection):
+        session = self.get_owned_session(request, connection)
+        self.close_session(session)
+        return {"session": session.session_id}
+
+    async def cmd_list(self, request, connection):
+        return {"sessions": [{"session": session.session_id, "game": session.game_name, "game_over": session.engine.game_over}
+                             for session in self.sessions.values()]}
+
+    async def cmd_watch(self, request, connection):
+        session = self.get_session(request)
+        session.feed.subscribe(connection, self.writers[connection])
+        return {"session": session.session_id}
+
+    async def cmd_unwatch(self, request, connection):
+        session = self.get_session(request)
+        if not session.feed.unsubscribe(connection):
+            raise RequestError("Not watching.")
+        return {"session": session.session_id}
+
+    async def dispatch(self, line: bytes, connection: int) -> dict:
+        """
+        执行一条请求。
+        :param line: 请求行
+        :param connection: 连接编号
+        :return: 应答
+        """
+        request = {}
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:  # JSON 格式错误或不是 UTF-8
+                raise RequestError("Invalid JSON.")
+            if not isinstance(request, dict):
+                request = {}
+                raise RequestError("Request must be a JSON object.")
+            cmd = request.get("cmd")
+            command = self.commands.get(cmd) if isinstance(cmd, str) else None
+            if command is None:
+                raise RequestError("Unknown command.")
+            response = {"ok": True, **await command(request, connection)}
+        except RequestError as e:
+            response = {"ok": False, "error": str(e)}
+        except (TypeError, ValueError, KeyError) as e:  # 参数类型不符等没有单独检查的无效请求，不中断连接
+            response = {"ok": False, "error": f"Invalid request: {e}"}
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        处理一个客户端连接：依次执行请求并应答，连接断开时关闭该连接创建的对局。
+        """
+        connection = next(self.connection_ids)
+        self.writers[connection] = writer
+        def on_line_read(task: asyncio.Future):
+            # 执行请求（可能包括较长的 AI 回合）期间连接断开时，立即关闭该连接的对局并取消 AI 搜索
+            if not task.cancelled() and (task.exception() is not None or not task.result()):
+                self.close_connection(connection)
+
+        def read_line() -> asyncio.Future:
+            task = asyncio.ensure_future(reader.readline())
+            task.add_done_callback(on_line_read)
+            return task
+
+        next_line = None  # 读取下一行的任务
+        try:
+            while True:
+                if next_line is None:
+                    next_line = read_line()
+                try:
+                    line = await next_line
+                except (ConnectionError, ValueError):  # 连接中断或请求行过长
+                    break
+                next_line = None
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                next_line = read_line()  # 执行请求期间继续读取
+                response = await self.dispatch(line, connection)
+                writer.write(encode_message(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if next_line is not None:
+                next_line.cancel()
+            del self.writers[connection]
+            self.close_connection(connection)
+            writer.close()
+
+    def close_connection(self, connection: int):
+        """
+        连接断开：关闭该连接创建的对局，并取消其观战。
+        """
+        for session in list(self.sessions.values()):
+            if session.owner == connection:
+                self.close_session(session)
+            else:
+                session.feed.unsubscribe(connection)
+
+    async def serve(self, host: str=SERVER_HOST, port: int=SERVER_PORT) -> asyncio.Server:
+        """
+        开始监听。
+        :return: asyncio.Server 对象（port 为 0 时可从其 sockets 取得实际端口）
+        """
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many concurrent games over a line-delimited JSON TCP protocol.")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS)
+    parser.add_argument("--time-limit", type=float, default=AI_TIME_LIMIT, help="seconds per AI move")
+    parser.add_argument("--workers", type=int, default=None, help="threads for AI moves")
+    args = parser.parse_args()
+
+    async def run():
+        server = GameServer(args.max_sessions, args.time_limit, ThreadPoolExecutor(args.workers))
+        async with await server.serve(args.host, args.port) as tcp_server:
+            print(f"Serving on {args.host}:{args.port}", flush=True)
+            await tcp_server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+from commons import STARTUP_TIME_TARGET, HEADLESS_STARTUP_TIME_TARGET
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# 图形客户端：导入客户端、创建窗口并绘制首个界面（游戏选择界面）
+CLIENT_PROBE = """
+from client import Client
+client = Client()
+UI_platform = client.UI_platform
+UI_platform.screen.fill((0, 0, 0))
+UI_platform.display_message("Choose a Game")
+UI_platform.draw_button("Gomoku", 0, 0)
+"""
+
+# 无界面工具：只导入模块，并检查没有导入 pygame
+HEADLESS_MODULES = ["engine", "tournament", "opening_book", "gtp", "gomocup"]
+HEADLESS_PROBE = """
+import sys
+import {module}
+sys.exit(1 if "pygame" in sys.modules else 0)
+"""
+
+def measure(code: str, runs: int) -> tuple[float, int]:
+    """
+    在新的解释器进程中运行代码，测量冷启动耗时（含解释器启动）。
+    :param code: 要运行的代码
+    :param runs: 运行次数（取最短耗时，减少系统负载带来的波动）
+    :return: (最短耗时（秒）, 最后一次的退出码)
+    """
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")  # 没有显示设备时使用虚拟显示
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    env.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    best, returncode = float("inf"), 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        returncode = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, stdout=subprocess.DEVNULL).returncode
+        best = min(best, time.perf_counter() - start)
+    return best, returncode
+
+def check_startup(runs: int=5, client: bool=True) -> bool:
+    """
+    测量图形客户端与无界面工具的冷启动时间，并与目标比较。
+    :param runs: 每项的运行次数
+    :param client: 是否检查图形客户端
+    :return: 是否全部达标
+    """
+    passed = True
+    if client:
+        elapsed, returncode = measure(CLIENT_PROBE, runs)
+        ok = returncode == 0 and elapsed <= STARTUP_TIME_TARGET
+        passed &= ok
+        print(f"{'client':14s} {elapsed:6.3f}s  target {STARTUP_TIME_TARGET:.3f}s  {'OK' if ok else 'FAIL'}")
+    for module in HEADLESS_MODULES:
+        elapsed, returncode = measure(HEADLESS_PROBE.format(module=module), runs)
+        ok = returncode == 0 and elapsed <= HEADLESS_STARTUP_TIME_TARGET
+        passed &= ok
+        note = "  (imports pygame)" if returncode == 1 else ""
+        print(f"{module:14s} {elapsed:6.3f}s  target {HEADLESS_STARTUP_TIME_TARGET:.3f}s  {'OK' if ok else 'FAIL'}{note}")
+    return passed
+
+def main():
+    parser = argparse.ArgumentParser(description="Check cold-start time against the startup targets.")
+    parser.add_argument("--runs", type=int, default=5, help="runs per probe (the fastest run is reported)")
+    parser.add_argument("--headless-only", action="store_true", help="skip the pygame client probe")
+    args = parser.parse_args()
+    sys.exit(0 if check_startup(args.runs, not args.headless_only) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import pytest
+np = pytest.importorskip("numpy")
+from board_array import *
+from gomoku_pattern import PatternEvaluator
+from AI import GomokuAILevel2, GomokuAILevel1, OthelloAILevel2
+from game_rule import OthelloRule
+import AI
+import random
+
+def random_chessboard(size: int, density: float, rnd: random.Random) -> Chessboard:
+    chessboard = Chessboard(size)
+    for row in range(size):
+        for col in range(size):
+            if rnd.random() < density:
+                chessboard.set_chess(row, col, rnd.choice(["BLACK", "WHITE"]))
+    return chessboard
+
+def longest_run(chessboard: Chessboard) -> int:
+    size, longest = chessboard.get_size(), 0
+    for row in range(size):
+        for col in range(size):
+            color = chessboard.get_chess(row, col)
+            if color is None:
+                continue
+            for d_row, d_col in GOMOKU_DIRECTIONS:
+                length, r, c = 0, row, col
+                while 0 <= r < size and 0 <= c < size and chessboard.get_chess(r, c) == color:
+                    length, r, c = length + 1, r + d_row, c + d_col
+                longest = max(longest, length)
+    return longest
+
+def gomoku_boards(rnd: random.Random, count: int) -> list[Chessboard]:
+    """
+    :return: 没有连五的随机棋盘（二级 AI 的逐格评分只定义到四连）
+    """
+    boards = []
+    while len(boards) < count:
+        chessboard = random_chessboard(rnd.choice([8, 11, 15]), rnd.choice([0.0, 0.05, 0.2, 0.4, 0.6]), rnd)
+        if longest_run(chessboard) < 5:
+            boards.append(chessboard)
+    return boards
+
+def test_gomoku_level2_vectorised_matches_scalar(monkeypatch):
+    rnd = random.Random(28)
+    for chessboard in gomoku_boards(rnd, 60):
+        for color in ("BLACK", "WHITE"):
+            vectorised = GomokuAILevel2("V", color)
+            move = vectorised.calculate_move(chessboard)
+            score = vectorised.search_stats.score
+            monkeypatch.setattr(AI, "np", None)
+            scalar = GomokuAILevel2("S", color)
+            assert scalar.calculate_move(chessboard) == move
+            assert scalar.search_stats.score == score
+            monkeypatch.undo()
+
+def test_gomoku_level2_full_board():
+    chessboard = Chessboard(8)
+    for row in range(8):
+        for col in range(8):
+            chessboard.set_chess(row, col, "BLACK" if (row // 2 + col) % 2 else "WHITE")
+    assert GomokuAILevel2("V", "BLACK").calculate_move(chessboard) is None
+
+def test_gomoku_evaluate_batch_matches_pattern_evaluator():
+    rnd = random.Random(29)
+    AI_player = GomokuAILevel1("AI", "BLACK")
+    for size in (9, 15):
+        boards = [random_chessboard(size, density, rnd) for density in (0.0, 0.1, 0.3, 0.5, 0.8) for _ in range(4)]
+        for color in ("BLACK", "WHITE"):
+            expected = [PatternEvaluator(chessboard).evaluate(color) for chessboard in boards]
+            assert AI_player.evaluate_batch(boards, color).tolist() == expected
+            assert AI_player.evaluate_batch([chessboard.board for chessboard in boards], color).tolist() == expected
+            assert AI_player.evaluate_batch(stack_boards(boards), color).tolist() == expected
+
+def test_othello_evaluate_batch_matches_rule():
+    rnd = random.Random(29)
+    rule = OthelloRule()
+    AI_player = OthelloAILevel2("AI", "BLACK")
+    for size in (4, 6, 8):
+        weights = othello_square_weights(size).tolist()
+        boards = [random_chessboard(size, density, rnd) for density in (0.2, 0.5, 0.8) for _ in range(5)]
+        for color in ("BLACK", "WHITE"):
+            opponent = "WHITE" if color == "BLACK" else "BLACK"
+            expected = []
+            for chessboard in boards:
+                legal = {c: [[rule.is_valid_move(row, col, chessboard, c, False)[0] for col in range(size)] for row in range(size)]
+                         for c in (color, opponent)}
+                assert othello_legal_moves(stack_boards([chessboard]), color_code(color))[0].tolist() == legal[color]
+                score = 0
+                for row in range(size):
+                    for col in range(size):
+                        chess = chessboard.get_chess(row, col)
+                        score += weights[row][col] * ((chess == color) - (chess == opponent))
+                        score += legal[color][row][col] - legal[opponent][row][col]
+                expected.append(score)
+            assert AI_player.evaluate_batch(boards, color).tolist() == expected
+
+def test_stack_boards_requires_numpy(monkeypatch):
+    import board_array
+    monkeypatch.setattr(board_array, "np", None)
+    with pytest.raises(ImportError):
+        GomokuAILevel1("AI", "BLACK").evaluate_batch([Chessboard(9)], "BLACK")
@@ -0,0 +1,153 @@
+from engine import *
+from game_journal import GameJournal
+import game_journal
+import copy
+import os
+import random
+
+GAMES = [(GomokuFactory, 9), (OthelloFactory, 4), (OthelloFactory, 6), (GoFactory, 7)]
+
+def human_players() -> list[Player]:
+    return [Player(is_guest=True, is_AI=False, name="GUEST", color=color) for color in ("BLACK", "WHITE")]
+
+def engine_state(engine: Engine) -> tuple:
+    """
+    :return: 恢复后应当一致的状态：棋盘、行棋方、终局、悔棋历史与双方的虚着标记
+    """
+    game = engine.game
+    return (copy.deepcopy(game.chessboard.board), engine.turn, game.get_turn_taken(), engine.game_over, engine.winner,
+            [memento.get_chessboard().board for memento in engine.caretaker.memento_list],
+            getattr(game, "black_skip_last_turn", None), getattr(game, "white_skip_last_turn", None))
+
+def read_bytes(path: str) -> bytes:
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+def recover_from(directory: str, game_factory, checkpoint: bytes, journal: bytes, temp: bytes=None) -> tuple:
+    """
+    把崩溃时的文件写入新的目录并恢复。
+    :param temp: 写到一半的临时检查点
+    :return: 恢复后的状态
+    """
+    path = os.path.join(directory, f"crash{len(os.listdir(directory))}.journal")
+    for suffix, content in (("", journal), (".ckpt", checkpoint), (".ckpt.tmp", temp)):
+        if content is not None:
+            with open(path + suffix, "wb") as f:
+                f.write(content)
+    engine = Engine(game_factory, human_players())
+    is_valid, message = GameJournal(path).recover(engine)
+    assert is_valid, message
+    return engine_state(engine)
+
+def play_random_game(engine: Engine, rnd: random.Random, max_calls: int=200):
+    """
+    模拟玩家操作，每次调用一个引擎操作后生成一次。围棋由玩家手动提子并结束回合，也会主动虚着。
+    """
+    size = engine.get_chessboard().get_size()
+    is_go = isinstance(engine.game_factory, GoFactory)
+    for _ in range(max_calls):
+        if engine.game_over:
+            return
+        if engine.begin_turn():  # 黑白棋中没有合法棋步时被迫虚着
+            yield "begin_turn"
+            continue
+        chessboard, color = engine.get_chessboard(), engine.current_color()
+        r = rnd.random()
+        if r < 0.05:
+            engine.undo()
+            yield "undo"
+            continue
+        if r < 0.06:
+            engine.resign()
+            yield "resign"
+            return
+        moves = [(row, col) for row in range(size) for col in range(size)
+                 if engine.game.rule.is_valid_move(row, col, chessboard, color, False)[0]]
+        if not moves or (is_go and r < 0.12):
+            engine.end_turn()
+            yield "pass"
+            continue
+        engine.play(*rnd.choice(moves))
+        yield "play"
+        if is_go and engine.current_color() == color and not engine.game_over:  # 需要提子
+            engine.capture()
+            yield "capture"
+            engine.end_turn()
+            yield "end_turn"
+
+def test_recover_matches_engine_after_random_crashes(tmp_path, monkeypatch):
+    rnd = random.Random(49)
+    checks = 0
+    kinds = set()
+    for game_factory_class, size in GAMES:
+        for index in range(6):
+            path = str(tmp_path / f"{game_factory_class.__name__}{size}-{index}.journal")
+            crash_dir = tmp_path / f"crash-{game_factory_class.__name__}{size}-{index}"
+            crash_dir.mkdir()
+            checkpoint_crashes = []  # 写检查点时崩溃的文件：(检查点, 日志, 临时文件)
+
+            real_replace = os.replace
+            def replace(src, dst):
+                # 替换前崩溃：旧检查点、完整的旧日志与写到一半的临时文件；替换后、清空日志前崩溃：新检查点与旧日志
+                old_checkpoint, journal, temp = read_bytes(dst), read_bytes(path), read_bytes(src)
+                real_replace(src, dst)
+                if old_checkpoint is not None:
+                    checkpoint_crashes.append((old_checkpoint, journal, temp[:len(temp) // 2]))
+                checkpoint_crashes.append((read_bytes(dst), journal, None))
+            monkeypatch.setattr(game_journal.os, "replace", replace)
+
+            engine = Engine(game_factory_class(), human_players())
+            engine.start(size)
+            journal = GameJournal(path, fsync="never", checkpoint_interval=rnd.choice([3, 8, 64]))
+            journal.attach(engine)
+            checkpoint_crashes.clear()
+            # 每次引擎操作之后的文件与状态
+            boundaries = [(read_bytes(journal.checkpoint_path), read_bytes(path), engine_state(engine))]
+            for kind in play_random_game(engine, rnd):
+                kinds.add(kind)
+                state = engine_state(engine)
+                boundaries.append((read_bytes(journal.checkpoint_path), read_bytes(path), state))
+                for crash in checkpoint_crashes:  # 检查点在操作的最后一个事件（换手）时写入
+                    assert recover_from(str(crash_dir), game_factory_class(), *crash) == state
+                    checks += 1
+                checkpoint_crashes.clear()
+            monkeypatch.setattr(game_journal.os, "replace", real_replace)
+            journal.detach()
+
+            for _ in range(40):
+                i = rnd.randrange(len(boundaries))
+                checkpoint, content, state = boundaries[i]
+                cut = rnd.randint(0, len(content))  # 日志只写入了前 cut 个字节（可能停在一行中间）
+                # 同一检查点下、日志不超过 cut 的最后一次操作
+                k = max(k for k in range(i + 1) if boundaries[k][0] == checkpoint
+                        and len(boundaries[k][1]) <= cut and content.startswith(boundaries[k][1]))
+                recovered = recover_from(str(crash_dir), game_factory_class(), checkpoint, content[:cut])
+                if cut == len(boundaries[k][1]):
+                    assert recovered == boundaries[k][2]
+                else:  # 停在一次操作的记录中间：恢复到该操作之前或之后
+                    assert recovered in (boundaries[k][2], boundaries[k + 1][2])
+                checks += 1
+            # 最后一行写到一半
+            checkpoint, content, state = boundaries[-1]
+            assert recover_from(str(crash_dir), game_factory_class(), checkpoint, content + b"999 m 1") == state
+            checks += 1
+    assert {"begin_turn", "capture", "end_turn", "pass", "undo"} <= kinds
+    assert checks > 300
+
+def test_rejected_pass_is_not_journaled(tmp_path):
+    for game_factory_class, size in GAMES[:2]:  # 五子棋、黑白棋不允许尚未落子时虚着
+        engine = Engine(game_factory_class(), human_players())
+        engine.start(size)
+        events = []
+        engine.add_listener(events.append)
+        path = str(tmp_path / f"{game_factory_class.__name__}.journal")
+        journal = GameJournal(path, fsync="never")
+        journal.attach(engine)
+        content = read_bytes(path)
+        assert engine.end_turn() == (False, "Set chess first.")
+        assert not any(event.type == EVENT_PASS for event in events)
+        assert read_bytes(path) == content
+        assert not engine.game.get_skip_last_turn(engine.current_color())
+        journal.detach()
@@ -0,0 +1,72 @@
+from engine import *
+from game_record import *
+import copy
+import random
+import pytest
+
+def human_players() -> list[Player]:
+    return [Player(is_guest=True, is_AI=False, name="GUEST", color=color) for color in ("BLACK", "WHITE")]
+
+def test_notation_round_trip():
+    moves = [(3, 4, "BLACK"), (None, None, "WHITE")] + [(row, col, "BLACK" if i % 2 == 0 else "WHITE")
+                                                        for i, (row, col) in enumerate((r, c) for r in range(5) for c in range(8))]
+    moves = fill_passes(moves)
+    setup = [(0, 0, "BLACK"), (7, 7, "WHITE"), (2, 5, "BLACK")]
+    for game_name, board_size, record_setup in (("Gomoku", 15, None), ("Othello", 8, setup)):
+        text = format_notation(game_name, board_size, record_setup, moves)
+        assert len(text.splitlines()) > 2  # 超过 MOVES_PER_LINE 步时分多行
+        name, size, parsed_setup, parsed_moves = parse_notation(text)
+        assert (name, size, parsed_moves) == (game_name, board_size, moves)
+        assert parsed_setup == (None if record_setup is None else sorted(record_setup, key=lambda stone: stone[2] != "BLACK"))
+
+def test_notation_rejects_invalid_records():
+    for text in ("Gomoku\n", "Gomoku 15\nz99\n", "Othello 8\nsetup X:a1\n", "Othello 8\nd3 i1\n"):
+        with pytest.raises(ValueError):
+            parse_notation(text)
+
+def test_sgf_round_trip():
+    moves = [(2, 2, "BLACK"), (None, None, "WHITE"), (3, 3, "BLACK"), (18, 0, "WHITE")] * 5
+    setup = [(0, 0, "BLACK"), (1, 0, "BLACK"), (18, 18, "WHITE")]
+    for record_setup in (None, setup):
+        text = format_sgf(19, record_setup, moves, komi=6.5)
+        assert parse_sgf(text) == (19, record_setup, moves)
+
+def test_sgf_main_line_of_variations():
+    text = "(;GM[1]FF[4]SZ[9]C[comment with \\] bracket];B[cc](;W[dd];B[ee](;W[ff])(;W[gg]))(;W[hh];B[ii]))"
+    assert parse_sgf(text) == (9, None, [(2, 2, "BLACK"), (3, 3, "WHITE"), (4, 4, "BLACK"), (5, 5, "WHITE")])
+
+def test_sgf_pass_only_records():
+    assert parse_sgf("(;GM[1]SZ[9];B[];W[tt])") == (9, None, [(None, None, "BLACK"), (None, None, "WHITE")])
+    assert parse_sgf("(;SZ[13])") == (13, None, [])
+    assert parse_sgf(format_sgf(9, None, [(None, None, "BLACK"), (None, None, "WHITE")])) == \
+        (9, None, [(None, None, "BLACK"), (None, None, "WHITE")])
+
+def test_sgf_rejects_invalid_records():
+    for text in ("", ";B[aa]", "(;SZ[9];B[aa]", "(;GM[2]SZ[9])", "(;SZ[9];B[zz])", "(;SZ[9];B[abc])", "(B[aa])"):
+        with pytest.raises(ValueError):
+            parse_sgf(text)
+
+@pytest.mark.parametrize("game_factory_class,size", [(GomokuFactory, 9), (OthelloFactory, 6), (GoFactory, 7)])
+def test_stored_game_replays_to_same_position(tmp_path, game_factory_class, size):
+    rnd = random.Random(48)
+    engine = Engine(game_factory_class(), human_players())
+    engine.start(size)
+    boards = [copy.deepcopy(engine.get_chessboard().board)]
+    for _ in range(30):
+        if engine.game_over:
+            break
+        if engine.begin_turn():
+            continue
+        chessboard, color = engine.get_chessboard(), engine.current_color()
+        moves = [(row, col) for row in range(size) for col in range(size)
+                 if engine.game.rule.is_valid_move(row, col, chessboard, color, False)[0]]
+        if not moves or (game_factory_class is GoFactory and rnd.random() < 0.1):
+            engine.end_turn()
+            continue
+        engine.play_move(*rnd.choice(moves))
+        boards.append(copy.deepcopy(engine.get_chessboard().board))
+    message = engine.store_state(str(tmp_path / "game"))
+    assert message.startswith("Successfully"), message
+    mementos, next_turn = game_factory_class().createGame().read_record(engine.game.states_stored[-1])
+    assert [memento.get_chessboard().board for memento in mementos] == boards
+    assert next_turn == engine.turn
@@ -0,0 +1,24 @@
+from gomocup import GomocupEngine
+from test_gomoku_pattern import CROWDED_BOARD
+
+def board_commands(rows: list[str]) -> list[str]:
+    """
+    :return: 给出整个棋盘的 BOARD 指令（X 为己方棋子，O 为对方棋子）
+    """
+    lines = [f"{col},{row},{1 if cell == 'X' else 2}" for row, line in enumerate(rows) for col, cell in enumerate(line) if cell != "."]
+    return ["BOARD"] + lines + ["DONE"]
+
+def run_commands(engine: GomocupEngine, commands: list[str]) -> list[str]:
+    responses = [engine.handle(command) for command in commands]
+    return [response for response in responses if response is not None]
+
+def test_crowded_board_gets_the_last_empty_cell():
+    engine = GomocupEngine(level=3, time_limit=0.1)
+    assert run_commands(engine, ["START 8"] + board_commands(CROWDED_BOARD)) == ["OK", "5,1"]
+
+def test_full_board_replies_error():
+    engine = GomocupEngine(level=3, time_limit=0.1)
+    full = [line.replace(".", "X") for line in CROWDED_BOARD]
+    responses = run_commands(engine, ["START 8"] + board_commands(full))
+    assert responses[0] == "OK" and responses[1].startswith("ERROR")
+    assert run_commands(engine, ["RESTART", "BEGIN"]) == ["OK", "4,4"]
@@ -0,0 +1,38 @@
+from gomoku_pattern import PatternEvaluator
+from chessboard import Chessboard
+from AI import GomokuAILevel3
+
+# 后期拥挤的 8x8 棋盘：没有连五，中心已有子，唯一的空位 (1, 5) 在任何方向上都无法形成棋型
+CROWDED_BOARD = [
+    "OXXOXOXX",
+    "XOOXX.OO",
+    "OOXOOOXX",
+    "XOXXOXOO",
+    "OOXOOOXO",
+    "OXXOOXXO",
+    "OOOXXOXO",
+    "OOOXXOOX",
+]
+
+def make_chessboard(rows: list[str]) -> Chessboard:
+    chessboard = Chessboard(len(rows))
+    for row, line in enumerate(rows):
+        for col, cell in enumerate(line):
+            if cell != ".":
+                chessboard.set_chess(row, col, "BLACK" if cell == "X" else "WHITE")
+    return chessboard
+
+def test_candidate_moves_falls_back_to_empty_cell():
+    evaluator = PatternEvaluator(make_chessboard(CROWDED_BOARD))
+    assert evaluator.cell_scores["BLACK"][1][5] == evaluator.cell_scores["WHITE"][1][5] == 0
+    assert evaluator.candidate_moves("BLACK") == [(1, 5)]
+    assert evaluator.candidate_moves("WHITE", 10) == [(1, 5)]
+
+def test_candidate_moves_empty_only_on_full_board():
+    full = make_chessboard([line.replace(".", "X") for line in CROWDED_BOARD])
+    assert PatternEvaluator(full).candidate_moves("WHITE") == []
+    assert PatternEvaluator(Chessboard(9)).candidate_moves("BLACK") == [(4, 4)]
+
+def test_level3_moves_on_crowded_board():
+    for color in ("BLACK", "WHITE"):
+        assert GomokuAILevel3(f"L3-{color}", color).calculate_move(make_chessboard(CROWDED_BOARD)) == (1, 5)
@@ -0,0 +1,122 @@
+from gomoku_threat import ThreatSolver
+from gomoku_pattern import PatternEvaluator
+from chessboard import Chessboard
+
+# 黑方（X）有 VCF：(2, 7) 冲四，之后连续冲四直到成五
+VCF_BOARD = [
+    "...........",
+    "O.......O..",
+    "......X.O..",
+    "......X...O",
+    "O....X.....",
+    "....XX.....",
+    "......X....",
+    "O..........",
+    "....X.X....",
+    "O.O........",
+    ".O.........",
+]
+
+# 黑方有两个活二，没有四，需要先走活三（VCT）
+VCT_BOARD = [
+    "...........",
+    "...........",
+    "...........",
+    "...........",
+    "...........",
+    ".....XX....",
+    "...........",
+    "...XX......",
+    "...........",
+    "...........",
+    "...........",
+]
+
+def make_chessboard(rows: list[str]) -> Chessboard:
+    chessboard = Chessboard(len(rows))
+    for row, line in enumerate(rows):
+        for col, cell in enumerate(line):
+            if cell != ".":
+                chessboard.set_chess(row, col, "BLACK" if cell == "X" else "WHITE")
+    return chessboard
+
+def makes_five(chessboard: Chessboard, row: int, col: int, color: str) -> bool:
+    """
+    :return: (row, col) 上的 color 棋子是否在某个方向上连成至少五子
+    """
+    size = chessboard.get_size()
+    for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        length = 1
+        for sign in (1, -1):
+            r, c = row + sign * d_row, col + sign * d_col
+            while 0 <= r < size and 0 <= c < size and chessboard.get_chess(r, c) == color:
+                length, r, c = length + 1, r + sign * d_row, c + sign * d_col
+        if length >= 5:
+            return True
+    return False
+
+def five_cells(chessboard: Chessboard, color: str) -> list[tuple[int, int]]:
+    """
+    :return: color 落子即可成五的所有空位
+    """
+    size = chessboard.get_size()
+    cells = []
+    for row in range(size):
+        for col in range(size):
+            if chessboard.get_chess(row, col) is None:
+                chessboard.set_chess(row, col, color)
+                if makes_five(chessboard, row, col, color):
+                    cells.append((row, col))
+                chessboard.set_chess(row, col, None)
+    return cells
+
+def verify_vcf(chessboard: Chessboard, attacker: str, line: list[tuple[int, int]]):
+    """
+    逐步检查 VCF：进攻方每步（除最后一步）都形成四且防守方不能先成五，防守方挡在成五点上，最后一步成五。
+    """
+    defender = "BLACK" if attacker == "WHITE" else "WHITE"
+    for index in range(0, len(line), 2):
+        row, col = line[index]
+        assert chessboard.get_chess(row, col) is None
+        chessboard.set_chess(row, col, attacker)
+        if makes_five(chessboard, row, col, attacker):
+            assert index == len(line) - 1
+            return
+        assert five_cells(chessboard, attacker), f"{line[index]} is not a four"
+        assert not five_cells(chessboard, defender)
+        reply = line[index + 1]
+        assert reply in five_cells(chessboard, attacker)
+        chessboard.set_chess(*reply, defender)
+    raise AssertionError("VCF does not end with five.")
+
+def test_finds_constructed_vcf():
+    chessboard = make_chessboard(VCF_BOARD)
+    assert not five_cells(chessboard, "BLACK")  # 开始时还没有四
+    line = ThreatSolver().solve(chessboard, "BLACK", vct=False)
+    assert line is not None and len(line) >= 5
+    verify_vcf(chessboard, "BLACK", line)
+
+def test_no_vcf_for_defender_or_on_quiet_board():
+    assert ThreatSolver().solve(make_chessboard(VCF_BOARD), "WHITE") is None
+    assert ThreatSolver().solve(Chessboard(11), "BLACK") is None
+
+def test_vct_needs_three_first():
+    chessboard = make_chessboard(VCT_BOARD)
+    solver = ThreatSolver()
+    assert solver.solve(chessboard, "BLACK", vct=False) is None
+    line = solver.solve(chessboard, "BLACK")
+    assert line is not None
+    assert len(set(line)) == len(line)
+    row, col = line[0]
+    assert chessboard.get_chess(row, col) is None
+    chessboard.set_chess(row, col, "BLACK")
+    assert not five_cells(chessboard, "BLACK")  # 第一步是活三而不是四
+
+def test_solver_restores_evaluator_and_honours_node_limit():
+    evaluator = PatternEvaluator(make_chessboard(VCF_BOARD))
+    board, scores = [row[:] for row in evaluator.board], dict(evaluator.total_scores)
+    assert ThreatSolver().solve_evaluator(evaluator, "BLACK") is not None
+    assert evaluator.board == board and evaluator.total_scores == scores
+    assert ThreatSolver(node_limit=1).solve_evaluator(evaluator, "BLACK") is None  # 超出预算时放弃
+    assert ThreatSolver().solve_evaluator(evaluator, "BLACK", visit=lambda: True) is None
+    assert evaluator.board == board and evaluator.total_scores == scores
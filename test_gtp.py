@@ -0,0 +1,30 @@
+from gtp import GTPEngine
+
+def run_transcript(engine: GTPEngine, commands: list[str]) -> list[str]:
+    """
+    :return: 每条指令的应答（去掉结尾空行）
+    """
+    return [engine.handle(command).rstrip("\n") for command in commands]
+
+def test_play_continues_after_two_passes():
+    engine = GTPEngine(level=1, board_size=9, time_limit=0.05)
+    responses = run_transcript(engine, ["play b pass", "play w pass", "play b D5", "play w E5", "genmove b", "undo"])
+    assert responses[:4] == ["=", "=", "=", "="]
+    assert responses[4].startswith("= ") and responses[4] != "= pass"
+    assert responses[5] == "="
+    chessboard = engine.engine.get_chessboard()
+    assert chessboard.get_chess(4, 3) == "BLACK" and chessboard.get_chess(4, 4) == "WHITE"  # D5、E5
+    assert not engine.engine.game_over
+
+def test_two_passes_end_game_until_next_move():
+    engine = GTPEngine(level=1, board_size=9, time_limit=0.05)
+    run_transcript(engine, ["play b C3", "play w pass", "play b pass"])
+    assert engine.engine.game_over
+    assert run_transcript(engine, ["play w G7"]) == ["="]
+    assert not engine.engine.game_over
+    assert engine.engine.get_chessboard().get_chess(2, 6) == "WHITE"
+
+def test_genmove_under_tiny_budget_does_not_pass():
+    engine = GTPEngine(level=2, board_size=19, time_limit=0.0005)
+    response = run_transcript(engine, ["genmove b"])[0]
+    assert response.startswith("= ") and response != "= pass"
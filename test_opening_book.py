@@ -0,0 +1,65 @@
+from opening_book import *
+import pytest
+
+def build_book(tmp_path, positions: int=40) -> tuple[str, list[tuple[Chessboard, str, tuple[int, int]]]]:
+    """
+    收录 positions 个不同的局面（每个局面一颗棋子），写入开局库文件。
+    :return: 文件路径，[(棋盘, 行棋方, 收录的落子), ...]
+    """
+    builder = OpeningBookBuilder()
+    added = []
+    for index in range(positions):
+        chessboard = Chessboard(9)
+        chessboard.set_chess(index // 9, index % 9, "BLACK")
+        move = ((index + 1) // 9, (index + 1) % 9)
+        builder.add_position(chessboard, "WHITE", (8, 8), result=-1)  # 结果更差的落子不会被选中
+        builder.add_position(chessboard, "WHITE", move, result=1)
+        added.append((chessboard, "WHITE", move))
+    path = str(tmp_path / "book.bin")
+    assert builder.build(path) == positions
+    return path, added
+
+def test_lookup_hits_and_misses(tmp_path):
+    path, added = build_book(tmp_path)
+    with OpeningBook(path) as book:
+        assert len(book) == len(added)
+        for chessboard, curr_turn, move in added:
+            assert book.lookup(chessboard, curr_turn) == (*move, 1)
+        chessboard = added[0][0]
+        assert book.lookup(chessboard, "BLACK") is None  # 行棋方不同
+        assert book.lookup(Chessboard(9), "WHITE") is None
+        assert book.lookup(Chessboard(8), "WHITE") is None
+
+def test_first_and_last_entries(tmp_path):
+    path, added = build_book(tmp_path)
+    with OpeningBook(path) as book:
+        keys = [book.get_entry(index)[0] for index in range(len(book))]
+        assert keys == sorted(keys)
+        for index in (0, len(book) - 1):
+            key, row, col, score = book.get_entry(index)
+            assert book.lookup_hash(key) == (row, col, score)
+        assert book.lookup_hash(keys[0] - 1) is None  # 比所有条目都小
+        assert book.lookup_hash(keys[-1] + 1) is None  # 比所有条目都大
+
+def test_empty_book(tmp_path):
+    path = str(tmp_path / "empty.bin")
+    assert OpeningBookBuilder().build(path) == 0
+    with OpeningBook(path) as book:
+        assert len(book) == 0
+        assert book.lookup(Chessboard(9), "BLACK") is None
+
+def test_invalid_files(tmp_path):
+    path, _ = build_book(tmp_path)
+    with open(path, "rb") as f:
+        content = f.read()
+    invalid = {
+        "magic.bin": b"XXXX" + content[4:],
+        "truncated.bin": content[:-1],
+        "header.bin": content[:HEADER_SIZE - 1],
+        "empty.bin": b"",
+    }
+    for name, data in invalid.items():
+        with open(tmp_path / name, "wb") as f:
+            f.write(data)
+        with pytest.raises(ValueError):
+            OpeningBook(str(tmp_path / name))
@@ -0,0 +1,60 @@
+import pytest
+np = pytest.importorskip("numpy")
+from othello_batch import OthelloBatch
+from board_array import BLACK_CHESS, WHITE_CHESS, EMPTY
+from game_factory import OthelloFactory
+
+CODE_COLORS = {BLACK_CHESS: "BLACK", WHITE_CHESS: "WHITE"}
+
+def to_codes(board: list[list[str]]) -> list[list[int]]:
+    return [[{None: EMPTY, "BLACK": BLACK_CHESS, "WHITE": WHITE_CHESS}[chess] for chess in row] for row in board]
+
+@pytest.mark.parametrize("size", [4, 6, 8])
+def test_random_playouts_match_othello_rule(size):
+    n = 100
+    batch = OthelloBatch(n, size, seed=size)
+    games = []
+    for _ in range(n):
+        game = OthelloFactory().createGame()
+        game.set_chessboard(size)
+        games.append(game)
+    while not batch.done.all():
+        legal = batch.legal_moves()
+        for i, game in enumerate(games):
+            if batch.done[i]:
+                assert not legal[i].any()
+                continue
+            color = CODE_COLORS[int(batch.to_move[i])]
+            expected = [bool(game.rule.get_flippable_chess(row, col, game.chessboard, color)) and game.chessboard.get_chess(row, col) is None
+                        for row in range(size) for col in range(size)]
+            assert legal[i].tolist() == expected
+        moves = batch.random_moves()
+        to_move = batch.to_move.copy()
+        done = batch.done.copy()
+        batch.step(moves)
+        boards = batch.boards()
+        for i, game in enumerate(games):
+            if done[i]:
+                continue
+            row, col = divmod(int(moves[i]), size)
+            game.make_move(row, col, CODE_COLORS[int(to_move[i])])
+            assert boards[i].tolist() == to_codes(game.chessboard.board)
+            # 终局：任一方没有合法棋步
+            finished = not (game.rule.has_valid_moves(game.chessboard, "BLACK") and game.rule.has_valid_moves(game.chessboard, "WHITE"))
+            assert bool(batch.done[i]) == finished
+    winners = batch.winners()
+    for i, game in enumerate(games):
+        winner = game.rule.check_win(game.chessboard)
+        assert int(winners[i]) == {"BLACK": BLACK_CHESS, "WHITE": WHITE_CHESS, None: EMPTY}[winner]
+
+def test_from_boards_round_trip():
+    batch = OthelloBatch(16, 6, seed=1)
+    batch.play_out(max_plies=10)
+    copied = OthelloBatch.from_boards(batch.boards(), batch.to_move)
+    assert (copied.black == batch.black).all() and (copied.white == batch.white).all()
+    assert (copied.legal_moves() == batch.legal_moves()).all()
+
+def test_illegal_step_is_rejected():
+    batch = OthelloBatch(2, 8)
+    with pytest.raises(ValueError):
+        batch.step([0, 0])
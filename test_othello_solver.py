@@ -0,0 +1,108 @@
+from othello_solver import *
+from game_rule import OthelloRule
+from game_factory import OthelloFactory
+import random
+import pytest
+
+RULE = OthelloRule()
+
+def other(color: str) -> str:
+    return "WHITE" if color == "BLACK" else "BLACK"
+
+def legal_moves(chessboard: Chessboard, color: str) -> list[tuple[int, int]]:
+    size = chessboard.get_size()
+    return [(row, col) for row in range(size) for col in range(size)
+            if RULE.is_valid_move(row, col, chessboard, color, False)[0]]
+
+def play(chessboard: Chessboard, row: int, col: int, color: str) -> Chessboard:
+    after = Chessboard(chessboard.get_size())
+    after.set_board(chessboard.board)
+    flipped = RULE.get_flippable_chess(row, col, after, color)
+    after.set_chess(row, col, color)
+    RULE.flip_chess(flipped, after, color)
+    return after
+
+class ReferenceSolver:
+    """
+    按 OthelloRule 在 Chessboard 上逐格计算的负极大值搜索，作为位棋盘求解器的参照。
+    """
+    def __init__(self):
+        self.values: dict[tuple, int] = {}  # (棋盘, 行棋方) -> 精确结果（只记录非终局局面）
+
+    def solve(self, chessboard: Chessboard, color: str) -> int:
+        moves = legal_moves(chessboard, color)
+        if not moves or not legal_moves(chessboard, other(color)):
+            cells = [chess for row in chessboard.board for chess in row]
+            return cells.count(color) - cells.count(other(color))
+        key = (tuple(map(tuple, chessboard.board)), color)
+        if key not in self.values:
+            self.values[key] = max(-self.solve(play(chessboard, row, col, color), other(color)) for row, col in moves)
+        return self.values[key]
+
+def board_of(board: tuple) -> Chessboard:
+    chessboard = Chessboard(len(board))
+    chessboard.set_board([list(row) for row in board])
+    return chessboard
+
+def initial_chessboard(size: int) -> Chessboard:
+    game = OthelloFactory().createGame()
+    game.set_chessboard(size)
+    return game.chessboard
+
+def test_bitboard_moves_and_flips_match_rule():
+    rnd = random.Random(32)
+    for size in (4, 6, 8):
+        solver = OthelloSolver(size)
+        for _ in range(100):
+            chessboard = initial_chessboard(size)
+            color = "BLACK"
+            for _ in range(rnd.randrange(size * size)):
+                moves = legal_moves(chessboard, color)
+                if not moves:
+                    break
+                chessboard = play(chessboard, *rnd.choice(moves), color)
+                color = other(color)
+            own, opponent = solver.to_bits(chessboard, color)
+            expected = sum(1 << (row * size + col) for row, col in legal_moves(chessboard, color))
+            assert solver.legal_moves(own, opponent) == expected
+            for row, col in legal_moves(chessboard, color):
+                flipped = sum(1 << (r * size + c) for r, c in RULE.get_flippable_chess(row, col, chessboard, color))
+                assert solver.flips(own, opponent, 1 << (row * size + col)) == flipped
+
+@pytest.fixture(scope="module")
+def reference_4x4() -> ReferenceSolver:
+    """
+    :return: 已求解 4x4 初始局面可达的所有非终局局面的参照求解器
+    """
+    reference = ReferenceSolver()
+    reference.solve(initial_chessboard(4), "BLACK")
+    return reference
+
+def sample_positions(reference: ReferenceSolver, count: int=500) -> list[tuple[Chessboard, str, int]]:
+    items = random.Random(4).sample(list(reference.values.items()), count)  # 插入顺序确定
+    return [(board_of(board), color, value) for (board, color), value in items]
+
+def test_solver_matches_reference_on_4x4(reference_4x4):
+    reference = reference_4x4
+    solver = OthelloSolver(4)
+    assert solver.solve(*solver.initial_position()) == reference.solve(initial_chessboard(4), "BLACK")
+    for position, color, value in sample_positions(reference):
+        result, move = solver.solve_position(position, color)
+        assert result == value
+        assert -reference.solve(play(position, *move, color), other(color)) == value  # 最佳落子达到精确结果
+
+def test_tablebase_on_4x4(tmp_path, reference_4x4):
+    reference = reference_4x4
+    path = str(tmp_path / "othello4.tb")
+    count = build_tablebase(4, path, workers=2, split_depth=2, memo_limit=200)  # 置换表较小，分段写入多个临时文件
+    solver = OthelloSolver(4)
+    assert count == len({solver.canonical(*solver.to_bits(board_of(board), color))[0] for board, color in reference.values})
+    tablebases = OthelloTablebases(str(tmp_path / "othello{size}.tb"))
+    assert tablebases.get(6) is None
+    for position, color, value in sample_positions(reference):
+        row, col, result = tablebases.lookup(position, color)
+        assert result == value
+        assert (row, col) in legal_moves(position, color)
+        assert -reference.solve(play(position, row, col, color), other(color)) == value
+    assert tablebases.lookup(initial_chessboard(6), "BLACK") is None
+    tablebases.get(4).close()
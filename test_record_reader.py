@@ -0,0 +1,131 @@
+from record_reader import *
+from game_factory import GomokuFactory, GoFactory
+import json
+import random
+import pytest
+
+def random_record(game, board_size: int, plies: int, rnd: random.Random, pass_rate: float=0.0) -> list:
+    """
+    按规则随机落子（可能虚着）。
+    :return: 从黑方开始双方轮流的落子序列
+    """
+    replay = game.start_record_game(board_size, None)
+    moves = []
+    for _ in range(plies):
+        color = next_color(moves)
+        valid = [(row, col) for row in range(board_size) for col in range(board_size)
+                 if replay.rule.is_valid_move(row, col, replay.chessboard, color, False)[0]]
+        if not valid or rnd.random() < pass_rate:
+            moves.append((None, None, color))
+            continue
+        row, col = rnd.choice(valid)
+        replay.make_move(row, col, color)
+        replay.capture()
+        moves.append((row, col, color))
+    return moves
+
+def write_record(path, game, board_size: int, moves: list) -> str:
+    file_path = str(path) + game.record_extension
+    with open(file_path, "w") as f:
+        f.write(game.format_record(board_size, None, moves))
+    return file_path
+
+@pytest.mark.parametrize("game_factory_class,board_size,plies", [(GomokuFactory, 15, 150), (GoFactory, 9, 150)])
+def test_seek_matches_sequential_playback(tmp_path, game_factory_class, board_size, plies):
+    rnd = random.Random(50)
+    game = game_factory_class().createGame()
+    moves = random_record(game, board_size, plies, rnd, pass_rate=0.05)
+    file_path = write_record(tmp_path / "game", game, board_size, moves)
+    expected = [memento.get_chessboard().board for memento in game.replay_record(board_size, None, moves)[0]]
+    assert len(expected) > KEYFRAME_CACHE_SIZE * 2
+    for interval in (1, 2, 5, PLAYBACK_KEYFRAME_INTERVAL):
+        reader = MoveListReader(file_path, game, keyframe_interval=interval)
+        try:
+            assert [[line[:] for line in board] for board in reader.positions()] == expected
+            assert reader.length == len(expected)
+            assert len(reader.cache) <= KEYFRAME_CACHE_SIZE
+            indices = list(range(len(expected))) * 2
+            rnd.shuffle(indices)
+            for index in indices:
+                assert reader.board_at(index) == expected[index], (interval, index)
+                assert len(reader.cache) <= KEYFRAME_CACHE_SIZE
+            assert 0 in reader.cache  # 初始局面始终保留
+            assert reader.board_at(len(expected)) is None
+            assert [[line[:] for line in board] for board in reader.positions(len(expected) - 3)] == expected[-3:]
+        finally:
+            reader.close()
+
+def test_evicted_keyframes_stay_spread_out(tmp_path):
+    game = GomokuFactory().createGame()
+    moves = random_record(game, 15, 200, random.Random(7))
+    reader = MoveListReader(write_record(tmp_path / "game", game, 15, moves), game, keyframe_interval=1)
+    try:
+        for _ in reader.positions():
+            pass
+        keys = sorted(reader.cache)
+        assert len(keys) == KEYFRAME_CACHE_SIZE and keys[0] == 0 and keys[-1] == 200
+        assert max(b - a for a, b in zip(keys, keys[1:])) <= 2 * 200 // (KEYFRAME_CACHE_SIZE - 1)
+    finally:
+        reader.close()
+
+def test_legacy_json_with_large_boards(tmp_path):
+    rnd = random.Random(3)
+    chessboards = [[[rnd.choice([None, "BLACK", "WHITE"]) for _ in range(19)] for _ in range(19)] for _ in range(12)]
+    text = json.dumps({"chessboards": chessboards, "curr_turn": 0}, indent=2)
+    assert len(json.dumps(chessboards[0], indent=2)) > 4096  # 大于初始的解析窗口
+    file_path = str(tmp_path / "legacy.json")
+    with open(file_path, "w") as f:
+        f.write(text)
+    reader = open_record_reader(file_path, None)
+    try:
+        assert isinstance(reader, JsonReader)
+        assert reader.board_at(5) == chessboards[5]
+        assert list(reader.positions()) == chessboards
+        assert reader.length == len(chessboards)
+        for index in (11, 0, 7, 3):
+            assert reader.board_at(index) == chessboards[index]
+        assert reader.board_at(12) is None
+    finally:
+        reader.close()
+
+def test_truncated_and_empty_files(tmp_path):
+    game = GoFactory().createGame()
+    for name in ("empty.json", "empty.txt", "empty.sgf", "header.txt", "header.sgf", "no_boards.json", "no_list.json"):
+        with open(tmp_path / name, "w") as f:
+            f.write({"header.txt": "Gomo", "header.sgf": "(;GM[1]SZ[9", "no_boards.json": '{"chessboards": [ ]}',
+                     "no_list.json": '{"curr_turn": 0}'}.get(name, ""))
+        reader_game = game if name.endswith(".sgf") else GomokuFactory().createGame()
+        with pytest.raises(ValueError):
+            open_record_reader(str(tmp_path / name), reader_game)
+
+    # 最后一个棋盘写到一半的 JSON：之前的棋盘仍可读取
+    chessboards = [[[None] * 9 for _ in range(9)] for _ in range(3)]
+    chessboards[1][4][4] = chessboards[2][4][4] = "BLACK"
+    chessboards[2][3][3] = "WHITE"
+    text = json.dumps({"chessboards": chessboards})
+    file_path = str(tmp_path / "truncated.json")
+    with open(file_path, "w") as f:
+        f.write(text[:text.rindex('"WHITE"')])
+    reader = open_record_reader(file_path, None)
+    try:
+        assert reader.board_at(1) == chessboards[1]
+        with pytest.raises(ValueError):
+            reader.board_at(2)
+    finally:
+        reader.close()
+
+    # 写到一半的落子记录：只回放完整的落子
+    moves = [(2, 2, "BLACK"), (3, 3, "WHITE"), (4, 4, "BLACK")]
+    for record_game in (GomokuFactory().createGame(), game):
+        text = record_game.format_record(9, None, moves)
+        cut = text.rindex("e") + 1 if record_game is game else text.rindex("5")  # 截在最后一手的坐标中间
+        file_path = str(tmp_path / "truncated") + record_game.record_extension
+        with open(file_path, "w") as f:
+            f.write(text[:cut])
+        reader = open_record_reader(file_path, record_game)
+        try:
+            boards = [[line[:] for line in board] for board in reader.positions()]
+            assert len(boards) == 3 and reader.length == 3
+            assert boards[-1][3][3] == "WHITE" and boards[-1][4][4] is None
+        finally:
+            reader.close()
@@ -0,0 +1,46 @@
+from AI import GoAILevel2
+from chessboard import Chessboard
+from search_control import SearchControl
+import threading
+
+def unlimited_AI() -> GoAILevel2:
+    AI = GoAILevel2("AI", "BLACK")
+    AI.set_search_control(SearchControl())
+    return AI
+
+def test_cancel_from_another_thread_returns_best_move_so_far():
+    AI = unlimited_AI()
+    chessboard = Chessboard(9)
+    started, cancelled = threading.Event(), threading.Event()
+    visit_node = AI.visit_node
+    def blocking_visit_node():
+        # 第一次访问节点时暂停，等待主线程取消
+        if not started.is_set():
+            started.set()
+            cancelled.wait(5)
+        return visit_node()
+    AI.visit_node = blocking_visit_node
+    result = {}
+    worker = threading.Thread(target=lambda: result.setdefault("move", AI.calculate_move(chessboard)))
+    worker.start()
+    assert started.wait(5)
+    AI.search_control.cancel()
+    cancelled.set()
+    worker.join(5)
+    assert not worker.is_alive()
+    assert result["move"] is not None and chessboard.get_chess(*result["move"]) is None
+    assert AI.search_stats.stopped
+    assert AI.search_stats.nodes < 81
+
+    # 取消只作用于一次搜索
+    assert AI.calculate_move(chessboard) is not None
+    assert not AI.search_stats.stopped
+
+def test_cancel_before_search_starts_is_not_lost():
+    AI = unlimited_AI()
+    AI.search_control.cancel()  # 工作线程尚未开始搜索
+    worker = threading.Thread(target=AI.calculate_move, args=(Chessboard(9),))
+    worker.start()
+    worker.join(5)
+    assert AI.search_stats.stopped and AI.search_stats.pv
+    assert not AI.search_control.cancelled.is_set()
@@ -0,0 +1,209 @@
+from server import *
+import asyncio
+import json
+import threading
+
+class LoopbackClient:
+    """
+    通过本地 TCP 连接向 GameServer 发送请求的模拟客户端。
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, port: int) -> "LoopbackClient":
+        return cls(*await asyncio.open_connection(SERVER_HOST, port))
+
+    async def send_line(self, line: bytes) -> dict:
+        self.writer.write(line + b"\n")
+        await self.writer.drain()
+        return await self.receive()
+
+    async def request(self, **request) -> dict:
+        return await self.send_line(json.dumps(request).encode())
+
+    async def receive(self) -> dict:
+        return json.loads(await asyncio.wait_for(self.reader.readline(), 10))
+
+    def close(self):
+        self.writer.close()
+
+def run_with_server(scenario, **options):
+    """
+    在端口 0 上启动服务器，运行 scenario(server, port)，结束后关闭服务器。
+    """
+    async def run():
+        server = GameServer(time_limit=0.05, **options)
+        tcp_server = await server.serve(port=0)
+        try:
+            return await scenario(server, tcp_server.sockets[0].getsockname()[1])
+        finally:
+            for _ in range(100):  # 等待服务器处理完客户端断开
+                if not server.writers:
+                    break
+                await asyncio.sleep(0.01)
+            tcp_server.close()
+            await tcp_server.wait_closed()
+            server.executor.shutdown()
+    return asyncio.run(run())
+
+def test_new_move_undo_close():
+    async def scenario(server, port):
+        client = await LoopbackClient.connect(port)
+        created = await client.request(cmd="new", game="Gomoku", size=9, id=7)
+        assert created["ok"] and created["id"] == 7 and created["turn"] == "BLACK"
+        session = created["session"]
+        moved = await client.request(cmd="move", session=session, row=4, col=4)
+        assert moved["ok"] and moved["board"][4][4] == "B" and moved["turn"] == "WHITE"
+        assert [event["type"] for event in moved["events"]] == ["move", "turn"]
+        occupied = await client.request(cmd="move", session=session, row=4, col=4)
+        assert not occupied["ok"]
+        await client.request(cmd="move", session=session, row=3, col=3)
+        undone = await client.request(cmd="undo", session=session)
+        assert undone["ok"] and undone["turn"] == "BLACK"  # 回到黑方上一次落子之前
+        assert undone["board"][3][3] == "." and undone["board"][4][4] == "."
+        assert not (await client.request(cmd="undo", session=session))["ok"]  # 每轮只能悔棋一次
+        listed = await client.request(cmd="list")
+        assert [item["session"] for item in listed["sessions"]] == [session]
+        assert (await client.request(cmd="close", session=session))["ok"]
+        assert not (await client.request(cmd="board", session=session))["ok"]
+        client.close()
+    run_with_server(scenario)
+
+def test_ai_turns_and_watchers():
+    async def scenario(server, port):
+        player, watcher = await LoopbackClient.connect(port), await LoopbackClient.connect(port)
+        created = await player.request(cmd="new", game="Othello", size=6, white=1)
+        session = created["session"]
+        assert (await watcher.request(cmd="watch", session=session))["ok"]
+        snapshot = await watcher.receive()
+        assert snapshot["type"] == "snapshot" and snapshot["board"] == created["board"]
+        row, col = next((row, col) for row in range(6) for col in range(6)
+                        if server.sessions[session].engine.game.rule.is_valid_move(row, col, server.sessions[session].engine.get_chessboard(), "BLACK", False)[0])
+        moved = await player.request(cmd="move", session=session, row=row, col=col)
+        assert moved["ok"] and moved["turn"] == "BLACK"  # AI 已在应答前落子
+        assert sum(event["type"] == "move" for event in moved["events"]) == 2
+        # 观战者按序号收到同样的两步与换手
+        board = [list(line) for line in snapshot["board"]]
+        seq = snapshot["seq"]
+        while seq < server.sessions[session].feed.seq:
+            message = await watcher.receive()
+            seq = message["seq"]
+            if message["type"] == "move":
+                code = message["color"]
+                for r, c in [message["at"]] + message.get("flipped", []):
+                    board[r][c] = code
+        assert ["".join(line) for line in board] == moved["board"]
+        await player.request(cmd="close", session=session)
+        assert (await watcher.receive())["type"] == "closed"
+        player.close()
+        watcher.close()
+    run_with_server(scenario)
+
+def test_malformed_requests_keep_connection():
+    async def scenario(server, port):
+        client = await LoopbackClient.connect(port)
+        session = (await client.request(cmd="new", game="Go", size=9))["session"]
+        bad_requests = [
+            b"not json",
+            b"\xff\xfe",
+            b"[1, 2]",
+            b'"id"',
+            b'{"cmd": ["new"]}',
+            b'{"cmd": "launch"}',
+            b'{"cmd": "board", "session": [1]}',
+            b'{"cmd": "board", "session": true}',
+            b'{"cmd": "new", "game": "Gomoku", "size": 9.0}',
+            b'{"cmd": "new", "game": "Gomoku", "size": "9"}',
+            b'{"cmd": "new", "game": "Gomoku", "black": [2]}',
+            b'{"cmd": "new", "game": "Gomoku", "black": 9}',
+            b'{"cmd": "new", "game": ["Go"]}',
+            b'{"cmd": "move", "session": %d, "row": 1.0, "col": 2}' % session,
+            b'{"cmd": "move", "session": %d, "row": "1", "col": 2}' % session,
+            b'{"cmd": "move", "session": %d, "row": 99, "col": 2}' % session,
+            b'{"cmd": "unwatch", "session": %d}' % session,
+        ]
+        for line in bad_requests:
+            response = await client.send_line(line)
+            assert response["ok"] is False and response["error"], line
+        assert list(server.sessions) == [session]  # 失败的 new 没有留下对局
+        assert (await client.request(cmd="move", session=session, row=2, col=2, id="last"))["id"] == "last"
+        client.close()
+    run_with_server(scenario)
+
+def test_concurrent_clients():
+    async def play(port: int, index: int):
+        client = await LoopbackClient.connect(port)
+        session = (await client.request(cmd="new", game="Gomoku", size=8))["session"]
+        for step in range(6):
+            response = await client.request(cmd="move", session=session, row=step, col=(index + step) % 8)
+            assert response["ok"], response
+        client.close()
+        return session
+
+    async def scenario(server, port):
+        sessions = await asyncio.gather(*(play(port, index) for index in range(50)))
+        assert len(set(sessions)) == 50
+        for _ in range(100):  # 连接关闭后服务器关闭其对局
+            if not server.sessions:
+                break
+            await asyncio.sleep(0.01)
+        assert not server.sessions
+    run_with_server(scenario)
+
+def test_ai_without_move_resigns_instead_of_looping():
+    async def scenario(server, port):
+        client = await LoopbackClient.connect(port)
+        session = (await client.request(cmd="new", game="Gomoku", size=8, white=1))["session"]
+        server.sessions[session].engine.players[1].calculate_move = lambda chessboard: None  # 五子棋不能虚着
+        moved = await asyncio.wait_for(client.request(cmd="move", session=session, row=3, col=3), 5)
+        assert moved["ok"] and moved["game_over"] and moved["winner"] == "BLACK"
+        assert moved["events"][-1] == {"type": "game_over", "winner": "BLACK", "reason": "resign"}
+        assert (await asyncio.wait_for(client.request(cmd="board", session=session), 5))["ok"]  # 对局锁已释放
+        client.close()
+    run_with_server(scenario)
+
+def test_other_connections_cannot_play_or_close():
+    async def scenario(server, port):
+        owner, other = await LoopbackClient.connect(port), await LoopbackClient.connect(port)
+        session = (await owner.request(cmd="new", game="Gomoku", size=9))["session"]
+        for request in ({"cmd": "close"}, {"cmd": "move", "row": 4, "col": 4}, {"cmd": "pass"}, {"cmd": "undo"}, {"cmd": "resign"}):
+            response = await other.request(session=session, **request)
+            assert response == {"ok": False, "error": "Not your session."}, request
+        assert (await other.request(cmd="board", session=session))["ok"]  # 查看与观战对所有连接开放
+        assert list(server.sessions) == [session] and not server.sessions[session].engine.game_over
+        assert (await owner.request(cmd="close", session=session))["ok"]
+        owner.close()
+        other.close()
+    run_with_server(scenario)
+
+def test_owner_disconnect_cancels_AI_search():
+    async def scenario(server, port):
+        searching, finished, calls = threading.Event(), threading.Event(), []
+        create_player = server.create_player
+        def create_blocking_player(game_name, spec, color):
+            player = create_player(game_name, spec, color)
+            calculate_move = player.calculate_move
+            def blocking_calculate_move(chessboard):
+                # 模拟用满时间上限的搜索：直到被取消才返回
+                calls.append(color)
+                searching.set()
+                player.search_control.cancelled.wait(10)
+                move = calculate_move(chessboard)
+                finished.set()
+                return move
+            player.calculate_move = blocking_calculate_move
+            return player
+        server.create_player = create_blocking_player
+
+        client = await LoopbackClient.connect(port)
+        client.writer.write(b'{"cmd": "new", "game": "Gomoku", "size": 8, "black": 1, "white": 1}\n')
+        await client.writer.drain()
+        assert await asyncio.get_running_loop().run_in_executor(None, searching.wait, 5)
+        client.close()
+        assert await asyncio.get_running_loop().run_in_executor(None, finished.wait, 5)  # 搜索被取消，线程池中的线程已释放
+        await asyncio.sleep(0.1)
+        assert not server.sessions
+        assert calls == ["BLACK"]  # 关闭后不再继续 AI 回合
+    run_with_server(scenario)
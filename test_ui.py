@@ -0,0 +1,26 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # 没有显示设备时使用虚拟显示
+import pygame
+import threading
+import time
+from UI import UITemplate
+
+def test_detect_event_timeout_ignores_mouse_motion():
+    pygame.display.init()
+    pygame.display.set_mode((100, 100))
+    stop = threading.Event()
+    def move_mouse():
+        end = time.perf_counter() + 2  # 修复前 detect_event 要等鼠标停止移动才返回
+        while not stop.is_set() and time.perf_counter() < end:
+            pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=(1, 1), rel=(0, 0), buttons=(0, 0, 0)))
+            time.sleep(0.02)
+    threading.Thread(target=move_mouse, daemon=True).start()
+    try:
+        start = time.perf_counter()
+        assert UITemplate.detect_event(None, timeout=100) is None  # 不使用实例属性
+        assert time.perf_counter() - start < 0.5  # 鼠标移动不会重新计时
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+        assert UITemplate.detect_event(None, timeout=100) == (pygame.KEYDOWN, pygame.K_SPACE)
+    finally:
+        stop.set()
+        pygame.display.quit()
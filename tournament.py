@@ -0,0 +1,156 @@
+from engine import *
+from AI_factory import *
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import time
+
+# 各游戏的工厂、默认棋盘大小与可用 AI 等级
+# 不包括围棋：围棋规则没有禁止打劫时立即提回（也没有全局同形禁止），两个 AI 对局时可能在互相提劫中无限循环，
+# 对局不会结束（也就无法统计胜负）。
+GAME_SETTINGS = {
+    "Gomoku": (GomokuFactory, GomokuAIFactory, 15, [1, 2, 3]),
+    "Othello": (OthelloFactory, OthelloAIFactory, 8, [1, 2]),
+}
+
+def play_game(game_name: str, board_size: int, black_level: int, white_level: int,
+              time_limit: float=None, seed: int=None, book_path: str=None) -> dict:
+    """
+    不打开窗口进行一局 AI 对局（由对局引擎 Engine 驱动）。
+    :param game_name: 游戏名称（"Gomoku" 或 "Othello"）
+    :param board_size: 棋盘大小
+    :param black_level: 执黑 AI 等级
+    :param white_level: 执白 AI 等级
+    :param time_limit: AI 每步的时间上限（秒）
+    :param seed: 随机种子（一级 AI 随机落子）
+    :param book_path: 开局库路径，为 None 时不使用开局库
+    :return: 对局记录
+    """
+    game_factory_class, AI_factory_class, _, _ = GAME_SETTINGS[game_name]
+    random.seed(seed)
+    AI_factory = AI_factory_class(book_path=book_path, time_limit=time_limit)
+    players = [AI_factory.createAI(black_level, "BLACK"), AI_factory.createAI(white_level, "WHITE")]
+    engine = Engine(game_factory_class(), players, keep_history=False)
+    moves, nodes = [], {"BLACK": 0, "WHITE": 0}
+
+    def on_event(event: GameEvent):
+        if event.type == EVENT_MOVE:
+            moves.append((event.data["row"], event.data["col"]))
+            nodes[event.data["color"]] += engine.current_player().search_stats.nodes
+
+    engine.add_listener(on_event)
+    start_time = time.perf_counter()
+    engine.start(board_size)
+    winner = engine.run()
+
+    return {
+        "game": game_name,
+        "board_size": board_size,
+        "black": players[0].name,
+        "white": players[1].name,
+        "winner": winner,
+        "plies": len(moves),
+        "moves": moves,
+        "nodes": nodes,
+        "seed": seed,
+        "duration": time.perf_counter() - start_time,
+    }
+
+def _play_game_task(task: tuple) -> dict:
+    """
+    进程池任务入口。
+    """
+    return play_game(*task)
+
+def estimate_elo(records: list[dict], iterations: int=200, base: float=1500.0) -> dict[str, float]:
+    """
+    由对局结果估计 Elo 等级分（Bradley-Terry 模型的极大似然估计，和棋计半胜）。
+    每对选手之间额外加入一局虚拟和棋，避免全胜或全负时发散。
+    :param records: 对局记录列表
+    :param iterations: 迭代次数
+    :param base: 平均等级分
+    :return: {选手名: 等级分}
+    """
+    names = sorted({record["black"] for record in records} | {record["white"] for record in records})
+    wins = {name: 0.0 for name in names}
+    games = {pair: 0.0 for pair in itertools.combinations(names, 2)}
+    for record in records:
+        black, white = record["black"], record["white"]
+        if black == white:
+            continue
+        pair = tuple(sorted((black, white)))
+        games[pair] += 1
+        if record["winner"] == "BLACK":
+            wins[black] += 1
+        elif record["winner"] == "WHITE":
+            wins[white] += 1
+        else:
+            wins[black] += 0.5
+            wins[white] += 0.5
+    for a, b in games:  # 虚拟和棋
+        games[(a, b)] += 1
+        wins[a] += 0.5
+        wins[b] += 0.5
+
+    strength = {name: 1.0 for name in names}
+    for _ in range(iterations):
+        new_strength = {}
+        for name in names:
+            denominator = sum(count / (strength[a] + strength[b]) for (a, b), count in games.items() if name in (a, b))
+            new_strength[name] = wins[name] / denominator if denominator > 0 else strength[name]
+        mean_log = sum(math.log(value) for value in new_strength.values()) / len(names)
+        strength = {name: value / math.exp(mean_log) for name, value in new_strength.items()}
+    return {name: base + 400 * math.log10(strength[name]) for name in names}
+
+def run_tournament(game_name: str, levels: list[int], games_per_pairing: int, board_size: int=None,
+                   time_limit: float=None, workers: int=None, seed: int=0, output_dir: str="tournament",
+                   book_path: str=None) -> dict[str, float]:
+    """
+    在进程池中进行循环赛：每对等级各执黑白 games_per_pairing 局。
+    对局记录逐行写入 output_dir/games.jsonl，Elo 估计写入 output_dir/elo.json。
+    :return: {选手名: 等级分}
+    """
+    _, _, default_size, _ = GAME_SETTINGS[game_name]
+    board_size = board_size or default_size
+    tasks = []
+    for black_level, white_level in itertools.permutations(levels, 2):
+        for _ in range(games_per_pairing):
+            tasks.append((game_name, board_size, black_level, white_level, time_limit, seed + len(tasks), book_path))
+
+    os.makedirs(output_dir, exist_ok=True)
+    records = []
+    with ProcessPoolExecutor(max_workers=workers) as executor, open(os.path.join(output_dir, "games.jsonl"), "w") as f:
+        for record in executor.map(_play_game_task, tasks, chunksize=max(1, len(tasks) // (8 * (workers or os.cpu_count() or 1)))):
+            f.write(json.dumps(record) + "\n")
+            records.append(record)
+
+    ratings = estimate_elo(records)
+    with open(os.path.join(output_dir, "elo.json"), "w") as f:
+        json.dump(ratings, f, indent=4)
+    return ratings
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a headless round-robin AI tournament.")
+    parser.add_argument("--game", choices=list(GAME_SETTINGS), required=True)
+    parser.add_argument("--levels", type=int, nargs="+", default=None, help="AI levels (default: all levels of the game)")
+    parser.add_argument("--games", type=int, default=10, help="games per ordered pairing")
+    parser.add_argument("--size", type=int, default=None)
+    parser.add_argument("--time-limit", type=float, default=0.5, help="seconds per move")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--book", default=None, help="opening book path")
+    parser.add_argument("--output-dir", default="tournament")
+    args = parser.parse_args()
+
+    levels = args.levels or GAME_SETTINGS[args.game][3]
+    ratings = run_tournament(args.game, levels, args.games, args.size, args.time_limit,
+                             args.workers, args.seed, args.output_dir, args.book)
+    for name, rating in sorted(ratings.items(), key=lambda item: -item[1]):
+        print(f"{name:20s} {rating:8.1f}")
+
+if __name__ == "__main__":
+    main()